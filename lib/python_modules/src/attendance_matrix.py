@@ -0,0 +1,316 @@
+"""
+Bit-packed student x day attendance matrix
+------------------------------------------
+Compact in-memory form of the raw attendance log (date, student_id,
+present). The long frame of strings costs 100+ bytes per mark; here a mark
+is two bits:
+
+    student_ids   dictionary: row -> student id (sorted)
+    first_day     day number (days since 1970-01-01) of column 0
+    present_bits  (n_students, ceil(n_days / 8)) uint8, bit d = present on day d
+    known_bits    same shape, bit d = the student has a mark on day d
+
+Bits are packed along the day axis (np.packbits, bitorder="little"). A
+(student, day) cell holds one mark; if the log has several for the same
+cell, the student counts as present when any of them says "Yes".
+
+Queries unpack blocks of BLOCK_STUDENTS rows at a time and are plain
+NumPy reductions over the (students, days) grid:
+
+    matrix = AttendanceMatrix.from_csv("inputs/input_raw_attendance.csv")
+    matrix.daily_counts()          # per-date present / total (pattern analyzer input)
+    matrix.daily_pct()             # per-date attendance %
+    matrix.max_absence_streak()    # per student
+    matrix.weekday_misses()        # (n_students, 7) absences per weekday
+    AttendancePatternAnalyzer().fit_matrix(matrix)
+
+Usage:
+    python attendance_matrix.py RAW_CSV [--save MATRIX.npz]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_columns, NAT_DAY
+
+
+BLOCK_STUDENTS = 65_536   # rows unpacked at once by the queries
+
+
+def _factorize_ids(values):
+    """Student ids -> (codes, sorted distinct ids as strings); a missing id gets code -1."""
+
+    ids = pd.Series(values)
+    if ids.dtype.kind == "f":
+        # A missing id makes pandas read a numeric column as float:
+        # write whole-number ids as "12", not "12.0"
+        known = ids.dropna()
+        if (known == np.floor(known)).all():
+            ids = ids.astype("Int64")
+    return pd.factorize(ids.astype("string"), sort=True)
+
+
+def _pack(cells: np.ndarray, n_students: int, n_days: int) -> np.ndarray:
+    """Flat cell numbers (student * n_days + day) -> packed (n_students, n_bytes) bits."""
+
+    n_bytes = -(-n_days // 8)
+    cells = np.unique(cells)
+    student, day = np.divmod(cells, n_days)
+
+    # Distinct cells set distinct bits of their byte, so summing them is an OR
+    byte = student * n_bytes + (day >> 3)
+    bits = np.bincount(byte, weights=1 << (day & 7), minlength=n_students * n_bytes)
+    return bits.astype(np.uint8).reshape(n_students, n_bytes)
+
+
+class AttendanceMatrix:
+    def __init__(self, student_ids, first_day: int, n_days: int, present_bits: np.ndarray, known_bits: np.ndarray):
+        self.student_ids = np.asarray(student_ids, dtype=object)
+        self.first_day = int(first_day)
+        self.n_days = int(n_days)
+        self.present_bits = present_bits
+        self.known_bits = known_bits
+
+    # ---------------------------------------------------
+    # Construction
+    # ---------------------------------------------------
+    @classmethod
+    def from_codes(cls, student_codes, student_ids, days, present) -> "AttendanceMatrix":
+        """
+        student_codes: int row of each mark into student_ids (-1: no student id)
+        days:          day number of each mark (days since 1970-01-01; NAT_DAY: no date)
+        present:       bool per mark
+
+        Marks without a student id or a date have no cell and are dropped.
+        """
+
+        student_codes = np.asarray(student_codes, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        present = np.asarray(present, dtype=bool)
+
+        placed = (student_codes >= 0) & (days != NAT_DAY)
+        if not placed.all():
+            student_codes, days, present = student_codes[placed], days[placed], present[placed]
+
+        if len(days) == 0:
+            raise ValueError("No attendance marks to build the matrix from")
+
+        first_day = int(days.min())
+        n_days = int(days.max()) - first_day + 1
+        n_students = len(student_ids)
+
+        cells = student_codes * n_days + (days - first_day)
+        return cls(
+            student_ids, first_day, n_days,
+            present_bits=_pack(cells[present], n_students, n_days),
+            known_bits=_pack(cells, n_students, n_days),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AttendanceMatrix":
+        """
+        df must contain:
+            date, student_id, present (Yes/No)
+        """
+
+        student_codes, student_ids = _factorize_ids(df["student_id"])
+
+        # Only the distinct dates get parsed; code -1 is a missing date
+        date_codes, dates = pd.factorize(df["date"])
+        day_numbers = pd.to_datetime(dates).to_numpy(dtype="datetime64[D]").astype(np.int64)
+        days = np.where(date_codes >= 0, day_numbers[date_codes], NAT_DAY)
+
+        return cls.from_codes(student_codes, np.asarray(student_ids, dtype=object), days,
+                              df["present"].eq("Yes").to_numpy())
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "AttendanceMatrix":
+        """
+        Build from a raw attendance CSV through its columnar cache
+        (columnar_cache.py): day numbers, student codes and Yes/No flags
+        are already encoded there, so no string column is materialized.
+        """
+
+        columns = load_columns(csv_path, parse_dates=["date"])
+        student, present = columns["student_id"], columns["present"]
+
+        if student["kind"] == "dictionary":
+            student_codes, student_ids = student["codes"], np.asarray(student["dictionary"], dtype=object)
+        else:  # numeric ids
+            student_codes, student_ids = _factorize_ids(student["values"])
+
+        if present["kind"] == "yes_no":
+            present_flags = present["values"]
+        else:  # other spellings in the column: only "Yes" counts
+            codes = np.asarray(present["codes"])
+            present_flags = (codes >= 0) & (np.asarray(present["dictionary"], dtype=object)[codes] == "Yes")
+
+        return cls.from_codes(student_codes, np.asarray(student_ids, dtype=object),
+                              columns["date"]["values"], present_flags)
+
+    # ---------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------
+    def save(self, path: str):
+        np.savez(path, student_ids=self.student_ids.astype(str), first_day=self.first_day,
+                 n_days=self.n_days, present_bits=self.present_bits, known_bits=self.known_bits)
+
+    @classmethod
+    def load(cls, path: str) -> "AttendanceMatrix":
+        with np.load(path) as data:
+            return cls(data["student_ids"].astype(object), int(data["first_day"]), int(data["n_days"]),
+                       data["present_bits"], data["known_bits"])
+
+    # ---------------------------------------------------
+    # Shape / size
+    # ---------------------------------------------------
+    @property
+    def n_students(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        days = np.arange(self.first_day, self.first_day + self.n_days).astype("datetime64[D]")
+        return pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the bit masks (the dictionary of ids not included)."""
+        return self.present_bits.nbytes + self.known_bits.nbytes
+
+    def __len__(self) -> int:
+        return self.n_students
+
+    def __repr__(self) -> str:
+        return (f"AttendanceMatrix({self.n_students} students x {self.n_days} days "
+                f"from {self.dates[0].date()}, {self.nbytes / 2**20:.2f} MB)")
+
+    # ---------------------------------------------------
+    # Unpacking
+    # ---------------------------------------------------
+    def _unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, axis=1, count=self.n_days, bitorder="little").view(bool)
+
+    def blocks(self, block_students: int = BLOCK_STUDENTS):
+        """Yields (row slice, present, known) as bool (rows, n_days) arrays."""
+
+        for start in range(0, self.n_students, block_students):
+            rows = slice(start, min(start + block_students, self.n_students))
+            yield rows, self._unpack(self.present_bits[rows]), self._unpack(self.known_bits[rows])
+
+    def weekday_of_columns(self) -> np.ndarray:
+        # 1970-01-01 was a Thursday, so weekday = (day + 3) % 7 (0=Mon)
+        return (self.first_day + np.arange(self.n_days) + 3) % 7
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+    def daily_counts(self) -> pd.DataFrame:
+        """
+        Present / total marks per date (index=date, sorted; dates without
+        marks are left out), as AttendancePatternAnalyzer.compute_daily_counts
+        returns them.
+        """
+
+        present = np.zeros(self.n_days, dtype=np.int64)
+        total = np.zeros(self.n_days, dtype=np.int64)
+
+        for _, block_present, block_known in self.blocks():
+            present += block_present.sum(axis=0)
+            total += block_known.sum(axis=0)
+
+        counts = pd.DataFrame({"present": present, "total": total}, index=self.dates)
+        return counts[counts["total"] > 0]
+
+    def daily_pct(self) -> pd.Series:
+        """Attendance % per date."""
+
+        counts = self.daily_counts()
+        return (counts["present"] / counts["total"] * 100).rename("present_pct")
+
+    def student_rates(self) -> pd.Series:
+        """% of each student's recorded days marked present."""
+
+        present = np.zeros(self.n_students, dtype=np.int64)
+        total = np.zeros(self.n_students, dtype=np.int64)
+
+        for rows, block_present, block_known in self.blocks():
+            present[rows] = block_present.sum(axis=1)
+            total[rows] = block_known.sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = present / total * 100
+        return pd.Series(rate, index=self.student_ids, name="attendance_pct")
+
+    def max_absence_streak(self) -> pd.Series:
+        """
+        Longest run of consecutive recorded absences per student. Days
+        without a mark neither extend nor break a run (as in risk_features.py).
+        """
+
+        streak = np.zeros(self.n_students, dtype=np.int64)
+
+        for rows, block_present, block_known in self.blocks():
+            absences = np.cumsum(block_known & ~block_present, axis=1, dtype=np.int32)
+
+            # Absences counted up to the last present day; a run is the count since then
+            at_present = np.where(block_present, absences, 0)
+            last_reset = np.maximum.accumulate(at_present, axis=1)
+            streak[rows] = (absences - last_reset).max(axis=1, initial=0)
+
+        return pd.Series(streak, index=self.student_ids, name="max_absence_streak")
+
+    def weekday_misses(self) -> pd.DataFrame:
+        """Absences per student and weekday: (n_students, 7), columns 0=Mon .. 6=Sun."""
+
+        one_hot = (self.weekday_of_columns()[:, None] == np.arange(7)).astype(np.int32)   # (n_days, 7)
+        misses = np.zeros((self.n_students, 7), dtype=np.int64)
+
+        for rows, block_present, block_known in self.blocks():
+            misses[rows] = (block_known & ~block_present).astype(np.int32) @ one_hot
+
+        return pd.DataFrame(misses, index=self.student_ids, columns=range(7))
+
+    def slice_days(self, start=None, end=None) -> "AttendanceMatrix":
+        """Sub-matrix for the dates in [start, end] (inclusive; None = open end)."""
+
+        first = 0 if start is None else int(np.datetime64(pd.Timestamp(start).date(), "D").astype(np.int64)) - self.first_day
+        last = self.n_days - 1 if end is None else int(np.datetime64(pd.Timestamp(end).date(), "D").astype(np.int64)) - self.first_day
+        first, last = max(first, 0), min(last, self.n_days - 1)
+        n_days = max(last - first + 1, 0)
+
+        def repack(bits):
+            dense = self._unpack(bits)[:, first:first + n_days]
+            return np.packbits(dense, axis=1, bitorder="little")
+
+        return AttendanceMatrix(self.student_ids, self.first_day + first, n_days,
+                                repack(self.present_bits), repack(self.known_bits))
+
+
+# ---------------------------------------------------
+# CLI
+# ---------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build a bit-packed attendance matrix from a raw log.")
+    parser.add_argument("raw_csv", help="CSV with date, student_id, present")
+    parser.add_argument("--save", help="write the matrix to an .npz file")
+    args = parser.parse_args()
+
+    print("📘 Building attendance matrix...")
+    matrix = AttendanceMatrix.from_csv(args.raw_csv)
+    print(f"✅ {matrix}")
+
+    daily = matrix.daily_pct()
+    print(f"📊 Mean daily attendance {daily.mean():.1f}% over {len(daily)} days")
+    print(f"📊 Longest absence streak {int(matrix.max_absence_streak().max())} days, "
+          f"{int(matrix.weekday_misses()[4].sum())} Friday absences")
+
+    if args.save:
+        matrix.save(args.save)
+        print(f"💾 Saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
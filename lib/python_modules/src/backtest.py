@@ -0,0 +1,353 @@
+"""
+Rolling-origin backtest for the forecaster
+------------------------------------------
+Replays history the way the forecaster is used: stand at a forecast
+origin, know only the days before it, forecast the next 1..HORIZON days
+(predict_horizon_many, as predict.py does) and compare with what
+actually happened. --strategy picks recursive (default) or direct; a
+direct fold fits fit_direct on the days before its origin.
+
+  1. the training features (lags, rolling mean) are computed ONCE for the
+     whole series and written to .npy files that the worker processes
+     memory-map; a fold trains on the rows dated before its origin, which
+     only use data from before it;
+  2. origins start after --initial days and a fresh model is fitted every
+     --step days (one fold); every origin of a fold is forecast in one
+     batched predict_horizon_many call with that fold's model;
+  3. folds are fitted and evaluated in a process pool, one fold per core.
+
+Reported per horizon h (1..HORIZON): MAE and MAPE (%) over every origin
+with an actual value h days later, next to a persistence baseline
+(tomorrow = last observed day).
+
+direct_calibration runs the same direct backtest for forecaster_train.py
+and returns the held-out residuals the direct model's intervals come
+from (DailyAttendanceForecaster.calibrate_direct).
+
+Usage:
+    python backtest.py [--train CSV] [--horizon 14] [--initial 28] [--step 7]
+                       [--strategy recursive|direct] [--backend NAME] [--workers N]
+                       [--n-estimators 250] [--report JSON]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import read_csv_cached
+import model_backends
+
+
+# ---------------------------------------------------------
+# Paths
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+TRAIN_CSV_PATH = os.path.join(PYTHON_MODULES_DIR, "training_data", "daily_attendance_train.csv")
+REPORT_PATH = os.path.join(PYTHON_MODULES_DIR, "models", "forecaster_backtest.json")
+
+# Same top-level module name as forecaster_train.py
+sys.path.append(os.path.join(BASE_DIR, "forecasting"))
+from forecaster_model import DailyAttendanceForecaster
+
+
+HORIZON = 14
+INITIAL_DAYS = 28
+STEP_DAYS = 7
+
+
+# ---------------------------------------------------------
+# Fold plan
+# ---------------------------------------------------------
+def plan_folds(days: np.ndarray, values: np.ndarray, horizon: int = HORIZON,
+               initial: int = INITIAL_DAYS, step: int = STEP_DAYS) -> list:
+    """
+    days / values: the daily series sorted by date (day numbers, attendance %).
+
+    Returns one dict per fold:
+        origin_day   first day the fold's model must not see
+        windows      (n_origins, ROLLING_WINDOW) history before each origin (NaN-padded)
+        start_days   (n_origins,) first forecast day of each origin
+        actuals      (n_origins, horizon) observed values, NaN where there is none
+    """
+
+    window = DailyAttendanceForecaster.ROLLING_WINDOW
+    padded = np.concatenate([np.full(window, np.nan), values])
+    position = {int(day): i for i, day in enumerate(days)}
+
+    folds = []
+    for fold_start in range(max(initial, 2), len(days), step):
+        origins = np.arange(fold_start, min(fold_start + step, len(days)))
+
+        # Origin p: the days before p are known, forecasting starts the day after days[p - 1]
+        windows = np.stack([padded[p:p + window] for p in origins])
+        start_days = days[origins - 1] + 1
+
+        actuals = np.full((len(origins), horizon), np.nan)
+        for row, start in enumerate(start_days):
+            for h in range(horizon):
+                i = position.get(int(start) + h)
+                if i is not None:
+                    actuals[row, h] = values[i]
+
+        folds.append({
+            "origin_day": int(days[fold_start]),
+            "windows": windows,
+            "start_days": start_days,
+            "actuals": actuals,
+        })
+
+    return folds
+
+
+# ---------------------------------------------------------
+# Workers (shared, memory-mapped training matrix)
+# ---------------------------------------------------------
+_worker_state = {}
+
+
+def _init_worker(data_dir: str, params: dict, strategy: str = "recursive",
+                 backend: str = model_backends.DEFAULT_BACKEND):
+    _worker_state.update(
+        X=np.load(os.path.join(data_dir, "X.npy"), mmap_mode="r"),
+        y=np.load(os.path.join(data_dir, "y.npy"), mmap_mode="r"),
+        row_days=np.load(os.path.join(data_dir, "row_days.npy")),
+        days=np.load(os.path.join(data_dir, "days.npy")),
+        values=np.load(os.path.join(data_dir, "values.npy")),
+        params=params,
+        strategy=strategy,
+        backend=backend,
+    )
+
+
+def _fit_direct_fold(forecaster, origin_day: int, horizon: int, params: dict):
+    """Direct model on the raw series before the origin (its targets all precede it)."""
+
+    days, values = _worker_state["days"], _worker_state["values"]
+    n_history = int(np.searchsorted(days, origin_day))
+    history = pd.DataFrame({"date": days[:n_history].astype("datetime64[D]"),
+                            "attendance_pct": values[:n_history]})
+
+    forecaster.fit_direct(history, max_horizon=horizon, n_jobs=1, **params)
+    return n_history
+
+
+def _run_fold(fold: dict) -> dict:
+    X, y, row_days, params = (_worker_state[k] for k in ("X", "y", "row_days", "params"))
+
+    strategy = _worker_state["strategy"]
+    horizon = fold["actuals"].shape[1]
+    forecaster = DailyAttendanceForecaster(backend=_worker_state["backend"])
+
+    start = time.perf_counter()
+    if strategy == "direct":
+        n_train = _fit_direct_fold(forecaster, fold["origin_day"], horizon, params)
+    else:
+        # Training rows dated before the origin: their lags only reach back
+        n_train = int(np.searchsorted(row_days, fold["origin_day"]))
+        forecaster.model = forecaster.build_model(n_jobs=1, **params)
+        forecaster.model.fit(X[:n_train], y[:n_train])
+    fit_seconds = time.perf_counter() - start
+
+    predictions = forecaster.predict_horizon_many(
+        fold["windows"], fold["start_days"].astype("datetime64[D]"), horizon, strategy=strategy
+    )
+
+    return {
+        "origin_day": fold["origin_day"],
+        "n_train": n_train,
+        "fit_seconds": fit_seconds,
+        "predictions": predictions,
+    }
+
+
+# ---------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------
+def horizon_errors(predictions: np.ndarray, actuals: np.ndarray) -> dict:
+    """
+    Per-horizon MAE / MAPE over (n_origins, horizon) arrays; NaN actuals
+    (no observation that day) are skipped, zero actuals are left out of MAPE.
+    """
+
+    known = ~np.isnan(actuals)
+    abs_error = np.where(known, np.abs(predictions - actuals), 0.0)
+
+    scaled = known & (actuals != 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct_error = np.where(scaled, abs_error / np.abs(actuals) * 100, 0.0)
+
+    n = known.sum(axis=0)
+    n_pct = scaled.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "n": n,
+            "mae": abs_error.sum(axis=0) / n,
+            "mape": pct_error.sum(axis=0) / n_pct,
+        }
+
+
+def _backtest_folds(df, horizon: int, initial: int, step: int, workers: int, params: dict,
+                    strategy: str, backend: str):
+    """(folds, fold results, workers, n_days) of a rolling-origin run."""
+
+    forecaster = DailyAttendanceForecaster()
+
+    series = df.sort_values("date")
+    days = series["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    values = series["attendance_pct"].to_numpy(dtype=float)
+
+    folds = plan_folds(days, values, horizon, initial, step)
+    if not folds:
+        raise ValueError(f"History of {len(days)} days is too short for --initial {initial}")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(folds)))
+
+    data_dir = tempfile.mkdtemp(prefix="backtest_")
+    try:
+        # Features once for the whole series; folds slice rows by date
+        features = forecaster.add_features(df).dropna()
+        np.save(os.path.join(data_dir, "X.npy"),
+                np.ascontiguousarray(features[forecaster.feature_cols].to_numpy(dtype=np.float64)))
+        np.save(os.path.join(data_dir, "y.npy"), features["attendance_pct"].to_numpy(dtype=np.float64))
+        np.save(os.path.join(data_dir, "row_days.npy"),
+                features["date"].to_numpy().astype("datetime64[D]").astype(np.int64))
+
+        # The raw series, for direct folds
+        np.save(os.path.join(data_dir, "days.npy"), days)
+        np.save(os.path.join(data_dir, "values.npy"), values)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_dir, params, strategy, backend)) as pool:
+            # Later folds train on more rows: start them first so no core idles at the end
+            results = list(pool.map(_run_fold, folds[::-1]))[::-1]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return folds, results, workers, len(days)
+
+
+def run_backtest(df, horizon: int = HORIZON, initial: int = INITIAL_DAYS, step: int = STEP_DAYS,
+                 workers: int = None, params: dict = None, strategy: str = "recursive",
+                 backend: str = model_backends.DEFAULT_BACKEND) -> dict:
+    """
+    df must contain:
+        date, attendance_pct, weekday, month, is_weekend
+    """
+
+    params = params or {}
+    folds, results, workers, n_days = _backtest_folds(df, horizon, initial, step, workers, params,
+                                                      strategy, backend)
+
+    predictions = np.concatenate([r["predictions"] for r in results])
+    actuals = np.concatenate([f["actuals"] for f in folds])
+    last_known = np.concatenate([f["windows"][:, -1] for f in folds])
+
+    model = horizon_errors(predictions, actuals)
+    naive = horizon_errors(np.repeat(last_known[:, None], horizon, axis=1), actuals)
+
+    def number(x):
+        return None if np.isnan(x) else round(float(x), 4)
+
+    return {
+        "strategy": strategy,
+        "backend": backend,
+        "horizon": horizon,
+        "initial_days": initial,
+        "step_days": step,
+        "params": params,
+        "workers": workers,
+        "n_days": n_days,
+        "n_folds": len(folds),
+        "n_origins": len(predictions),
+        "fit_seconds": round(sum(r["fit_seconds"] for r in results), 3),
+        "per_horizon": [
+            {
+                "h": h + 1,
+                "n": int(model["n"][h]),
+                "mae": number(model["mae"][h]),
+                "mape": number(model["mape"][h]),
+                "naive_mae": number(naive["mae"][h]),
+                "naive_mape": number(naive["mape"][h]),
+            }
+            for h in range(horizon)
+        ],
+        "folds": [
+            {"origin": str(np.datetime64(r["origin_day"], "D")), "n_train": r["n_train"],
+             "fit_seconds": round(r["fit_seconds"], 4)}
+            for r in results
+        ],
+    }
+
+
+def direct_calibration(df, horizon: int = HORIZON, initial: int = INITIAL_DAYS, step: int = STEP_DAYS,
+                       workers: int = None, params: dict = None,
+                       backend: str = model_backends.DEFAULT_BACKEND) -> np.ndarray:
+    """
+    Held-out residuals (actual - forecast) of the direct strategy, shape
+    (n_origins, horizon), NaN where there is no actual; for
+    DailyAttendanceForecaster.calibrate_direct. df as in run_backtest.
+    """
+
+    folds, results, _, _ = _backtest_folds(df, horizon, initial, step, workers, params or {},
+                                           "direct", backend)
+    predictions = np.concatenate([r["predictions"] for r in results])
+    actuals = np.concatenate([f["actuals"] for f in folds])
+    return actuals - predictions
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the daily forecaster.")
+    parser.add_argument("--train", default=TRAIN_CSV_PATH, help="daily attendance CSV")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="days forecast from each origin")
+    parser.add_argument("--initial", type=int, default=INITIAL_DAYS, help="days of history before the first origin")
+    parser.add_argument("--step", type=int, default=STEP_DAYS, help="days between refits (origins per fold)")
+    parser.add_argument("--strategy", choices=DailyAttendanceForecaster.STRATEGIES, default="recursive",
+                        help="forecast strategy to evaluate")
+    parser.add_argument("--backend", choices=sorted(model_backends.BACKENDS), default=model_backends.DEFAULT_BACKEND)
+    parser.add_argument("--workers", type=int, default=None, help="fold processes (default: all cores)")
+    parser.add_argument("--n-estimators", type=int, help="trees per fold (default: production model)")
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    params = {"n_estimators": args.n_estimators} if args.n_estimators else {}
+
+    print("📘 Loading daily attendance...")
+    df = read_csv_cached(args.train, parse_dates=["date"])
+    print(f"Loaded {len(df)} days.")
+
+    print(f"\n🚀 Backtesting {args.horizon}-day {args.strategy} horizons (refit every {args.step} days)...")
+    start = time.perf_counter()
+    report = run_backtest(df, args.horizon, args.initial, args.step, args.workers, params, args.strategy,
+                          args.backend)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+
+    print(f"✅ {report['n_folds']} folds, {report['n_origins']} origins on {report['workers']} workers "
+          f"in {report['seconds']:.2f}s\n")
+
+    print(f"  {'h':>3} {'n':>6} {'MAE':>8} {'MAPE %':>8}   {'naive MAE':>9} {'naive MAPE %':>12}")
+    for row in report["per_horizon"]:
+        fmt = lambda x: "-" if x is None else f"{x:.2f}"
+        print(f"  {row['h']:>3} {row['n']:>6} {fmt(row['mae']):>8} {fmt(row['mape']):>8}   "
+              f"{fmt(row['naive_mae']):>9} {fmt(row['naive_mape']):>12}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n💾 Backtest report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Benchmark suite
+---------------
+Times and memory-profiles the hot paths on seeded synthetic data:
+
+    pattern_fit        AttendancePatternAnalyzer.fit            (raw attendance rows)
+    pattern_fit_matrix same, fitted from a bit-packed AttendanceMatrix (raw attendance rows)
+    risk_scoring       StudentRiskClassifier batch scoring      (students)
+    forecast_7day      the predict.py 7-day forecast stage      (history days)
+    horizon_point      7-day point forecast for many cohorts    (cohorts)
+    horizon_interval   same, plus 95% per-tree intervals        (cohorts)
+    anomaly_scan       low-day clusters, 3-year cohort series   (cohort-days)
+    forecaster_fit     DailyAttendanceForecaster.fit + joblib   (training days)
+    risk_fit           StudentRiskClassifier.fit + joblib       (training students)
+
+The *_fit benchmarks time the model fit and save only, not the training
+scripts around them (CSV read, drift check, compiled-forest export).
+
+For each (benchmark, size) it records the best wall time over --repeat
+runs, rows/sec, and the peak traced allocation of one extra run
+(tracemalloc). Results go to a JSON file tagged with the git commit so
+runs can be compared:
+
+    python run_benchmarks.py                                # 1e3, 1e4, 1e5
+    python run_benchmarks.py --sizes 1e3 1e5 1e7 --only pattern_fit
+    python run_benchmarks.py --compare ../../bench_results/OLD.json
+
+Each benchmark has a default size cap (training a 250-tree forest on 10^7
+rows is not a benchmark, it is a batch job); --uncapped lifts the caps.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import resource
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))         # /src/benchmarks
+SRC_DIR = os.path.abspath(os.path.join(BENCH_DIR, ".."))       # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(SRC_DIR, ".."))
+RESULTS_DIR = os.path.join(PYTHON_MODULES_DIR, "bench_results")
+
+sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+import pandas as pd
+import joblib
+
+import pipeline
+import synthetic_data
+
+
+# ---------------------------------------------------------
+# Benchmarks: setup(n) -> state, run(state) -> None
+# ---------------------------------------------------------
+def _pattern_setup(n):
+    analyzer_cls = pipeline.model_module("patterns", "pattern_analyzer").AttendancePatternAnalyzer
+    return analyzer_cls, synthetic_data.raw_attendance(n)
+
+
+def _pattern_run(state):
+    analyzer_cls, raw_df = state
+    analyzer_cls().fit(raw_df).export_patterns()
+
+
+def _pattern_matrix_setup(n):
+    from attendance_matrix import AttendanceMatrix
+
+    analyzer_cls = pipeline.model_module("patterns", "pattern_analyzer").AttendancePatternAnalyzer
+    return analyzer_cls, AttendanceMatrix.from_frame(synthetic_data.raw_attendance(n))
+
+
+def _pattern_matrix_run(state):
+    analyzer_cls, matrix = state
+    analyzer_cls().fit_matrix(matrix).export_patterns()
+
+
+def _risk_scoring_setup(n):
+    return pipeline.load_risk_model(), synthetic_data.student_risk(n).drop(columns="label")
+
+
+def _risk_scoring_run(state):
+    risk_model, risk_df = state
+    pipeline.run_risk(risk_model, risk_df)
+
+
+def _forecast_setup(n):
+    return pipeline.load_forecaster(), synthetic_data.daily_attendance(n)
+
+
+def _forecast_run(state):
+    forecaster, daily_df = state
+    pipeline.run_forecast(forecaster, daily_df, n_days=7)
+
+
+def _horizon_setup(level):
+    def setup(n):
+        rng = np.random.default_rng(42)
+        windows = np.clip(rng.normal(80, 6, (n, 7)), 0, 100)
+        start_dates = np.full(n, np.datetime64("2025-02-11"))
+        return pipeline.load_forecaster(), windows, start_dates, level
+    return setup
+
+
+def _horizon_run(state):
+    forecaster, windows, start_dates, level = state
+    forecaster.predict_horizon_many(windows, start_dates, 7, level=level)
+
+
+def _anomaly_setup(n):
+    import anomaly_scan  # src/patterns is on sys.path via pipeline
+
+    # 3-year cohorts, the last one cut short so there are exactly n rows
+    n_days = min(3 * 365, n)
+    n_cohorts = -(-n // n_days)
+    days = synthetic_data.daily_attendance(n_days)
+    rng = np.random.default_rng(42)
+
+    daily = pd.DataFrame({
+        "cohort_id": np.repeat(np.arange(n_cohorts), n_days)[:n],
+        "date": np.tile(days["date"].to_numpy(), n_cohorts)[:n],
+        "present_pct": np.tile(days["attendance_pct"].to_numpy(float), n_cohorts)[:n]
+                       + rng.normal(0, 3, n),
+    })
+    return anomaly_scan, daily
+
+
+def _anomaly_run(state):
+    anomaly_scan, daily = state
+    anomaly_scan.scan_daily(daily, series_col="cohort_id")
+
+
+def _train_setup(package, module, class_name, generator):
+    def setup(n):
+        model_cls = getattr(pipeline.model_module(package, module), class_name)
+        return model_cls, generator(n), os.path.join(tempfile.gettempdir(), f"bench-{class_name}-{os.getpid()}.joblib")
+    return setup
+
+
+def _train_run(state):
+    model_cls, df, path = state
+    model = model_cls()
+    model.fit(df, n_jobs=-1)
+    joblib.dump(model, path)
+    os.remove(path)
+
+
+BENCHMARKS = {
+    #  name               setup                                          run                unit        cap
+    "pattern_fit":      (_pattern_setup,                                  _pattern_run,      "rows",     10**7),
+    "pattern_fit_matrix": (_pattern_matrix_setup,                         _pattern_matrix_run, "rows",   10**7),
+    "risk_scoring":     (_risk_scoring_setup,                             _risk_scoring_run, "students", 10**6),
+    "forecast_7day":    (_forecast_setup,                                 _forecast_run,     "days",     10**6),
+    "horizon_point":    (_horizon_setup(None),                            _horizon_run,      "cohorts",  10**6),
+    "horizon_interval": (_horizon_setup(0.95),                            _horizon_run,      "cohorts",  10**6),
+    "anomaly_scan":     (_anomaly_setup,                                  _anomaly_run,      "cohort-days", 10**7),
+    "forecaster_fit":   (_train_setup("forecasting", "forecaster_model", "DailyAttendanceForecaster",
+                                      synthetic_data.daily_attendance), _train_run,        "days",     10**5),
+    "risk_fit":         (_train_setup("risk", "risk_model", "StudentRiskClassifier",
+                                      synthetic_data.student_risk),     _train_run,        "students", 10**5),
+}
+
+
+# ---------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------
+def measure(name: str, n: int, repeat: int) -> dict:
+    setup, run, unit, _ = BENCHMARKS[name]
+    state = setup(n)
+
+    run(state)  # warm-up (imports, caches)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "benchmark": name,
+        "rows": n,
+        "unit": unit,
+        "seconds": round(best, 6),
+        "seconds_all": [round(t, 6) for t in times],
+        "rows_per_sec": round(n / best, 1) if best > 0 else None,
+        "peak_traced_mb": round(peak / 1e6, 3),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+
+    import sklearn
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__},
+    }
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, "r") as f:
+        baseline = {(r["benchmark"], r["rows"]): r for r in json.load(f)["results"]}
+
+    print(f"\n📊 Compared with {baseline_path} (ratio > 1 = slower now)")
+    for r in results:
+        old = baseline.get((r["benchmark"], r["rows"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        flag = "  ⚠ regression" if ratio > 1.10 else ""
+        print(f"  {r['benchmark']:<17} {r['rows']:>10,}  {old['seconds']:.4f}s -> {r['seconds']:.4f}s  x{ratio:.2f}{flag}")
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attendance pipeline on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--uncapped", action="store_true", help="ignore per-benchmark size caps")
+    parser.add_argument("--output", help="results JSON (default: bench_results/bench-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    env = environment()
+    results = []
+
+    for name in args.only or BENCHMARKS:
+        cap = BENCHMARKS[name][3]
+        for n in sorted(int(s) for s in args.sizes):
+            if n > cap and not args.uncapped:
+                print(f"⏭ {name} @ {n:,}: above cap {cap:,}")
+                continue
+
+            r = measure(name, n, args.repeat)
+            results.append(r)
+            print(f"⏱ {name:<17} {n:>10,} {r['unit']:<8} {r['seconds']:>9.4f}s  "
+                  f"{r['rows_per_sec']:>14,.0f}/s  peak {r['peak_traced_mb']:>9.1f} MB")
+
+    env["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{env['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=4)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
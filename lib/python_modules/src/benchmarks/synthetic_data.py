@@ -0,0 +1,97 @@
+"""
+Seeded synthetic data generators
+--------------------------------
+Produce frames with the same schemas as the demo CSVs, at any size
+(10^3 .. 10^7 rows), fully vectorized:
+
+    daily_attendance(n)  -> daily_attendance_train.csv  (date, attendance_pct, weekday, month, is_weekend)
+    raw_attendance(n)    -> raw_attendance_demo.csv     (date, student_id, present)
+    student_risk(n)      -> student_risk_train.csv      (student_id, <5 features>, label)
+
+Same (n, seed) always gives the same frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+START_DATE = "2020-01-01"
+
+# Weekday effect on attendance (Mon..Sun), roughly the demo data's shape
+WEEKDAY_EFFECT = np.array([0.0, 1.0, -3.0, 1.0, -4.0, 1.5, -0.5])
+
+
+def daily_attendance(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    dates = pd.date_range(START_DATE, periods=n_rows, freq="D")
+    weekday = dates.weekday.to_numpy()
+
+    # Slow seasonal drift + weekday effect + noise
+    season = 4.0 * np.sin(2 * np.pi * np.arange(n_rows) / 365.25)
+    attendance = 80 + season + WEEKDAY_EFFECT[weekday] + rng.normal(0, 6, n_rows)
+
+    return pd.DataFrame({
+        "date": dates,
+        "attendance_pct": np.clip(np.rint(attendance), 0, 100).astype(np.int64),
+        "weekday": weekday,
+        "month": dates.month.to_numpy(),
+        "is_weekend": (weekday >= 5).astype(np.int64),
+    })
+
+
+def raw_attendance(n_rows: int, seed: int = 42, n_students: int = None) -> pd.DataFrame:
+    """
+    One mark per (day, student), day-major like the demo log. The number
+    of students grows with n_rows (50 .. 20,000) so large logs span a
+    realistic number of days.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    if n_students is None:
+        n_students = int(np.clip(n_rows // 60, 50, 20_000))
+    n_days = -(-n_rows // n_students)
+
+    day = np.repeat(np.arange(n_days), n_students)[:n_rows]
+    student = np.tile(np.arange(n_students), n_days)[:n_rows]
+
+    dates = pd.date_range(START_DATE, periods=n_days, freq="D")
+    weekday = dates.weekday.to_numpy()[day]
+
+    # Each student has their own attendance propensity
+    propensity = rng.beta(8, 2, n_students)
+    p_present = np.clip(propensity[student] + WEEKDAY_EFFECT[weekday] / 100, 0, 1)
+    present = rng.random(n_rows) < p_present
+
+    student_ids = np.array([f"S{i:05d}" for i in range(n_students)], dtype=object)
+
+    return pd.DataFrame({
+        "date": dates.to_numpy()[day],
+        "student_id": student_ids[student],
+        "present": np.where(present, "Yes", "No").astype(object),
+    })
+
+
+def student_risk(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    attendance = np.clip(rng.normal(75, 12, n_rows), 30, 100).round()
+    streak = np.clip(rng.poisson((100 - attendance) / 8), 0, 10)
+    drops = rng.integers(0, 4, n_rows)
+    variance = rng.uniform(0.0, 0.2, n_rows)
+    friday = rng.integers(0, 5, n_rows)
+
+    # Label from a noisy risk score so the classes are learnable
+    score = (100 - attendance) / 10 + streak / 2 + drops / 2 + rng.normal(0, 1, n_rows)
+    label = np.select([score >= 5, score >= 3], ["High", "Medium"], default="Low")
+
+    return pd.DataFrame({
+        "student_id": [f"S{i:07d}" for i in range(n_rows)],
+        "overall_attendance_30d": attendance.astype(np.int64),
+        "max_absence_streak": streak.astype(np.int64),
+        "num_sudden_drops": drops,
+        "variance_30d": variance,
+        "weekday_miss_friday": friday,
+        "label": label,
+    })
@@ -0,0 +1,148 @@
+"""
+Per-worker memory: sklearn artifact vs memory-mapped compiled forest
+--------------------------------------------------------------------
+Starts --workers processes that each load the forecaster the way a
+prediction worker does (pipeline.load_forecaster) and score a batch, then
+reports per-worker memory growth from /proc/self/smaps_rollup:
+
+    rss      resident set growth of the worker
+    private  pages only this worker has (anonymous copies of the trees)
+    pss      proportional share: shared pages divided by the processes
+             mapping them, i.e. what the worker really costs the host
+
+    joblib (sklearn)   models/*.joblib -> every worker unpickles private tree arrays
+    forest.joblib      models/*.forest.joblib, mmap_mode="r" -> one page-cache
+                       copy shared by all workers
+
+The demo forest is small, so by default a larger one is trained on
+synthetic data (--rows); --model measures an existing sklearn artifact.
+
+    python worker_rss.py
+    python worker_rss.py --workers 8 --rows 200000
+    python worker_rss.py --model ../../models/daily_forecaster.joblib
+
+Linux only (/proc).
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import multiprocessing as mp
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))         # /src/benchmarks
+SRC_DIR = os.path.abspath(os.path.join(BENCH_DIR, ".."))       # /src
+RESULTS_DIR = os.path.abspath(os.path.join(SRC_DIR, "..", "bench_results"))
+
+sys.path.insert(0, SRC_DIR)
+
+import joblib
+
+import pipeline
+import synthetic_data
+from compiled_forest import export_artifact, forest_path_for
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+# ---------------------------------------------------------
+# Worker
+# ---------------------------------------------------------
+def _worker(model_path: str, batch_rows: int, barrier, results):
+    daily_df = synthetic_data.daily_attendance(batch_rows, seed=7)
+    before = memory_kb()
+
+    forecaster = pipeline.load_forecaster(model_path)
+    X = forecaster.add_features(daily_df).dropna()[forecaster.feature_cols]
+    forecaster.model.predict(X)  # touch (nearly) every tree node
+
+    # Measure once every worker holds the model, so shared pages are split
+    barrier.wait()
+    after = memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait()
+
+
+def measure(model_path: str, workers: int, batch_rows: int) -> dict:
+    ctx = mp.get_context("spawn")  # clean interpreters, no memory inherited from the parent
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+
+    processes = [ctx.Process(target=_worker, args=(model_path, batch_rows, barrier, results))
+                 for _ in range(workers)]
+    for p in processes:
+        p.start()
+    deltas = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    return {key: round(sum(d[key] for d in deltas) / len(deltas) / 1024, 2) for key in deltas[0]}
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker RSS: sklearn artifact vs mmap compiled forest.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic training days for the forest")
+    parser.add_argument("--model", help="existing sklearn forecaster artifact instead of training one")
+    parser.add_argument("--batch", type=int, default=5_000, help="rows each worker scores")
+    parser.add_argument("--output", help="results JSON (default: bench_results/worker-rss-<time>.json)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="worker_rss_")
+    try:
+        sklearn_path = os.path.join(work_dir, "forecaster.joblib")
+
+        if args.model:
+            forecaster = pipeline.load_forecaster(args.model)
+        else:
+            print(f"🚀 Training a forecaster on {args.rows:,} synthetic days...")
+            forecaster = pipeline.model_module("forecasting", "forecaster_model").DailyAttendanceForecaster()
+            forecaster.fit(synthetic_data.daily_attendance(args.rows), n_jobs=-1)
+
+        joblib.dump(forecaster, sklearn_path, compress=0)
+        compiled = export_artifact(forecaster, sklearn_path, "forecaster")
+        forest_path = forest_path_for(sklearn_path)
+
+        print(f"🌲 {len(compiled.roots)} trees, {len(compiled.feature):,} nodes "
+              f"(sklearn artifact {os.path.getsize(sklearn_path) / 2**20:.1f} MB, "
+              f"compiled {os.path.getsize(forest_path) / 2**20:.1f} MB)\n")
+
+        results = {}
+        for label, path in [("joblib (sklearn)", sklearn_path), ("forest.joblib (mmap)", forest_path)]:
+            results[label] = measure(path, args.workers, args.batch)
+
+        print(f"📊 Per-worker memory growth with {args.workers} workers (MB)")
+        print(f"  {'artifact':<22} {'rss':>9} {'private':>9} {'pss':>9}")
+        for label, r in results.items():
+            print(f"  {label:<22} {r['rss']:>9.2f} {r['private']:>9.2f} {r['pss']:>9.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"worker-rss-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"workers": args.workers, "rows": args.rows, "model": args.model,
+                   "nodes": int(len(compiled.feature)), "results_mb": results}, f, indent=4)
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Columnar binary cache for CSV inputs
+------------------------------------
+Parsing the attendance CSVs (dates, string student ids, "Yes"/"No" flags)
+dominates load time on large logs. This module converts a CSV once into
+a directory of memory-mapped .npy columns and reuses it while the CSV is
+unchanged (same size and mtime).
+
+Column encodings:
+  - date columns (parse_dates) -> int32 day numbers (days since 1970-01-01),
+                                  NAT_DAY for a missing date
+  - "Yes"/"No" columns          -> bool
+  - other string columns        -> int32 codes + dictionary (student_id, ...)
+  - numeric columns             -> stored as-is
+
+read_csv_cached() returns a DataFrame with the same values as
+pd.read_csv(path, parse_dates=...) (missing dates are NaT, missing strings
+NaN); dictionary / Yes-No columns come back as pandas Categoricals, so
+group them with observed=True. The frame is decoded from the encoded
+columns on a miss too, so its dtypes do not depend on the cache state.
+
+Usage (pre-build a cache):
+    python columnar_cache.py CSV [CSV ...] --parse-dates date
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src/
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+CACHE_DIR = os.path.join(PYTHON_MODULES_DIR, "cache", "columnar")
+
+FORMAT_VERSION = 2       # 2: missing dates stored as NAT_DAY
+YES_NO = ["No", "Yes"]   # bool False / True
+NAT_DAY = np.iinfo(np.int32).min   # day number of a missing date
+
+
+# ---------------------------------------------------
+# Cache location & freshness
+# ---------------------------------------------------
+def cache_path_for(csv_path: str, cache_dir: str = CACHE_DIR) -> str:
+    csv_path = os.path.abspath(csv_path)
+    digest = hashlib.sha1(csv_path.encode("utf-8")).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{name}-{digest}")
+
+
+def _source_signature(csv_path: str, parse_dates) -> dict:
+    stat = os.stat(csv_path)
+    return {
+        "version": FORMAT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "parse_dates": sorted(parse_dates or []),
+    }
+
+
+def _read_meta(path: str):
+    try:
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(csv_path: str, parse_dates=None, cache_dir: str = CACHE_DIR) -> bool:
+    meta = _read_meta(cache_path_for(csv_path, cache_dir))
+    return meta is not None and meta["source"] == _source_signature(csv_path, parse_dates)
+
+
+# ---------------------------------------------------
+# Encoding
+# ---------------------------------------------------
+def _encode_column(series: pd.Series, is_date: bool):
+    """Returns (kind, arrays dict, dictionary list or None)."""
+
+    if is_date:
+        # Code -1 (blank / NaT) would index the last unique date: keep it missing
+        codes, uniques = pd.factorize(series, sort=False)
+        days = pd.to_datetime(uniques).to_numpy(dtype="datetime64[D]").astype(np.int32)
+        return "date", {"values": np.where(codes >= 0, days[codes], NAT_DAY).astype(np.int32)}, None
+
+    if series.dtype == object or pd.api.types.is_string_dtype(series):
+        codes, uniques = pd.factorize(series, sort=True)
+
+        if len(uniques) and set(uniques) <= set(YES_NO) and (codes >= 0).all():
+            return "yes_no", {"values": series.to_numpy() == "Yes"}, None
+
+        return "dictionary", {"codes": codes.astype(np.int32)}, [str(u) for u in uniques]
+
+    return "numeric", {"values": series.to_numpy()}, None
+
+
+def build_cache(csv_path: str, parse_dates=None, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Read the CSV, write its columnar cache and return the encoded columns
+    (in memory, same form as load_columns). If the cache directory is not
+    writable the columns are still returned.
+    """
+
+    df = pd.read_csv(csv_path)
+    parse_dates = list(parse_dates or [])
+
+    columns = {}
+    for col in df.columns:
+        kind, arrays, dictionary = _encode_column(df[col], col in parse_dates)
+        columns[col] = {"kind": kind, **arrays, "dictionary": dictionary}
+
+    target = cache_path_for(csv_path, cache_dir)
+    tmp = f"{target}.tmp-{os.getpid()}"
+
+    try:
+        os.makedirs(tmp, exist_ok=True)
+
+        for col, column in columns.items():
+            part = "codes" if column["kind"] == "dictionary" else "values"
+            np.save(os.path.join(tmp, f"{col}.{part}.npy"), column[part])
+
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({
+                "source": _source_signature(csv_path, parse_dates),
+                "rows": len(df),
+                "columns": [{"name": col, "kind": column["kind"], "dictionary": column["dictionary"]}
+                            for col, column in columns.items()],
+            }, f)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.rename(tmp, target)
+
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return columns
+
+
+# ---------------------------------------------------
+# Loading
+# ---------------------------------------------------
+def load_columns(csv_path: str, parse_dates=None, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Raw encoded columns as memory-mapped arrays, building the cache if needed:
+        {name: {"kind": ..., "values" | "codes": ndarray, "dictionary": [...]}}
+    """
+
+    if not is_fresh(csv_path, parse_dates, cache_dir):
+        build_cache(csv_path, parse_dates, cache_dir)
+
+    path = cache_path_for(csv_path, cache_dir)
+    meta = _read_meta(path)
+    if meta is None:
+        raise OSError(f"Columnar cache for {csv_path} could not be written to {cache_dir}")
+
+    columns = {}
+    for col in meta["columns"]:
+        part = "codes" if col["kind"] == "dictionary" else "values"
+        columns[col["name"]] = {
+            "kind": col["kind"],
+            part: np.load(os.path.join(path, f"{col['name']}.{part}.npy"), mmap_mode="r"),
+            "dictionary": col["dictionary"],
+        }
+
+    return columns
+
+
+def _decode_column(column: dict):
+    kind = column["kind"]
+
+    if kind == "date":
+        values = column["values"]
+        dates = values.astype("datetime64[D]").astype("datetime64[ns]")
+        dates[values == NAT_DAY] = np.datetime64("NaT")
+        return dates
+    if kind == "yes_no":
+        return pd.Categorical.from_codes(column["values"].astype(np.int8), categories=YES_NO)
+    if kind == "dictionary":
+        return pd.Categorical.from_codes(column["codes"], categories=column["dictionary"])
+    return np.asarray(column["values"])
+
+
+def read_csv_cached(csv_path: str, parse_dates=None, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """
+    Drop-in replacement for pd.read_csv(csv_path, parse_dates=parse_dates)
+    that uses the columnar cache when it is fresh and falls back to the
+    CSV (re-building the cache) otherwise. Both paths decode the same
+    encoded columns, so the frame is identical either way.
+    """
+
+    if not is_fresh(csv_path, parse_dates, cache_dir):
+        columns = build_cache(csv_path, parse_dates, cache_dir)
+    else:
+        columns = load_columns(csv_path, parse_dates, cache_dir)
+
+    return pd.DataFrame({name: _decode_column(col) for name, col in columns.items()})
+
+
+# ---------------------------------------------------
+# CLI
+# ---------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build columnar caches for CSV inputs.")
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--parse-dates", nargs="*", default=["date"])
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        parse_dates = [c for c in args.parse_dates if c in pd.read_csv(csv_path, nrows=0).columns]
+        build_cache(csv_path, parse_dates, args.cache_dir)
+        path = cache_path_for(csv_path, args.cache_dir)
+        print(f"💾 {csv_path} -> {path} ({_read_meta(path)['rows']} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Model backend comparison
+------------------------
+Fits every backend of model_backends.py for the forecaster and the risk
+classifier on the same data, saves each the way the training scripts do,
+and reports per backend:
+
+    artifact_bytes   joblib artifact on disk (random_forest also: compiled .forest.joblib)
+    load_ms          pipeline.load_forecaster / load_risk_model, as predict.py loads it
+    single_row_us    one prediction: a 1-day forecast for one cohort
+                     (predict_horizon_many) / one student's label + probabilities
+                     (predict_single_with_proba)
+    batch_ms         --batch cohorts x 7-day forecast (predict_horizon_many) /
+                     --batch students scored (predict_batch_with_proba)
+    score            hold-out score on train_search.py's split: forecaster MAE
+                     (lower is better), risk balanced accuracy (higher is better)
+
+random_forest is listed twice: the sklearn artifact and the compiled
+forest that prediction actually loads (same model, same score). Timings
+are the best of --repeat runs, single-threaded as in production.
+
+Usage:
+    python compare_backends.py                       # training CSVs
+    python compare_backends.py --synthetic 5000      # seeded synthetic data of that size
+    python compare_backends.py --kinds risk --backends random_forest linear --batch 100000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import joblib
+
+import pipeline
+import model_backends
+from columnar_cache import read_csv_cached
+from compiled_forest import export_artifact, forest_path_for
+
+
+# ---------------------------------------------------------
+# Paths
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+REPORT_PATH = os.path.join(PYTHON_MODULES_DIR, "models", "backend_comparison.json")
+
+sys.path.append(os.path.join(BASE_DIR, "benchmarks"))
+
+KINDS = {
+    "forecaster": {
+        "package": "forecasting", "module": "forecaster_model", "class": "DailyAttendanceForecaster",
+        "loader": pipeline.load_forecaster, "metric": "mae",
+    },
+    "risk": {
+        "package": "risk", "module": "risk_model", "class": "StudentRiskClassifier",
+        "loader": pipeline.load_risk_model, "metric": "balanced_accuracy",
+    },
+}
+
+SINGLE_ROW_CALLS = 200   # calls per single-row timing run
+
+
+def _model_class(kind: str):
+    spec = KINDS[kind]
+    return getattr(pipeline.model_module(spec["package"], spec["module"]), spec["class"])
+
+
+# Imported after the model modules are aliased (pipeline.model_module), so its
+# top-level `forecaster_model` / `risk_model` imports resolve to the same classes
+pipeline.model_module("forecasting", "forecaster_model")
+pipeline.model_module("risk", "risk_model")
+import train_search  # noqa: E402
+
+
+# ---------------------------------------------------------
+# Data
+# ---------------------------------------------------------
+def training_data(kind: str, synthetic: int = None):
+    if synthetic:
+        import synthetic_data
+        return synthetic_data.daily_attendance(synthetic) if kind == "forecaster" else synthetic_data.student_risk(synthetic)
+
+    path = train_search.MODEL_KINDS[kind]["train_csv"]
+    return read_csv_cached(path, parse_dates=train_search.MODEL_KINDS[kind]["parse_dates"])
+
+
+def prediction_inputs(kind: str, df, batch: int):
+    """(single-row call, batch call) inputs on seeded data shaped like the training data."""
+
+    rng = np.random.default_rng(42)
+
+    if kind == "forecaster":
+        values = df["attendance_pct"].to_numpy(dtype=float)
+        windows = np.clip(rng.normal(values.mean(), values.std() or 1.0, (batch, 7)), 0, 100)
+        start_dates = np.full(batch, np.datetime64(df["date"].max(), "D") + 1)
+        return (windows[:1], start_dates[:1]), (windows, start_dates)
+
+    features = _model_class("risk")().feature_cols
+    rows = df[features].sample(batch, replace=True, random_state=42).reset_index(drop=True)
+    return rows.iloc[0].to_dict(), rows
+
+
+# ---------------------------------------------------------
+# Timing
+# ---------------------------------------------------------
+def best_seconds(fn, repeat: int) -> float:
+    fn()  # warm-up (lazy imports, caches)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(kind: str, model, single, batch, repeat: int) -> dict:
+    if kind == "forecaster":
+        single_call = lambda: model.predict_horizon_many(*single, 1)
+        batch_call = lambda: model.predict_horizon_many(*batch, 7)
+    else:
+        single_call = lambda: model.predict_single_with_proba(single)
+        batch_call = lambda: model.predict_batch_with_proba(batch)
+
+    def single_run():
+        for _ in range(SINGLE_ROW_CALLS):
+            single_call()
+
+    return {
+        "single_row_us": round(best_seconds(single_run, repeat) / SINGLE_ROW_CALLS * 1e6, 1),
+        "batch_ms": round(best_seconds(batch_call, repeat) * 1e3, 3),
+    }
+
+
+# ---------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------
+def compare_kind(kind: str, df, backends: list, batch: int = 10_000, repeat: int = 5, work_dir: str = None) -> list:
+    spec = KINDS[kind]
+    X, y, n_train = train_search.validation_split(kind, df)
+    single, batch_input = prediction_inputs(kind, df, batch)
+
+    rows = []
+    for backend in backends:
+        print(f"  ⏱ {kind} / {backend}")
+        wrapper = _model_class(kind)(backend=backend)
+
+        # Hold-out score: fit on the train rows of the split
+        estimator = wrapper.build_model(n_jobs=1)
+        start = time.perf_counter()
+        estimator.fit(X[:n_train], y[:n_train])
+        fit_seconds = time.perf_counter() - start
+        score = train_search.validation_score(kind, y[n_train:], estimator.predict(X[n_train:]))
+
+        # Artifact: fit on all rows and save like the training scripts
+        wrapper.fit(df, n_jobs=1)
+        path = os.path.join(work_dir, f"{kind}_{backend}.joblib")
+        joblib.dump(wrapper, path, compress=0)
+
+        artifacts = [(backend, path)]
+        if model_backends.is_forest(wrapper.model):
+            export_artifact(wrapper, path, kind)
+            artifacts.append((f"{backend} (compiled)", forest_path_for(path)))
+
+        for name, artifact in artifacts:
+            load_seconds = best_seconds(lambda: spec["loader"](artifact), repeat)
+            model = spec["loader"](artifact)
+
+            rows.append({
+                "kind": kind,
+                "backend": name,
+                "artifact_bytes": os.path.getsize(artifact),
+                "load_ms": round(load_seconds * 1e3, 3),
+                **measure(kind, model, single, batch_input, repeat),
+                "metric": spec["metric"],
+                "score": round(score, 4),
+                "fit_seconds": round(fit_seconds, 4),
+            })
+
+    return rows
+
+
+def run_comparison(kinds: list, backends: list, synthetic: int = None, batch: int = 10_000,
+                   repeat: int = 5) -> dict:
+    work_dir = tempfile.mkdtemp(prefix="backends_")
+    try:
+        results, data_rows = [], {}
+        for kind in kinds:
+            df = training_data(kind, synthetic)
+            data_rows[kind] = len(df)
+            results += compare_kind(kind, df, backends, batch, repeat, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "data": f"synthetic ({synthetic} rows)" if synthetic else "training CSVs",
+        "rows": data_rows,
+        "validation_fraction": train_search.VALIDATION_FRACTION,
+        "batch": batch,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Compare model backends on size, load time, latency and accuracy.")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(KINDS), default=sorted(KINDS))
+    parser.add_argument("--backends", nargs="+", choices=sorted(model_backends.BACKENDS),
+                        default=list(model_backends.BACKENDS))
+    parser.add_argument("--synthetic", type=int, help="use N rows of seeded synthetic data instead of the training CSVs")
+    parser.add_argument("--batch", type=int, default=10_000, help="cohorts / students in the batch timing")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is kept)")
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    print(f"🚀 Comparing {', '.join(args.backends)}...")
+    report = run_comparison(args.kinds, args.backends, args.synthetic, args.batch, args.repeat)
+
+    print(f"\n  {'kind':<10} {'backend':<26} {'artifact':>10} {'load':>9} {'1 row':>9} "
+          f"{'batch':>10}   score")
+    for r in report["results"]:
+        print(f"  {r['kind']:<10} {r['backend']:<26} {r['artifact_bytes'] / 2**10:>8.0f}KB "
+              f"{r['load_ms']:>7.1f}ms {r['single_row_us']:>7.0f}us {r['batch_ms']:>8.1f}ms   "
+              f"{r['metric']}={r['score']:.4f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n💾 Comparison report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
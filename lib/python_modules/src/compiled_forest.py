@@ -0,0 +1,284 @@
+"""
+Compiled forest inference
+-------------------------
+Flattens a fitted sklearn RandomForestRegressor / RandomForestClassifier
+into contiguous NumPy arrays (feature, threshold, children, value) and
+evaluates every tree for a whole batch at once with a vectorized walk.
+
+This skips sklearn's input validation and per-tree Python dispatch,
+which dominate single-row calls such as predict_next_day or
+predict_single. The outputs match sklearn's predict / predict_proba.
+
+A compiled model can replace the sklearn artifact anywhere
+pipeline.load_forecaster / load_risk_model is used. Two formats:
+
+    <name>.forest.joblib   uncompressed joblib; loaded with mmap_mode="r", so
+                           the tree arrays are mapped from the page cache and
+                           shared by every process that serves the model
+    <name>.npz             uncompressed .npz (read into private memory)
+
+A forecaster with a direct multi-horizon model gets a second file next to
+it, <name>.direct.forest.joblib (or .direct.npz), loaded alongside; it also
+holds the direct model's interval calibration (held-out residuals).
+
+(sklearn's own forests cannot be shared this way: Tree.__setstate__ copies
+the node arrays into private buffers even when joblib memory-maps them.)
+
+Usage (export the trained artifacts; the *_train.py scripts do this too):
+    python compiled_forest.py
+    python compiled_forest.py --forecaster models/daily_forecaster.joblib --risk models/student_risk_classifier.joblib
+    python compiled_forest.py --format npz
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+class CompiledForest:
+    """Array-based drop-in for a fitted RandomForest* (predict / predict_proba)."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 feature_names, classes=None):
+        self.feature = feature          # (n_nodes,) int32, 0 for leaves
+        self.threshold = threshold      # (n_nodes,) float64, +inf for leaves
+        self.left = left                # (n_nodes,) int32, leaves point to themselves
+        self.right = right              # (n_nodes,) int32, leaves point to themselves
+        self.value = value              # (n_nodes,) regression / (n_nodes, n_classes) class proba
+        self.roots = roots              # (n_trees,) int32 root node of each tree
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.classes_ = classes
+        self.calibration = None         # held-out residuals saved with the forest, if any
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+
+    # ---------------------------------------------------
+    # Export from sklearn
+    # ---------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        classes = getattr(forest, "classes_", None)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves, so the walk needs no branching
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset)
+
+            if classes is not None:
+                counts = tree.value[:, 0, :]
+                values.append(counts / counts.sum(axis=1, keepdims=True))
+            else:
+                values.append(tree.value[:, 0, 0])
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            feature_names=forest.feature_names_in_,
+            classes=None if classes is None else np.asarray(classes),
+        )
+
+    # ---------------------------------------------------
+    # Inference
+    # ---------------------------------------------------
+    def _as_array(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)].to_numpy()
+
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32).astype(np.float64)
+
+    def apply(self, X, chunk_size: int = 256) -> np.ndarray:
+        """
+        Leaf node index of every row in every tree, shape (n_trees, n_rows).
+
+        All trees advance one level per step for a block of rows; blocks of
+        `chunk_size` rows keep the (n_trees, rows) temporaries cache-sized.
+        """
+
+        X = self._as_array(X)
+        n_rows, n_features = X.shape
+        leaves = np.empty((len(self.roots), n_rows), dtype=np.int32)
+
+        for start in range(0, n_rows, chunk_size):
+            block = X[start:start + chunk_size]
+            flat = block.ravel()
+            row_offset = (np.arange(block.shape[0]) * n_features)[None, :]
+
+            node = np.repeat(self.roots[:, None], block.shape[0], axis=1)
+            for _ in range(self.max_depth):
+                x = flat.take(row_offset + self.feature.take(node))
+                node = np.where(x <= self.threshold.take(node), self.left.take(node), self.right.take(node))
+
+            leaves[:, start:start + chunk_size] = node
+
+        return leaves
+
+    def _tree_mean(self, leaves: np.ndarray) -> np.ndarray:
+        # Accumulate tree by tree, in sklearn's order, so rounding matches
+        total = np.zeros((leaves.shape[1],) + self.value.shape[1:], dtype=np.float64)
+        for tree_leaves in leaves:
+            total += self.value.take(tree_leaves, axis=0)
+        return total / len(self.roots)
+
+    def predict_trees(self, X) -> np.ndarray:
+        """Every tree's own prediction: (n_trees, n_rows) or (n_trees, n_rows, n_classes)."""
+        return self.value.take(self.apply(X), axis=0)
+
+    def predict_proba(self, X) -> np.ndarray:
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for compiled classifiers")
+        return self._tree_mean(self.apply(X))
+
+    def predict(self, X) -> np.ndarray:
+        if self.is_classifier:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self._tree_mean(self.apply(X))
+
+    # ---------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------
+    def save(self, path: str, wrapper: str, calibration=None):
+        """
+        wrapper: "forecaster" or "risk" — which model class to rebuild on load.
+        calibration: optional residual array stored with the forest.
+        The format follows the extension (.joblib or .npz).
+        """
+
+        arrays = dict(
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, value=self.value, roots=self.roots,
+            max_depth=np.asarray(self.max_depth),
+            feature_names=self.feature_names_in_.astype(str),
+            wrapper=np.asarray(wrapper),
+        )
+        if self.is_classifier:
+            arrays["classes"] = self.classes_.astype(str)
+        if calibration is not None:
+            arrays["calibration"] = np.asarray(calibration, dtype=np.float64)
+
+        if path.endswith(".joblib"):
+            import joblib
+
+            # Plain dict of arrays (no class references); compress=0 keeps each
+            # array a raw, aligned block that joblib.load(mmap_mode=...) maps
+            joblib.dump(arrays, path, compress=0)
+            return
+
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = "r"):
+        """
+        Returns (CompiledForest, wrapper name). mmap_mode only applies to
+        .joblib artifacts (read-only mapping by default).
+        """
+
+        if path.endswith(".joblib"):
+            import joblib
+            return cls._from_arrays(joblib.load(path, mmap_mode=mmap_mode))
+
+        with np.load(path, allow_pickle=False) as data:
+            return cls._from_arrays(data)
+
+    @classmethod
+    def _from_arrays(cls, data):
+        forest = cls(
+            feature=data["feature"], threshold=data["threshold"],
+            left=data["left"], right=data["right"], value=data["value"], roots=data["roots"],
+            max_depth=data["max_depth"],
+            feature_names=data["feature_names"].astype(object),
+            classes=data["classes"].astype(object) if "classes" in data else None,
+        )
+        if "calibration" in data:
+            forest.calibration = np.array(data["calibration"])
+        return forest, str(data["wrapper"])
+
+
+def forest_path_for(model_path: str, fmt: str = "joblib") -> str:
+    """models/daily_forecaster.joblib -> models/daily_forecaster.forest.joblib (or .npz)"""
+    stem = os.path.splitext(model_path)[0]
+    return f"{stem}.forest.joblib" if fmt == "joblib" else f"{stem}.npz"
+
+
+def direct_path_for(forest_path: str) -> str:
+    """models/daily_forecaster.forest.joblib -> models/daily_forecaster.direct.forest.joblib (.npz alike)"""
+    for suffix in (".forest.joblib", ".npz"):
+        if forest_path.endswith(suffix):
+            return forest_path[:-len(suffix)] + ".direct" + suffix
+    raise ValueError(f"Not a compiled forest path: {forest_path}")
+
+
+def export_artifact(model, model_path: str, wrapper: str, fmt: str = "joblib") -> "CompiledForest":
+    """
+    Compile a fitted model wrapper and save it next to its sklearn artifact
+    (plus its direct model, if it has one; a stale direct file is removed).
+    """
+
+    compiled = CompiledForest.from_sklearn(model.model)
+    compiled.save(forest_path_for(model_path, fmt), wrapper)
+
+    direct_model = getattr(model, "direct_model", None)
+    direct_path = direct_path_for(forest_path_for(model_path, fmt))
+    if direct_model is not None:
+        CompiledForest.from_sklearn(direct_model).save(direct_path, wrapper,
+                                                       getattr(model, "direct_calibration", None))
+    elif os.path.exists(direct_path):
+        os.remove(direct_path)
+
+    return compiled
+
+
+# ---------------------------------------------------
+# CLI: export the trained artifacts
+# ---------------------------------------------------
+def main():
+    import pipeline
+
+    parser = argparse.ArgumentParser(description="Compile trained forests into array form.")
+    parser.add_argument("--forecaster", default=pipeline.FORECASTER_MODEL_PATH)
+    parser.add_argument("--risk", default=pipeline.RISK_MODEL_PATH)
+    parser.add_argument("--format", choices=["joblib", "npz"], default="joblib",
+                        help="joblib: memory-mappable .forest.joblib (default); npz: .npz")
+    args = parser.parse_args()
+
+    for path, loader, wrapper in [
+        (args.forecaster, pipeline.load_forecaster, "forecaster"),
+        (args.risk, pipeline.load_risk_model, "risk"),
+    ]:
+        compiled = export_artifact(loader(path), path, wrapper, args.format)
+        out_path = forest_path_for(path, args.format)
+
+        print(f"💾 {path} -> {out_path} "
+              f"({len(compiled.roots)} trees, {len(compiled.feature)} nodes, depth {compiled.max_depth})")
+        if os.path.exists(direct_path_for(out_path)):
+            print(f"💾 {path} (direct model) -> {direct_path_for(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Feature distribution summaries and drift check
+----------------------------------------------
+A model artifact keeps a small summary of the features it was trained on
+(`training_profile`), so new data can be compared with it without the old
+training set:
+
+    per feature: n, sum, sumsq, min, max
+                 edges   inner cut points (training deciles, de-duplicated)
+                 counts  rows per bin: (-inf, e0], (e0, e1], ..., (e_k, inf)
+
+Summaries are mergeable (counts and sums add up over the fixed edges), so
+an incrementally updated model updates its profile with the new rows.
+
+Drift is measured per feature with the population stability index
+    PSI = sum((p_new - p_ref) * ln(p_new / p_ref))  over the bins
+and mapped to a retraining decision:
+
+    max PSI <  threshold   -> "incremental"  (warm-start a few trees on the new rows)
+    max PSI >= threshold   -> "full"         (distribution moved: rebuild the forest)
+
+A handful of new rows gives a large PSI by sampling noise alone (for n rows
+over k bins it is about chi2(k - 1) / n), so the threshold is
+max(PSI_RETRAIN, noise level at NOISE_QUANTILE) and the new-row shares are
+smoothed with half a row per bin. With that smoothing a week of ordinary
+days rarely passes 1.0 and 7 rows in a single bin top out near 1.4, while
+the chi2 bound is 3.1 for 7 rows (nothing could reach it), so the
+threshold is capped at PSI_NOISE_CAP. PSI_WARN only flags features in the report.
+
+PSI only sees which bins the rows land in, so a collapse into the lowest
+bin looks like any other skew. The mean of the new rows is also compared
+with the training mean (from n, sum, sumsq), in training standard
+deviations:
+
+    shift = |mean_new - mean_ref| / std_ref  >=  max(MEAN_SHIFT, z / sqrt(n))   -> drifted
+
+Labels (check_labels) get the same PSI test over their class shares.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm
+
+
+N_BINS = 10
+PSI_WARN = 0.1
+PSI_RETRAIN = 0.25
+PSI_FLOOR = 1e-4   # reference bin share used instead of 0 (empty bins)
+NOISE_QUANTILE = 0.99
+PSI_NOISE_CAP = 1.2  # most the noise allowance may raise the PSI threshold to
+MEAN_SHIFT = 1.0     # training standard deviations
+
+
+def _bin_counts(values: np.ndarray, edges) -> list:
+    bins = np.searchsorted(np.asarray(edges, dtype=float), values, side="left")
+    return np.bincount(bins, minlength=len(edges) + 1).tolist()
+
+
+def summarize(X: pd.DataFrame, n_bins: int = N_BINS) -> dict:
+    """Summary of every column of X (edges taken from X's own quantiles)."""
+
+    summary = {}
+    for col in X.columns:
+        values = X[col].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(values, quantiles)).tolist() if len(values) else []
+
+        summary[col] = {
+            "n": int(len(values)),
+            "sum": float(values.sum()),
+            "sumsq": float((values ** 2).sum()),
+            "min": float(values.min()) if len(values) else None,
+            "max": float(values.max()) if len(values) else None,
+            "edges": edges,
+            "counts": _bin_counts(values, edges),
+        }
+    return summary
+
+
+def update(summary: dict, X: pd.DataFrame) -> dict:
+    """New summary with the rows of X added (edges unchanged)."""
+
+    merged = {}
+    for col, ref in summary.items():
+        values = X[col].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            merged[col] = dict(ref)
+            continue
+
+        merged[col] = {
+            "n": ref["n"] + int(len(values)),
+            "sum": ref["sum"] + float(values.sum()),
+            "sumsq": ref["sumsq"] + float((values ** 2).sum()),
+            "min": min(ref["min"], float(values.min())) if ref["min"] is not None else float(values.min()),
+            "max": max(ref["max"], float(values.max())) if ref["max"] is not None else float(values.max()),
+            "edges": ref["edges"],
+            "counts": (np.asarray(ref["counts"]) + _bin_counts(values, ref["edges"])).tolist(),
+        }
+    return merged
+
+
+def psi(reference: dict, values: np.ndarray) -> float:
+    """Population stability index of `values` against one feature summary."""
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values) or not reference["n"]:
+        return 0.0
+
+    counts = np.asarray(_bin_counts(values, reference["edges"]))
+    expected = np.maximum(np.asarray(reference["counts"]) / reference["n"], PSI_FLOOR)
+    actual = (counts + 0.5) / (len(values) + 0.5 * len(counts))
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def noise_level(n_rows: int, n_bins: int, quantile: float = NOISE_QUANTILE) -> float:
+    """PSI that n_rows drawn from the reference distribution stay under with probability `quantile`."""
+
+    if n_rows <= 0 or n_bins < 2:
+        return 0.0
+    return float(chi2.ppf(quantile, n_bins - 1) / n_rows)
+
+
+def psi_threshold(n_rows: int, n_bins: int, retrain: float = PSI_RETRAIN) -> float:
+    """PSI at which n_rows count as drifted: the noise level, capped at PSI_NOISE_CAP."""
+
+    return max(retrain, min(noise_level(n_rows, n_bins), PSI_NOISE_CAP))
+
+
+def mean_shift(reference: dict, values: np.ndarray) -> float:
+    """|mean of values - training mean| in training standard deviations."""
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values) or not reference["n"]:
+        return 0.0
+
+    mean = reference["sum"] / reference["n"]
+    std = np.sqrt(max(reference["sumsq"] / reference["n"] - mean ** 2, 0.0))
+    if std == 0:
+        # Constant in training: any other value is a shift
+        return 0.0 if np.all(values == mean) else float("inf")
+    return float(abs(values.mean() - mean) / std)
+
+
+def mean_shift_threshold(n_rows: int, quantile: float = NOISE_QUANTILE) -> float:
+    """Shift that the mean of n_rows reference rows stays under with probability `quantile`, at least MEAN_SHIFT."""
+
+    if n_rows <= 0:
+        return MEAN_SHIFT
+    return max(MEAN_SHIFT, float(norm.ppf(0.5 + quantile / 2) / np.sqrt(n_rows)))
+
+
+def check(summary: dict, X: pd.DataFrame, warn: float = PSI_WARN, retrain: float = PSI_RETRAIN,
+          skip=()) -> dict:
+    """
+    Compare new rows X with a training summary (features in `skip` are
+    left out, e.g. calendar columns that move with time by design). A
+    feature drifts when its PSI or its mean shift reaches the threshold.
+
+    Returns:
+        {"psi": {feature: value}, "threshold": {feature: value}, "max_psi",
+         "mean_shift": {feature: value}, "mean_threshold": {feature: value},
+         "warn": [features], "drifted": [features], "decision": "incremental" | "full"}
+    """
+
+    scores, thresholds, shifts, shift_thresholds = {}, {}, {}, {}
+    for col, ref in summary.items():
+        if col in skip:
+            continue
+        values = X[col].to_numpy(dtype=float)
+        n_rows = int((~np.isnan(values)).sum())
+        scores[col] = round(psi(ref, values), 4)
+        thresholds[col] = round(psi_threshold(n_rows, len(ref["counts"]), retrain), 4)
+        shifts[col] = round(mean_shift(ref, values), 4)
+        shift_thresholds[col] = round(mean_shift_threshold(n_rows), 4)
+
+    drifted = [col for col in scores
+               if scores[col] >= thresholds[col] or shifts[col] >= shift_thresholds[col]]
+
+    return {
+        "psi": scores,
+        "threshold": thresholds,
+        "max_psi": max(scores.values(), default=0.0),
+        "mean_shift": shifts,
+        "mean_threshold": shift_thresholds,
+        "warn": [col for col, value in scores.items() if value >= warn],
+        "drifted": drifted,
+        "decision": "full" if drifted else "incremental",
+    }
+
+
+def check_labels(reference: dict, new: dict, retrain: float = PSI_RETRAIN) -> dict:
+    """
+    PSI of new label counts against the training label counts
+    ({label: count} both), with the same noise threshold as the features.
+
+    Returns:
+        {"psi", "threshold", "drifted": bool}
+    """
+
+    labels = sorted(set(reference) | set(new), key=str)
+    ref = np.array([reference.get(label, 0) for label in labels], dtype=float)
+    counts = np.array([new.get(label, 0) for label in labels], dtype=float)
+    if not ref.sum() or not counts.sum():
+        return {"psi": 0.0, "threshold": retrain, "drifted": False}
+
+    expected = np.maximum(ref / ref.sum(), PSI_FLOOR)
+    actual = (counts + 0.5) / (counts.sum() + 0.5 * len(labels))
+    value = float(np.sum((actual - expected) * np.log(actual / expected)))
+    threshold = psi_threshold(int(counts.sum()), len(labels), retrain)
+
+    return {"psi": round(value, 4), "threshold": round(threshold, 4), "drifted": value >= threshold}
@@ -0,0 +1,119 @@
+"""
+Multi-cohort forecasting
+------------------------
+Forecasts many cohort series (schools, grades...) from one long-format frame:
+
+    cohort_id, date, attendance_pct, weekday, month, is_weekend
+
+Only the last ROLLING_WINDOW values of each cohort are needed, so the
+history is reduced to a small (n_cohorts, 7) window matrix up front.
+Cohorts are then split across a process pool; every worker loads the
+model once and runs DailyAttendanceForecaster.predict_horizon_many, i.e.
+one batched forest pass per horizon step for all of its cohorts, which
+also yields the per-tree prediction intervals.
+
+With strategy="direct" there is no step loop at all: every cohort and
+day is one direct-model pass, so the whole forecast stays in this process
+(one call beats splitting it across workers).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Model loaded once per worker process (see _init_worker)
+_forecaster = None
+
+
+# ---------------------------------------------------
+# History -> per-cohort windows
+# ---------------------------------------------------
+def history_windows(df: pd.DataFrame, window: int = 7):
+    """
+    Returns:
+        cohort_ids:  (n_cohorts,) cohort ids
+        windows:     (n_cohorts, window) last values, oldest -> newest, NaN-padded
+        start_dates: (n_cohorts,) datetime64[D], the day after each cohort's last date
+    """
+
+    # observed=True: cohort_id is a Categorical when read through columnar_cache
+    df = df.sort_values(["cohort_id", "date"])
+    tail = df.groupby("cohort_id", sort=False, observed=True).tail(window)
+
+    cohort_codes, cohort_ids = pd.factorize(tail["cohort_id"])
+    position = tail.groupby("cohort_id", sort=False, observed=True).cumcount(ascending=False).to_numpy()
+
+    windows = np.full((len(cohort_ids), window), np.nan)
+    windows[cohort_codes, window - 1 - position] = tail["attendance_pct"].to_numpy(dtype=float)
+
+    last_dates = (
+        pd.to_datetime(tail["date"]).groupby(cohort_codes).max()
+        .to_numpy(dtype="datetime64[D]")
+    )
+
+    return np.asarray(cohort_ids), windows, last_dates + 1
+
+
+# ---------------------------------------------------
+# Worker side
+# ---------------------------------------------------
+def _init_worker(model_path: str):
+    global _forecaster
+    import pipeline
+
+    _forecaster = pipeline.load_forecaster(model_path)
+
+
+def _forecast_chunk(windows: np.ndarray, start_dates: np.ndarray, n_days: int, level: float,
+                    strategy: str = "recursive") -> np.ndarray:
+    """(3, n_cohorts, n_days): prediction, lower, upper."""
+    return np.stack(_forecaster.predict_horizon_many(windows, start_dates, n_days, level=level, strategy=strategy))
+
+
+# ---------------------------------------------------
+# Driver
+# ---------------------------------------------------
+def forecast_cohorts(df: pd.DataFrame, model_path: str, n_days: int = 7, workers: int = None,
+                     level: float = 0.95, strategy: str = "recursive") -> pd.DataFrame:
+    """
+    Forecast n_days for every cohort in df, with a `level` interval,
+    "recursive" (process pool) or "direct" (one call).
+
+    Returns a long frame:
+        cohort_id, date, predicted_attendance, lower, upper
+    """
+
+    cohort_ids, windows, start_dates = history_windows(df)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(cohort_ids)))
+    if strategy == "direct":
+        workers = 1
+    chunks = np.array_split(np.arange(len(cohort_ids)), workers)
+
+    if workers == 1:
+        _init_worker(model_path)
+        predictions = _forecast_chunk(windows, start_dates, n_days, level, strategy)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path,)) as pool:
+            parts = pool.map(
+                _forecast_chunk,
+                [windows[idx] for idx in chunks],
+                [start_dates[idx] for idx in chunks],
+                [n_days] * len(chunks),
+                [level] * len(chunks),
+            )
+            predictions = np.concatenate(list(parts), axis=1)
+
+    dates = start_dates[:, None] + np.arange(n_days)
+
+    return pd.DataFrame({
+        "cohort_id": np.repeat(cohort_ids, n_days),
+        "date": pd.to_datetime(dates.ravel()),
+        "predicted_attendance": predictions[0].ravel(),
+        "lower": predictions[1].ravel(),
+        "upper": predictions[2].ravel(),
+    })
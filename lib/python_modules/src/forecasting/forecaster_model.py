@@ -1,6 +1,10 @@
+from collections import deque
+
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
+from profiling import traced, rows_of_arg
+import drift
+import model_backends
 
 
 class DailyAttendanceForecaster:
@@ -9,12 +13,43 @@ class DailyAttendanceForecaster:
     ---------------------------------------------------
     This class handles:
       - feature engineering (lags, rolling averages)
-      - training the forecasting model
+      - training the forecasting model (full, or warm-start incremental);
+        the estimator comes from a backend (model_backends.py)
       - predicting next day's attendance
+      - multi-day horizon forecasts, for one or many cohorts, either
+        "recursive" (the next-day model, predictions fed back as lags) or
+        "direct" (a second model that takes the horizon h as a feature and
+        only what is known at the forecast origin, so every day of every
+        series comes from one batched predict call)
     """
 
-    def __init__(self):
+    ROLLING_WINDOW = 7
+    STRATEGIES = ("recursive", "direct")
+    DIRECT_HORIZON = 90      # longest horizon the direct model is trained for
+    INCREMENTAL_TREES = 50   # trees added (and oldest retired) per incremental update
+    # Not drift-checked: calendar columns move with new days by design; the
+    # 7-day mean overlaps across a week's rows (about one independent value
+    # per week) and is covered by the target, which drift_check tests directly
+    DRIFT_SKIP = ("weekday", "month", "is_weekend", "rolling_mean_7")
+
+    def __init__(self, backend: str = model_backends.DEFAULT_BACKEND):
+        self.backend = backend
         self.model = None
+
+        # Centered training residuals, for intervals of backends without
+        # per-tree predictions (see tree_predictions)
+        self.residuals = None
+
+        # Direct multi-horizon model (fit_direct), same backend
+        self.direct_model = None
+
+        # Held-out residuals of the direct model, actual - forecast, shape
+        # (n_origins, horizon) with NaN where no actual was observed (see
+        # calibrate_direct); direct intervals are their per-horizon quantiles
+        self.direct_calibration = None
+
+        # Summary of the training features and target (see drift.py), saved with the artifact
+        self.training_profile = None
         self.feature_cols = [
             "weekday",
             "month",
@@ -24,9 +59,22 @@ class DailyAttendanceForecaster:
             "rolling_mean_7"
         ]
 
+        # Direct model: horizon h, the target day's calendar, and the lags
+        # as of the forecast origin (the last observed day)
+        self.direct_feature_cols = [
+            "horizon",
+            "weekday",
+            "month",
+            "is_weekend",
+            "attendance_lag1",
+            "attendance_lag2",
+            "rolling_mean_7"
+        ]
+
     # ---------------------------------------------------
     # Feature engineering
     # ---------------------------------------------------
+    @traced("forecaster.add_features", rows=rows_of_arg(1))
     def add_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add lag & rolling features required for the model."""
         df = df.sort_values("date").copy()
@@ -35,7 +83,7 @@ class DailyAttendanceForecaster:
         df["attendance_lag2"] = df["attendance_pct"].shift(2)
 
         df["rolling_mean_7"] = (
-            df["attendance_pct"].rolling(window=7, min_periods=1).mean()
+            df["attendance_pct"].rolling(window=self.ROLLING_WINDOW, min_periods=1).mean()
         )
 
         return df
@@ -43,31 +91,264 @@ class DailyAttendanceForecaster:
     # ---------------------------------------------------
     # Training
     # ---------------------------------------------------
-    def fit(self, df: pd.DataFrame):
+    def training_matrix(self, df: pd.DataFrame, since=None):
         """
-        Train the RandomForestRegressor using the preprocessed daily DataFrame.
-        DataFrame must contain:
-            date, attendance_pct, weekday, month, is_weekend
+        Feature matrix X and target y used for training (initial lag rows dropped).
+        With `since`, only rows dated after it; their lags still come from
+        the earlier history in df.
         """
 
         df = self.add_features(df)
         df = df.dropna()  # drop initial lag rows
 
-        X = df[self.feature_cols]
-        y = df["attendance_pct"]
+        if since is not None:
+            df = df[df["date"] > pd.Timestamp(since)]
 
-        self.model = RandomForestRegressor(
-            n_estimators=250,
-            random_state=42
-        )
+        return df[self.feature_cols], df["attendance_pct"]
+
+    def build_model(self, n_jobs=None, **params):
+        """Unfitted estimator of self.backend; without params, its production configuration."""
+
+        backend = getattr(self, "backend", model_backends.DEFAULT_BACKEND)  # old artifacts: forest
+        return model_backends.build_estimator("regressor", backend, n_jobs=n_jobs, **params)
 
+    def fit(self, df: pd.DataFrame, n_jobs=None, **params):
+        """
+        Train the backend's regressor using the preprocessed daily DataFrame.
+        DataFrame must contain:
+            date, attendance_pct, weekday, month, is_weekend
+
+        n_jobs only parallelizes tree construction (-1 = every core); the
+        saved model predicts single-threaded, which is faster for the small
+        inputs it sees. Extra params go to build_model.
+        """
+
+        X, y = self.training_matrix(df)
+
+        self.model = self.build_model(n_jobs=n_jobs, **params)
         self.model.fit(X, y)
+        model_backends.set_n_jobs(self.model, None)
+
+        self.residuals = None
+        if not model_backends.is_forest(self.model):
+            residuals = y.to_numpy(dtype=float) - self.model.predict(X)
+            self.residuals = residuals - residuals.mean()
+
+        self.training_profile = {
+            "n_rows": len(X),
+            "trained_until": str(pd.Timestamp(df["date"].max()).date()),
+            "incremental_updates": 0,
+            "features": drift.summarize(X),
+            "target": drift.summarize(y.to_frame()),
+        }
 
         return self.model
 
+    # ---------------------------------------------------
+    # Incremental retraining
+    # ---------------------------------------------------
+    def drift_check(self, X_new: pd.DataFrame, y_new: pd.Series = None) -> dict:
+        """
+        Compare new training rows (and, with y_new, their targets) with the
+        stored training profile (drift.check). decision "full" means: refit
+        from scratch.
+        """
+
+        profile = getattr(self, "training_profile", None)  # None for old artifacts
+        if profile is None:
+            return {"decision": "full", "reason": "artifact has no training profile"}
+        if len(X_new) == 0:
+            return {"decision": "none", "reason": "no new rows"}
+
+        report = drift.check(profile["features"], X_new, skip=self.DRIFT_SKIP)
+
+        # Profiles from before the target summary only check the features
+        if y_new is not None and "target" in profile:
+            target = drift.check(profile["target"], y_new.to_frame())
+            for key in ("psi", "threshold", "mean_shift", "mean_threshold"):
+                report[key].update(target[key])
+            report["max_psi"] = max(report["max_psi"], target["max_psi"])
+            report["warn"] += target["warn"]
+            report["drifted"] += target["drifted"]
+            report["decision"] = "full" if report["drifted"] else "incremental"
+
+        if report["drifted"]:
+            report["reason"] = f"drift in {', '.join(report['drifted'])}"
+        return report
+
+    def fit_incremental(self, df: pd.DataFrame, since=None, n_trees: int = INCREMENTAL_TREES,
+                        replace: bool = True, n_jobs=None):
+        """
+        Warm start: grow n_trees new trees on the rows dated after `since`
+        (default: the last training day in the profile) and, with replace,
+        retire the n_trees oldest ones so the forest keeps its size and
+        follows recent data. df is the full history (lags need it).
+
+        Needs the sklearn random_forest artifact (not a CompiledForest).
+        """
+
+        if not model_backends.is_forest(self.model):
+            raise ValueError("Incremental training needs the sklearn random_forest model "
+                             "(not a compiled forest or another backend).")
+        if getattr(self, "training_profile", None) is None:
+            raise ValueError("Artifact has no training profile; refit it once with fit().")
+
+        since = since or self.training_profile["trained_until"]
+        X, y = self.training_matrix(df, since=since)
+        if len(X) == 0:
+            raise ValueError(f"No training rows dated after {since}.")
+
+        n_before = len(self.model.estimators_)
+        self.model.set_params(warm_start=True, n_estimators=n_before + n_trees, n_jobs=n_jobs)
+        self.model.fit(X, y)
+        self.model.set_params(warm_start=False, n_jobs=None)
+
+        if replace:
+            self.model.estimators_ = self.model.estimators_[n_trees:]
+            self.model.set_params(n_estimators=len(self.model.estimators_))
+
+        profile = self.training_profile
+        self.training_profile = {
+            "n_rows": profile["n_rows"] + len(X),
+            "trained_until": str(pd.Timestamp(df["date"].max()).date()),
+            "incremental_updates": profile.get("incremental_updates", 0) + 1,
+            "features": drift.update(profile["features"], X),
+            **({"target": drift.update(profile["target"], y.to_frame())} if "target" in profile else {}),
+        }
+
+        return self.model
+
+    # ---------------------------------------------------
+    # Direct multi-horizon training
+    # ---------------------------------------------------
+    def window_features(self, window: np.ndarray):
+        """
+        (attendance_lag1, attendance_lag2, rolling_mean_7) of (n_series,
+        ROLLING_WINDOW) windows, oldest -> newest, NaN-padded on the left.
+        """
+
+        # Rolling mean accumulated oldest -> newest, like sum(deque)
+        known = ~np.isnan(window)
+        total = np.zeros(len(window))
+        for k in range(self.ROLLING_WINDOW):
+            total += np.where(known[:, k], window[:, k], 0.0)
+
+        return window[:, -1], window[:, -2], total / known.sum(axis=1)
+
+    @staticmethod
+    def calendar_features(days: np.ndarray):
+        """(weekday, month, is_weekend) of datetime64[D] days."""
+
+        weekday = (days.astype(np.int64) + 3) % 7        # 1970-01-01 was a Thursday
+        month = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        return weekday, month, (weekday >= 5).astype(int)
+
+    def direct_training_matrix(self, df: pd.DataFrame, max_horizon: int = DIRECT_HORIZON):
+        """
+        Direct-model X and y: one row per (origin, h) with an observed
+        target h days after the origin's last observed day. Lags come only
+        from days up to that origin, exactly what predict_direct_many sees.
+        """
+
+        series = df.sort_values("date")
+        days = series["date"].to_numpy().astype("datetime64[D]")
+        values = series["attendance_pct"].to_numpy(dtype=float)
+
+        # Window of the last ROLLING_WINDOW values up to and including each day
+        padded = np.concatenate([np.full(self.ROLLING_WINDOW - 1, np.nan), values])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.ROLLING_WINDOW)
+        lag1, lag2, rolling = self.window_features(windows)
+
+        # Pairs (origin i, horizon h) whose target day exists in the series
+        origin = np.repeat(np.arange(1, len(days)), max_horizon)     # >= 2 known days
+        horizon = np.tile(np.arange(1, max_horizon + 1), len(days) - 1)
+        target_day = days[origin] + horizon
+        position = np.minimum(np.searchsorted(days, target_day), len(days) - 1)
+        observed = days[position] == target_day
+
+        origin, horizon, position = origin[observed], horizon[observed], position[observed]
+        weekday, month, is_weekend = self.calendar_features(days[position])
+
+        X = pd.DataFrame({
+            "horizon": horizon,
+            "weekday": weekday,
+            "month": month,
+            "is_weekend": is_weekend,
+            "attendance_lag1": lag1[origin],
+            "attendance_lag2": lag2[origin],
+            "rolling_mean_7": rolling[origin],
+        })[self.direct_feature_cols]
+
+        return X, pd.Series(values[position], name="attendance_pct")
+
+    def fit_direct(self, df: pd.DataFrame, max_horizon: int = DIRECT_HORIZON, n_jobs=None, **params):
+        """
+        Train the direct multi-horizon model (same backend as fit; params
+        override model_backends.direct_params). Horizons past the longest
+        one observed in df reuse what was learnt for the longest: trees do
+        not extrapolate in h.
+
+        DataFrame must contain:
+            date, attendance_pct, weekday, month, is_weekend
+        """
+
+        X, y = self.direct_training_matrix(df, max_horizon)
+        if len(X) == 0:
+            raise ValueError("Not enough history to train the direct model.")
+
+        backend = getattr(self, "backend", model_backends.DEFAULT_BACKEND)
+        params = {**model_backends.direct_params(backend), **params}
+
+        self.direct_model = self.build_model(n_jobs=n_jobs, **params)
+        self.direct_model.fit(X, y)
+        model_backends.set_n_jobs(self.direct_model, None)
+
+        # Residuals of the previous model do not describe this one
+        self.direct_calibration = None
+
+        return self.direct_model
+
+    def calibrate_direct(self, residuals: np.ndarray):
+        """
+        Store held-out residuals (actual - forecast) of the direct model,
+        e.g. from a rolling-origin backtest (backtest.direct_calibration):
+        (n_origins, horizon), NaN where there is no actual. Direct intervals
+        are their per-horizon quantiles around the forecast; horizons past
+        the last calibrated one use its residuals.
+
+        The per-tree spread of the direct forest is far narrower than its
+        error (min_samples_leaf=20 trees agree), so it is not used as an
+        interval.
+        """
+
+        residuals = np.asarray(residuals, dtype=float)
+        if residuals.ndim != 2 or not np.isfinite(residuals[:, 0]).any():
+            raise ValueError("residuals must be (n_origins, horizon) with values at horizon 1")
+
+        # Trailing horizons without any residual add nothing
+        observed = np.flatnonzero(np.isfinite(residuals).any(axis=0))
+        self.direct_calibration = residuals[:, :observed[-1] + 1]
+
+    def direct_interval_offsets(self, n_days: int, level: float):
+        """(lower, upper) offsets from the direct forecast for horizons 1..n_days."""
+
+        residuals = getattr(self, "direct_calibration", None)  # None for old artifacts
+        if residuals is None:
+            raise ValueError("The direct model has no interval calibration; retrain it with "
+                             "forecaster_train.py (or forecast with level=None).")
+
+        lower, upper = np.nanquantile(residuals, self.interval_quantiles(level), axis=0)
+
+        # A horizon without residuals (no origin reached it) takes the previous one's
+        lower, upper = (pd.Series(v).ffill().to_numpy() for v in (lower, upper))
+        last = len(lower) - 1
+        h = np.minimum(np.arange(n_days), last)
+        return lower[h], upper[h]
+
     # ---------------------------------------------------
     # Predict next day attendance
     # ---------------------------------------------------
+    @traced("forecaster.predict_next_day", rows=rows_of_arg(1))
     def predict_next_day(self, df: pd.DataFrame, next_day_info: dict) -> float:
         """
         Predict attendance for the NEXT day.
@@ -101,3 +382,284 @@ class DailyAttendanceForecaster:
 
         prediction = float(self.model.predict(input_row)[0])
         return prediction
+
+    # ---------------------------------------------------
+    # Per-tree predictions (for prediction intervals)
+    # ---------------------------------------------------
+    def tree_predictions(self, X) -> np.ndarray:
+        """
+        Every tree's prediction, shape (n_trees, n_rows), from ONE pass over
+        the forest (sklearn estimators_ or a CompiledForest).
+
+        Summing over axis 0 adds the trees in the forest's own order, so
+        tree_predictions(X).sum(axis=0) / n_trees == model.predict(X) exactly.
+
+        Backends without trees (hist_gradient_boosting, linear) return the
+        prediction plus each centered training residual instead, so the
+        mean is still the prediction and the quantiles give a residual
+        interval.
+        """
+
+        model, columns, residuals = self.model, self.feature_cols, getattr(self, "residuals", None)
+
+        if hasattr(model, "predict_trees"):  # CompiledForest
+            return model.predict_trees(X)
+
+        if not model_backends.is_forest(model):
+            point = model.predict(pd.DataFrame(np.asarray(X, dtype=float), columns=columns))
+            if residuals is None:
+                return point[None, :]
+            return point[None, :] + residuals[:, None]
+
+        # What RandomForestRegressor.predict does per tree, minus the averaging
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return np.stack([tree.predict(X, check_input=False) for tree in model.estimators_])
+
+    def direct_predict(self, X) -> np.ndarray:
+        """
+        Direct model's point forecast for rows in direct_feature_cols
+        order: one predict call, no per-tree matrix (direct intervals come
+        from calibrate_direct, not from the trees).
+        """
+
+        model = getattr(self, "direct_model", None)  # None for old artifacts
+        if model is None:
+            raise ValueError("This forecaster has no direct model; train it with fit_direct().")
+
+        if hasattr(model, "predict_trees"):  # CompiledForest
+            return model.predict(X)
+        return model.predict(pd.DataFrame(np.asarray(X, dtype=float), columns=self.direct_feature_cols))
+
+    @staticmethod
+    def interval_quantiles(level: float):
+        """Central interval, e.g. level=0.95 -> (0.025, 0.975)."""
+        return (1 - level) / 2, (1 + level) / 2
+
+    # ---------------------------------------------------
+    # Predict a multi-day horizon (recursive)
+    # ---------------------------------------------------
+    @traced("forecaster.predict_horizon", rows=rows_of_arg(1))
+    def predict_horizon(self, df: pd.DataFrame, start_date=None, n_days: int = 7, level: float = None,
+                        strategy: str = "recursive") -> pd.DataFrame:
+        """
+        Predict attendance for n_days consecutive days starting at start_date.
+
+        Gives the same numbers as calling predict_next_day once per day and
+        appending each prediction to the history, but the history is only
+        sorted once. The lag1 / lag2 / rolling_mean_7 state lives in a ring
+        buffer of the last ROLLING_WINDOW values, so every extra day is O(1)
+        and no DataFrame is rebuilt between steps.
+
+        With `level` (e.g. 0.95) each day also gets a central interval from
+        the quantiles of the individual tree predictions. The per-tree values
+        come from the same single forest pass that gives the point forecast,
+        and the quantiles for all days are taken in one call at the end.
+        The interval reflects disagreement between trees on each step; it
+        does not propagate the uncertainty of earlier predicted days.
+
+        strategy="direct" forecasts every day with the direct model instead
+        (predict_direct_many on this one series); its intervals come from
+        held-out backtest residuals (calibrate_direct).
+
+        Parameters:
+            df: DataFrame with historical daily attendance
+            start_date: first day to forecast (defaults to the day after
+                        the last date in df)
+            n_days: number of days to forecast
+            level: interval coverage (None = point forecast only)
+            strategy: "recursive" or "direct"
+
+        Returns:
+            DataFrame with columns:
+                date, attendance_pct, weekday, month, is_weekend
+                (+ lower, upper when level is given)
+        """
+
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy must be one of {self.STRATEGIES}, got {strategy!r}")
+
+        history = df.sort_values("date")["attendance_pct"].to_numpy(dtype=float)
+        if len(history) < 2:
+            raise ValueError("At least 2 days of history are needed for lag features.")
+
+        if start_date is None:
+            start_date = pd.Timestamp(df["date"].max()) + pd.Timedelta(days=1)
+
+        dates = pd.date_range(pd.Timestamp(start_date), periods=n_days, freq="D")
+        weekday = dates.weekday.to_numpy()
+        month = dates.month.to_numpy()
+        is_weekend = (weekday >= 5).astype(int)
+
+        if strategy == "direct":
+            window = np.full((1, self.ROLLING_WINDOW), np.nan)
+            tail = history[-self.ROLLING_WINDOW:]
+            window[0, self.ROLLING_WINDOW - len(tail):] = tail
+
+            result = self.predict_direct_many(window, np.array([dates[0].to_datetime64()]), n_days, level=level)
+            predictions, lower, upper = (result if level is not None else (result, None, None))
+
+            forecast = pd.DataFrame({
+                "date": dates,
+                "attendance_pct": predictions[0],
+                "weekday": weekday,
+                "month": month,
+                "is_weekend": is_weekend,
+            })
+            if level is not None:
+                forecast["lower"] = lower[0]
+                forecast["upper"] = upper[0]
+            return forecast
+
+        # Ring buffer holding the most recent ROLLING_WINDOW attendance values
+        window = deque(history[-self.ROLLING_WINDOW:], maxlen=self.ROLLING_WINDOW)
+
+        row = np.empty((1, len(self.feature_cols)), dtype=float)
+        predictions = np.empty(n_days, dtype=float)
+        trees = None
+
+        for i in range(n_days):
+            row[0] = (
+                weekday[i],
+                month[i],
+                is_weekend[i],
+                window[-1],                 # attendance_lag1
+                window[-2],                 # attendance_lag2
+                sum(window) / len(window),  # rolling_mean_7
+            )
+
+            per_tree = self.tree_predictions(row)[:, 0]
+            if trees is None:
+                trees = np.empty((n_days, len(per_tree)), dtype=float)
+            trees[i] = per_tree
+
+            predicted = float(per_tree.sum() / len(per_tree))
+            predictions[i] = predicted
+
+            # Feed the prediction back in as the newest observation
+            window.append(predicted)
+
+        forecast = pd.DataFrame({
+            "date": dates,
+            "attendance_pct": predictions,
+            "weekday": weekday,
+            "month": month,
+            "is_weekend": is_weekend,
+        })
+
+        if level is not None and n_days:
+            lower, upper = np.quantile(trees, self.interval_quantiles(level), axis=1)
+            forecast["lower"] = lower
+            forecast["upper"] = upper
+
+        return forecast
+
+    # ---------------------------------------------------
+    # Predict a multi-day horizon for many cohorts at once
+    # ---------------------------------------------------
+    @traced("forecaster.predict_horizon_many", rows=rows_of_arg(1))
+    def predict_horizon_many(self, windows: np.ndarray, start_dates: np.ndarray, n_days: int = 7,
+                             level: float = None, strategy: str = "recursive"):
+        """
+        Recursive forecast for many independent series in lockstep:
+        each horizon step is ONE pass over the forest for every series.
+        strategy="direct" hands over to predict_direct_many (one pass in total).
+
+        Parameters:
+            windows: (n_series, ROLLING_WINDOW) most recent attendance values,
+                     oldest -> newest, left-padded with NaN when a series
+                     has fewer than ROLLING_WINDOW days (at least 2 needed)
+            start_dates: (n_series,) first forecast day of each series
+            n_days: number of days to forecast
+            level: interval coverage (see predict_horizon); None = point only
+            strategy: "recursive" or "direct"
+
+        Returns:
+            (n_series, n_days) predictions; row i matches
+            predict_horizon(<history of series i>, start_dates[i], n_days).
+            With level: (predictions, lower, upper), each (n_series, n_days).
+        """
+
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy must be one of {self.STRATEGIES}, got {strategy!r}")
+        if strategy == "direct":
+            return self.predict_direct_many(windows, start_dates, n_days, level=level)
+
+        window = np.array(windows, dtype=float, copy=True)
+        if window.ndim != 2 or window.shape[1] != self.ROLLING_WINDOW:
+            raise ValueError(f"windows must have shape (n_series, {self.ROLLING_WINDOW})")
+        if np.isnan(window[:, -2:]).any():
+            raise ValueError("Every series needs at least 2 days of history for lag features.")
+
+        days = np.asarray(start_dates, dtype="datetime64[D]")
+        n_series = len(window)
+
+        X = np.empty((n_series, len(self.feature_cols)), dtype=float)
+        predictions = np.empty((n_series, n_days), dtype=float)
+        if level is not None:
+            quantiles = self.interval_quantiles(level)
+            lower = np.empty((n_series, n_days), dtype=float)
+            upper = np.empty((n_series, n_days), dtype=float)
+
+        for i in range(n_days):
+            X[:, 0], X[:, 1], X[:, 2] = self.calendar_features(days + i)
+            X[:, 3], X[:, 4], X[:, 5] = self.window_features(window)   # lag1, lag2, rolling_mean_7
+
+            # (n_trees, n_series): point forecast and interval from the same pass
+            trees = self.tree_predictions(X)
+            predictions[:, i] = trees.sum(axis=0) / len(trees)
+            if level is not None:
+                lower[:, i], upper[:, i] = np.quantile(trees, quantiles, axis=0)
+
+            # Shift the window and feed the predictions back in
+            window[:, :-1] = window[:, 1:]
+            window[:, -1] = predictions[:, i]
+
+        if level is not None:
+            return predictions, lower, upper
+        return predictions
+
+    # ---------------------------------------------------
+    # Direct multi-horizon forecast (one model call)
+    # ---------------------------------------------------
+    @traced("forecaster.predict_direct_many", rows=rows_of_arg(1))
+    def predict_direct_many(self, windows: np.ndarray, start_dates: np.ndarray, n_days: int = 7,
+                            level: float = None):
+        """
+        Direct forecast for many series: the rows for every (series, h)
+        are built up front from the origin windows and scored in ONE pass
+        over the direct model; nothing is fed back, so no step waits for
+        the previous one. Same parameters and return value as
+        predict_horizon_many; intervals need calibrate_direct.
+        """
+
+        window = np.asarray(windows, dtype=float)
+        if window.ndim != 2 or window.shape[1] != self.ROLLING_WINDOW:
+            raise ValueError(f"windows must have shape (n_series, {self.ROLLING_WINDOW})")
+        if np.isnan(window[:, -2:]).any():
+            raise ValueError("Every series needs at least 2 days of history for lag features.")
+
+        n_series = len(window)
+        horizon = np.arange(1, n_days + 1)
+        days = np.asarray(start_dates, dtype="datetime64[D]")[:, None] + (horizon - 1)   # (n_series, n_days)
+
+        lag1, lag2, rolling = self.window_features(window)
+        weekday, month, is_weekend = self.calendar_features(days.ravel())
+
+        # Rows series-major: row s * n_days + (h - 1)
+        X = np.column_stack([
+            np.tile(horizon, n_series),
+            weekday,
+            month,
+            is_weekend,
+            np.repeat(lag1, n_days),
+            np.repeat(lag2, n_days),
+            np.repeat(rolling, n_days),
+        ]).astype(float)
+
+        predictions = self.direct_predict(X).reshape(n_series, n_days)
+
+        if level is not None:
+            # Calibrated on held-out errors (calibrate_direct), not the tree spread
+            lower, upper = self.direct_interval_offsets(n_days, level)
+            return predictions, predictions + lower, predictions + upper
+        return predictions
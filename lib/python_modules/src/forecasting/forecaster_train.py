@@ -1,7 +1,8 @@
 import os
-import pandas as pd
+import sys
+import argparse
+import numpy as np
 import joblib
-from forecaster_model import DailyAttendanceForecaster
 
 
 # ---------------------------------------------------------
@@ -17,6 +18,39 @@ MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
 TRAIN_CSV_PATH = os.path.join(TRAINING_DATA_DIR, "daily_attendance_train.csv")
 MODEL_OUTPUT_PATH = os.path.join(MODELS_DIR, "daily_forecaster.joblib")
 
+# Shared helpers (columnar CSV cache, profiling) live in /src and are
+# needed by the model module too, so the path goes in before importing it
+sys.path.append(SRC_DIR)
+from columnar_cache import read_csv_cached
+from compiled_forest import export_artifact, forest_path_for, direct_path_for
+import model_backends
+import backtest
+from forecaster_model import DailyAttendanceForecaster
+
+
+# ---------------------------------------------------------
+# CLI: full retrain (default) or warm-start incremental update
+# ---------------------------------------------------------
+parser = argparse.ArgumentParser(description="Train the daily attendance forecaster.")
+parser.add_argument(
+    "--incremental", action="store_true",
+    help="add trees trained on the days after the saved model's last training day "
+         "(retiring the oldest ones); falls back to a full retrain when the drift "
+         "check finds the new days too different",
+)
+parser.add_argument("--trees", type=int, default=DailyAttendanceForecaster.INCREMENTAL_TREES,
+                    help="trees replaced per incremental update")
+parser.add_argument("--direct-horizon", type=int, default=DailyAttendanceForecaster.DIRECT_HORIZON,
+                    help="longest horizon of the direct multi-horizon model (0 = no direct model)")
+parser.add_argument("--backend", choices=sorted(model_backends.BACKENDS),
+                    help="estimator backend (default: models/model_backends.json, else random_forest)")
+args = parser.parse_args()
+
+# Backend from the config unless overridden (config params only apply to the configured backend)
+backend, params = model_backends.configured("forecaster")
+if args.backend and args.backend != backend:
+    backend, params = args.backend, {}
+print(f"⚙ Backend: {backend} {params or ''}")
 
 
 # ---------------------------------------------------------
@@ -29,24 +63,114 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 # Load training data
 # ---------------------------------------------------------
 print("📘 Loading training data...")
-df = pd.read_csv(TRAIN_CSV_PATH, parse_dates=["date"])
+df = read_csv_cached(TRAIN_CSV_PATH, parse_dates=["date"])
 
 print(df.head())
 print(f"Loaded {len(df)} training rows.")
 
 
+# ---------------------------------------------------------
+# Incremental update (drift check decides)
+# ---------------------------------------------------------
+forecaster = None
+updated_incrementally = False
+
+if args.incremental and not os.path.exists(MODEL_OUTPUT_PATH):
+    print(f"\n⚠ No saved model at {MODEL_OUTPUT_PATH}, running a full fit instead.")
+
+elif args.incremental:
+    print("\n📦 Loading saved model...")
+    forecaster = joblib.load(MODEL_OUTPUT_PATH)
+
+    # Warm start adds trees: only a saved random_forest of the same backend qualifies
+    saved_backend = getattr(forecaster, "backend", model_backends.DEFAULT_BACKEND)
+    if saved_backend != backend or not model_backends.is_forest(forecaster.model):
+        print(f"⚠ Saved model is {saved_backend}, incremental updates need random_forest "
+              f"on both sides (--backend {backend}); running a full fit instead.")
+        forecaster = None
+
+if forecaster is not None:
+    profile = getattr(forecaster, "training_profile", None)
+    since = profile["trained_until"] if profile else None
+    X_new, y_new = forecaster.training_matrix(df, since=since)
+
+    report = forecaster.drift_check(X_new, y_new)
+    print(f"🔍 {len(X_new)} new days since {since}; drift check: {report['decision']}"
+          + (f" ({report['reason']})" if "reason" in report else ""))
+    for feature, value in report.get("psi", {}).items():
+        print(f"  PSI {feature:<18} {value:.4f}  (threshold {report['threshold'][feature]:.4f})"
+              f"  mean shift {report['mean_shift'][feature]:.2f} sd  (threshold {report['mean_threshold'][feature]:.2f})")
+
+    if report["decision"] == "none":
+        print("✅ Nothing to train, model unchanged.")
+        sys.exit(0)
+
+    if report["decision"] == "incremental":
+        print(f"\n🚀 Warm-starting {args.trees} new trees on the new days...")
+        forecaster.fit_incremental(df, since=since, n_trees=args.trees, n_jobs=-1)
+        updated_incrementally = True
+        print("✅ Incremental update complete!")
+    else:
+        print("\n⚠ Full retrain needed.")
+        forecaster = None
+
+
 # ---------------------------------------------------------
 # Train model
 # ---------------------------------------------------------
-print("\n🚀 Training DailyAttendanceForecaster...")
-forecaster = DailyAttendanceForecaster()
-model = forecaster.fit(df)
+if forecaster is None:
+    print("\n🚀 Training DailyAttendanceForecaster...")
+    forecaster = DailyAttendanceForecaster(backend=backend)
+    model = forecaster.fit(df, n_jobs=-1, **params)  # every core for tree construction
 
-print("✅ Training complete!")
+    print("✅ Training complete!")
+
+
+# ---------------------------------------------------------
+# Direct multi-horizon model (full fits only: an incremental update keeps
+# the saved one, which is refitted with the next full retrain)
+# ---------------------------------------------------------
+if args.direct_horizon <= 0:
+    forecaster.direct_model = forecaster.direct_calibration = None
+
+elif updated_incrementally:
+    if getattr(forecaster, "direct_model", None) is not None:
+        print("\n📦 Keeping the saved direct model (refitted on the next full retrain).")
+    else:
+        print("\n⚠ Saved model has no direct model; run a full retrain to add one.")
+
+else:
+    print(f"\n🚀 Training the direct model (horizons 1..{args.direct_horizon})...")
+    # Shared params, except the ones the direct model has its own defaults for
+    direct_params = {k: v for k, v in params.items() if k not in model_backends.direct_params(backend)}
+    forecaster.fit_direct(df, max_horizon=args.direct_horizon, n_jobs=-1, **direct_params)
+
+    X_direct, _ = forecaster.direct_training_matrix(df, args.direct_horizon)
+    print(f"✅ {len(X_direct)} (origin, horizon) rows; longest observed horizon: {int(X_direct['horizon'].max())} days")
+
+    # Interval calibration: residuals of a rolling-origin backtest of the direct strategy
+    print(f"\n🔍 Calibrating direct intervals (backtest, horizons 1..{backtest.HORIZON})...")
+    residuals = backtest.direct_calibration(df, params=direct_params, backend=backend)
+    forecaster.calibrate_direct(residuals)
+    lower, upper = forecaster.direct_interval_offsets(1, 0.95)
+    print(f"✅ {int(np.isfinite(residuals).sum())} held-out residuals; 95% interval at h=1: "
+          f"forecast {lower[0]:+.2f} .. {upper[0]:+.2f}")
 
 
 # ---------------------------------------------------------
 # Save model
 # ---------------------------------------------------------
-joblib.dump(forecaster, MODEL_OUTPUT_PATH)
+joblib.dump(forecaster, MODEL_OUTPUT_PATH, compress=0)
+
+# Compiled, memory-mappable copy used for prediction (see compiled_forest.py);
+# other backends are loaded from the joblib artifact, so drop a stale forest
+if model_backends.is_forest(forecaster.model):
+    export_artifact(forecaster, MODEL_OUTPUT_PATH, "forecaster")
+    compiled_note = f"💾 Compiled forest saved to: {forest_path_for(MODEL_OUTPUT_PATH)}"
+else:
+    for stale in (forest_path_for(MODEL_OUTPUT_PATH), direct_path_for(forest_path_for(MODEL_OUTPUT_PATH))):
+        if os.path.exists(stale):
+            os.remove(stale)
+    compiled_note = f"💾 No compiled forest for {backend}: prediction loads the joblib artifact"
 print(f"\n💾 Model saved to: {MODEL_OUTPUT_PATH}")
+print(compiled_note)
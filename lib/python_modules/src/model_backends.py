@@ -0,0 +1,186 @@
+"""
+Model backends
+--------------
+The estimator behind DailyAttendanceForecaster / StudentRiskClassifier is
+pluggable. Every backend builds a scikit-learn estimator with the usual
+fit / predict (/ predict_proba, classes_) API, so the wrappers do not
+care which one they hold:
+
+    random_forest            RandomForest{Regressor,Classifier}, 250 trees (production default);
+                             per-tree intervals, compiled .forest.joblib, warm-start updates
+    hist_gradient_boosting   HistGradientBoosting{Regressor,Classifier}: small artifact,
+                             one compiled predictor pass per call
+    linear                   StandardScaler + Ridge / LogisticRegression: a few
+                             coefficients, microsecond predictions
+
+The backend (and optional estimator params) per model comes from
+models/model_backends.json:
+
+    {
+        "forecaster": {"backend": "random_forest", "params": {}},
+        "risk":       {"backend": "random_forest", "params": {}}
+    }
+
+A missing file or entry means random_forest with its defaults. The
+training scripts take --backend to override it; the chosen backend is
+saved on the wrapper, so prediction code just loads the artifact.
+
+Compare the backends on the same data with compare_backends.py.
+"""
+
+import os
+import json
+
+from sklearn.ensemble import (
+    RandomForestRegressor, RandomForestClassifier,
+    HistGradientBoostingRegressor, HistGradientBoostingClassifier,
+)
+from sklearn.linear_model import Ridge, LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+# ---------------------------------------------------------
+# Paths
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+CONFIG_PATH = os.path.join(PYTHON_MODULES_DIR, "models", "model_backends.json")
+
+DEFAULT_BACKEND = "random_forest"
+TASKS = ("regressor", "classifier")
+
+
+# ---------------------------------------------------------
+# Builders: (task, n_jobs, **params) -> unfitted estimator
+# ---------------------------------------------------------
+def _random_forest(task: str, n_jobs=None, n_estimators: int = 250, max_depth=None,
+                   min_samples_leaf: int = 1):
+    if task == "regressor":
+        return RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
+            n_jobs=n_jobs,
+            random_state=42
+        )
+
+    return RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        n_jobs=n_jobs,
+        random_state=42,
+        class_weight="balanced"
+    )
+
+
+def _hist_gradient_boosting(task: str, n_jobs=None, max_iter: int = 200, learning_rate: float = 0.05,
+                            max_leaf_nodes: int = 15, min_samples_leaf: int = 5):
+    # No n_jobs: HistGradientBoosting threads through OpenMP
+    params = dict(
+        max_iter=max_iter,
+        learning_rate=learning_rate,
+        max_leaf_nodes=max_leaf_nodes,
+        min_samples_leaf=min_samples_leaf,
+        random_state=42,
+    )
+
+    if task == "regressor":
+        return HistGradientBoostingRegressor(**params)
+    return HistGradientBoostingClassifier(class_weight="balanced", **params)
+
+
+def _linear(task: str, n_jobs=None, alpha: float = 1.0, C: float = 1.0):
+    # alpha: Ridge penalty (regressor); C: inverse penalty (classifier)
+    if task == "regressor":
+        return make_pipeline(StandardScaler(), Ridge(alpha=alpha))
+    return make_pipeline(StandardScaler(), LogisticRegression(C=C, class_weight="balanced", max_iter=1000))
+
+
+BACKENDS = {
+    "random_forest": {
+        "build": _random_forest,
+        "grid": {
+            "regressor": {"n_estimators": [100, 250, 500], "max_depth": [None, 8, 16], "min_samples_leaf": [1, 3, 5]},
+            "classifier": {"n_estimators": [100, 250, 500], "max_depth": [None, 8, 16], "min_samples_leaf": [1, 3, 5]},
+        },
+        "direct": {"min_samples_leaf": 20},
+    },
+    "hist_gradient_boosting": {
+        "build": _hist_gradient_boosting,
+        "grid": {
+            "regressor": {"max_iter": [100, 200, 400], "learning_rate": [0.05, 0.1], "min_samples_leaf": [3, 5, 10]},
+            "classifier": {"max_iter": [100, 200, 400], "learning_rate": [0.05, 0.1], "min_samples_leaf": [3, 5, 10]},
+        },
+        "direct": {"min_samples_leaf": 20},
+    },
+    "linear": {
+        "build": _linear,
+        "grid": {
+            "regressor": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+            "classifier": {"C": [0.01, 0.1, 1.0, 10.0]},
+        },
+        "direct": {},
+    },
+}
+
+
+def _spec(backend: str) -> dict:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[backend]
+
+
+def build_estimator(task: str, backend: str = DEFAULT_BACKEND, n_jobs=None, **params):
+    """Unfitted estimator of a backend; without params, its production defaults."""
+
+    if task not in TASKS:
+        raise ValueError(f"task must be one of {TASKS}, got {task!r}")
+    return _spec(backend)["build"](task, n_jobs=n_jobs, **params)
+
+
+def direct_params(backend: str = DEFAULT_BACKEND) -> dict:
+    """
+    Defaults for the forecaster's direct multi-horizon model. Its training
+    set repeats every origin once per horizon, so trees need larger leaves
+    (min_samples_leaf=20 had the lowest backtest MAE and a ~13x smaller forest).
+    """
+    return dict(_spec(backend)["direct"])
+
+
+def search_grid(task: str, backend: str = DEFAULT_BACKEND) -> dict:
+    """Hyperparameter grid used by train_search.py for a backend."""
+    return _spec(backend)["grid"][task]
+
+
+# ---------------------------------------------------------
+# Estimator capabilities
+# ---------------------------------------------------------
+def is_forest(model) -> bool:
+    """sklearn random forest: per-tree predictions, compilable, warm-startable."""
+    return isinstance(model, (RandomForestRegressor, RandomForestClassifier))
+
+
+def set_n_jobs(model, n_jobs):
+    """Set n_jobs on estimators that have it (a no-op for the others)."""
+    if "n_jobs" in model.get_params(deep=False):
+        model.set_params(n_jobs=n_jobs)
+
+
+# ---------------------------------------------------------
+# Config
+# ---------------------------------------------------------
+def configured(kind: str, path: str = CONFIG_PATH) -> tuple:
+    """(backend, params) for "forecaster" or "risk" from the config file."""
+
+    if not os.path.exists(path):
+        return DEFAULT_BACKEND, {}
+
+    with open(path, "r") as f:
+        entry = json.load(f).get(kind, {})
+
+    backend = entry.get("backend", DEFAULT_BACKEND)
+    _spec(backend)  # fail early on a typo
+    return backend, dict(entry.get("params", {}))
@@ -0,0 +1,243 @@
+"""
+Online risk scoring
+-------------------
+Consumes attendance marks as a stream and keeps student risk scores
+current: every mark updates the student's 30-day window in the
+OnlineFeatureStore (O(1) per event), the student is marked dirty, and
+dirty students are re-scored together in microbatches, either when
+--max-batch of them have piled up or --max-delay seconds after the first
+one, whichever comes first. A mark on a new latest date moves the window
+end for everyone, so it marks every student dirty: each student's latest
+score is always as of the current window end.
+
+Event sources (asyncio):
+    tail_csv(path)        follows a CSV of date,student_id,present like
+                          `tail -f` (--follow), or replays it to EOF
+    queue_events(queue)   an asyncio.Queue of (date, student_id, present)
+                          tuples, the stand-in for a message bus; None ends it
+
+Every re-score is appended to --output as one JSON line:
+    {"as_of": ..., "student_id": ..., "risk_level": ..., "probabilities": {...},
+     "overall_attendance_30d": ..., ...}
+
+Usage:
+    python online_risk.py ../inputs/input_raw_attendance.csv
+    python online_risk.py /var/log/attendance.csv --follow --max-batch 512 --max-delay 0.2
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+
+from pipeline import OUTPUT_DIR, RISK_FOREST_PATH, load_risk_model, run_risk
+from online_features import OnlineFeatureStore, day_number
+
+
+DEFAULT_OUTPUT = os.path.join(OUTPUT_DIR, "online_risk.jsonl")
+
+MAX_BATCH = 256         # re-score as soon as this many students are dirty
+MAX_DELAY = 0.05        # ... or this many seconds after the first one
+
+
+# ---------------------------------------------------------
+# Event sources
+# ---------------------------------------------------------
+async def tail_csv(path: str, follow: bool = False, poll_interval: float = 0.5, yield_every: int = 1000):
+    """
+    Yields (date, student_id, present) from a date,student_id,present CSV.
+    With follow=True keeps waiting for appended lines instead of stopping at EOF.
+    """
+
+    with open(path, "r") as f:
+        columns = f.readline().strip().split(",")
+        date_i, student_i, present_i = (columns.index(c) for c in ("date", "student_id", "present"))
+
+        n = 0
+        partial = ""
+        while True:
+            line = f.readline()
+
+            if not line or not line.endswith("\n"):
+                # Keep half-written lines until the writer finishes them
+                partial += line
+                if not follow:
+                    line, partial = partial, ""
+                    if not line:
+                        return
+                else:
+                    await asyncio.sleep(poll_interval)
+                    continue
+            elif partial:
+                line, partial = partial + line, ""
+
+            fields = line.rstrip("\r\n").split(",")
+            if len(fields) < len(columns):
+                continue
+            yield fields[date_i], fields[student_i], fields[present_i]
+
+            # Reading never blocks, so hand the loop to the flusher now and then
+            n += 1
+            if n % yield_every == 0:
+                await asyncio.sleep(0)
+
+
+async def queue_events(queue: "asyncio.Queue"):
+    """Yields (date, student_id, present) from a queue until it receives None."""
+
+    while True:
+        event = await queue.get()
+        if event is None:
+            return
+        yield event
+
+
+# ---------------------------------------------------------
+# Microbatched re-scoring
+# ---------------------------------------------------------
+class OnlineRiskScorer:
+    def __init__(self, risk_model, store: OnlineFeatureStore = None,
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY, on_scores=None):
+        """
+        on_scores(records) is called with the run_risk records of every
+        microbatch, each extended with as_of and the features it was scored on.
+        """
+
+        self.risk_model = risk_model
+        self.store = store or OnlineFeatureStore()
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.on_scores = on_scores
+
+        self.n_batches = 0
+        self.n_scored = 0
+        self.max_wait_s = 0.0   # longest a dirty student waited for its re-score
+        self.latest = {}     # student_id -> latest record
+
+        self._dirty = {}     # student_id -> monotonic time it became dirty (insertion ordered)
+        self._pending = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    async def run(self, events):
+        """Consume an async iterator of (date, student_id, present) until it ends."""
+
+        flusher = asyncio.create_task(self._flush_loop())
+        try:
+            async for date, student_id, present in events:
+                self.apply(date, student_id, present)
+
+                if len(self._dirty) >= self.max_batch:
+                    await self.flush()
+                elif self._dirty:
+                    self._pending.set()
+        finally:
+            flusher.cancel()
+            await self.flush()
+
+    def apply(self, date, student_id, present):
+        end_day = self.store.end_day
+        accepted = self.store.update(student_id, day_number(date), present == "Yes" or present is True)
+
+        now = time.monotonic()
+        if end_day is not None and self.store.end_day != end_day:
+            # The window slid: every student's features changed, not just this one's
+            for other in self.store.windows:
+                self._dirty.setdefault(other, now)
+        elif accepted:
+            self._dirty.setdefault(student_id, now)
+
+    async def _flush_loop(self):
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(self.max_delay)
+            self._pending.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Re-score every dirty student in one predict_batch_with_proba call."""
+
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+
+            dirty, self._dirty = self._dirty, {}
+            self.max_wait_s = max(self.max_wait_s, time.monotonic() - next(iter(dirty.values())))
+            features = self.store.features(list(dirty))
+
+            # No marks left in the window: no score, as in compute_risk_features
+            for student_id in set(dirty).difference(features["student_id"]):
+                self.latest.pop(student_id, None)
+            if features.empty:
+                return
+
+            as_of = self.store.as_of
+            # The forest releases the GIL, so the event loop keeps reading meanwhile
+            try:
+                records = await asyncio.get_running_loop().run_in_executor(
+                    None, run_risk, self.risk_model, features
+                )
+            except asyncio.CancelledError:
+                # Shutting down mid-batch: leave them dirty for the final flush
+                self._dirty = {**dirty, **self._dirty}
+                raise
+
+            for record, row in zip(records, features[self.store.FEATURE_COLS].to_dict("records")):
+                record["as_of"] = as_of
+                record.update(row)
+                self.latest[record["student_id"]] = record
+
+            self.n_batches += 1
+            self.n_scored += len(records)
+            if self.on_scores is not None:
+                self.on_scores(records)
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Stream attendance marks and keep risk scores current.")
+    parser.add_argument("events_csv", help="CSV with date, student_id, present (followed with --follow)")
+    parser.add_argument("--follow", action="store_true", help="keep waiting for appended lines")
+    parser.add_argument("--model", default=RISK_FOREST_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines of re-scores (appended)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY, help="seconds")
+    args = parser.parse_args()
+
+    print("📦 Loading risk model...")
+    risk_model = load_risk_model(args.model)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    out = open(args.output, "a")
+
+    def write_scores(records):
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    scorer = OnlineRiskScorer(risk_model, max_batch=args.max_batch, max_delay=args.max_delay,
+                              on_scores=write_scores)
+
+    print(f"🚀 Streaming events from {args.events_csv}" + (" (following)" if args.follow else ""))
+    start = time.perf_counter()
+    try:
+        asyncio.run(scorer.run(tail_csv(args.events_csv, follow=args.follow)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.close()
+    elapsed = time.perf_counter() - start
+
+    store = scorer.store
+    print(f"✅ {store.n_events:,} events ({store.n_ignored:,} older than the window) in {elapsed:.2f}s "
+          f"({store.n_events / max(elapsed, 1e-9):,.0f} events/s)")
+    print(f"⚡ {scorer.n_scored:,} re-scores in {scorer.n_batches:,} microbatches, "
+          f"{len(scorer.latest):,} students as of {store.as_of} "
+          f"(longest wait {scorer.max_wait_s * 1000:.1f} ms)")
+    print(f"💾 Scores appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Day-level attendance anomaly scan
+---------------------------------
+Finds unusually low attendance days (holidays, events, outbreaks) in one
+or many daily series at once, in O(n_series * n_days):
+
+  1. every series is laid on a dense calendar grid (NaN = no data that day);
+  2. weekday adjustment: each day minus its series' weekday offset
+     (weekday mean - overall mean), so a normally weak Friday is not flagged;
+  3. rolling z-score of the adjusted value against the previous `window`
+     days (mean / sample std from cumulative sums, current day excluded);
+  4. days with z <= -threshold are "low"; consecutive low days (missing
+     days in between are skipped over) form one cluster.
+
+    values = [[...], [...]]                          # (n_series, n_days) daily %
+    z = weekday_zscores(values, first_date)
+    clusters = low_day_clusters(z, first_date)
+
+scan_daily(daily_df) does all of it for a long frame (date, present_pct
+[, series column]) and returns the clusters with their dates.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+WINDOW_DAYS = 28         # rolling baseline length
+MIN_PERIODS = 3          # days of baseline needed before a day is scored
+MIN_STD = 1.0            # floor for the rolling std (in attendance points)
+Z_THRESHOLD = 2.0        # low day: z <= -Z_THRESHOLD
+
+
+# ---------------------------------------------------
+# Long frame -> dense (series, day) matrix
+# ---------------------------------------------------
+def daily_matrix(daily: pd.DataFrame, value_col: str = "present_pct", series_col: str = None):
+    """
+    Returns:
+        series_ids: (n_series,) ids (a single None when series_col is None)
+        first_date: datetime64[D] of grid column 0
+        values:     (n_series, n_days) float, NaN where a series has no day
+    """
+
+    days = pd.to_datetime(daily["date"]).to_numpy().astype("datetime64[D]")
+    first_date = days.min()
+    day_index = (days - first_date).astype(np.int64)
+
+    if series_col is None:
+        series_codes, series_ids = np.zeros(len(daily), dtype=np.int64), np.array([None], dtype=object)
+    else:
+        series_codes, series_ids = pd.factorize(daily[series_col])
+        series_ids = np.asarray(series_ids)
+
+    values = np.full((len(series_ids), int(day_index.max()) + 1), np.nan)
+    values[series_codes, day_index] = daily[value_col].to_numpy(dtype=float)
+
+    return series_ids, first_date, values
+
+
+# ---------------------------------------------------
+# Weekday-adjusted rolling z-scores
+# ---------------------------------------------------
+def weekday_zscores(values: np.ndarray, first_date, window: int = WINDOW_DAYS,
+                    min_periods: int = MIN_PERIODS, min_std: float = MIN_STD) -> np.ndarray:
+    """(n_series, n_days) z-scores; NaN where the day is missing or the baseline is too short."""
+
+    values = np.asarray(values, dtype=float)
+    n_series, n_days = values.shape
+    known = ~np.isnan(values)
+    filled = np.where(known, values, 0.0)
+
+    # Weekday offsets per series: (weekday mean - overall mean)
+    first_weekday = (np.datetime64(first_date, "D").astype(np.int64) + 3) % 7   # 1970-01-01 was a Thursday
+    weekday = (first_weekday + np.arange(n_days)) % 7
+    one_hot = (weekday[:, None] == np.arange(7)).astype(float)                 # (n_days, 7)
+
+    weekday_sum = filled @ one_hot
+    weekday_count = known.astype(float) @ one_hot
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overall = weekday_sum.sum(axis=1, keepdims=True) / weekday_count.sum(axis=1, keepdims=True)
+        offset = np.where(weekday_count > 0, weekday_sum / weekday_count, overall) - overall
+
+    adjusted = np.where(known, values - offset[:, weekday], 0.0)
+
+    # Trailing-window sums from cumulative sums (column t covers days [t-window, t))
+    def trailing(x):
+        c = np.zeros((n_series, n_days + 1))
+        np.cumsum(x, axis=1, out=c[:, 1:])
+        lo = np.clip(np.arange(n_days) - window, 0, None)
+        return c[:, :n_days] - c[:, lo]
+
+    n = trailing(known.astype(float))
+    s = trailing(adjusted)
+    ss = trailing(adjusted ** 2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        var = (ss - s * mean) / (n - 1)
+        std = np.maximum(np.sqrt(np.clip(var, 0, None)), min_std)
+        z = (adjusted - mean) / std
+
+    z[~known | (n < min_periods)] = np.nan
+    return z
+
+
+# ---------------------------------------------------
+# Consecutive low days -> clusters
+# ---------------------------------------------------
+def low_day_clusters(z: np.ndarray, first_date, threshold: float = Z_THRESHOLD) -> pd.DataFrame:
+    """
+    Groups consecutive low days (z <= -threshold) of each series; days
+    without a score (missing / no baseline) neither extend nor break a run.
+
+    Returns one row per cluster:
+        series, start, end, n_days, dates (list of YYYY-MM-DD), min_z
+    """
+
+    scored_series, scored_day = np.nonzero(~np.isnan(z))   # row-major: series, then day
+    scores = z[scored_series, scored_day]
+    low = scores <= -threshold
+
+    # A run starts at a low day whose predecessor (in the same series) is not low
+    prev_low = np.concatenate([[False], low[:-1]])
+    same_series = np.concatenate([[False], scored_series[1:] == scored_series[:-1]])
+    starts = low & ~(prev_low & same_series)
+
+    low_idx = np.flatnonzero(low)
+    cluster_of_low = np.cumsum(starts)[low_idx] - 1
+    n_clusters = int(starts.sum())
+
+    columns = ["series", "start", "end", "n_days", "dates", "min_z"]
+    if n_clusters == 0:
+        return pd.DataFrame(columns=columns)
+
+    first = np.datetime64(first_date, "D")
+    low_dates = (first + scored_day[low_idx]).astype(str)
+    bounds = np.flatnonzero(np.diff(cluster_of_low)) + 1
+    group_start = np.concatenate([[0], bounds])
+    group_end = np.concatenate([bounds, [len(low_idx)]]) - 1
+
+    return pd.DataFrame({
+        "series": scored_series[low_idx[group_start]],
+        "start": low_dates[group_start],
+        "end": low_dates[group_end],
+        "n_days": group_end - group_start + 1,
+        "dates": [d.tolist() for d in np.split(low_dates, bounds)],
+        "min_z": np.minimum.reduceat(scores[low_idx], group_start),
+    }, columns=columns)
+
+
+def scan_daily(daily: pd.DataFrame, value_col: str = "present_pct", series_col: str = None,
+               threshold: float = Z_THRESHOLD, window: int = WINDOW_DAYS,
+               min_periods: int = MIN_PERIODS) -> pd.DataFrame:
+    """
+    daily must contain:
+        date, <value_col> (+ <series_col> for many series)
+
+    Returns the low-day clusters of every series (see low_day_clusters),
+    with the series column holding the series id.
+    """
+
+    series_ids, first_date, values = daily_matrix(daily, value_col, series_col)
+    z = weekday_zscores(values, first_date, window=window, min_periods=min_periods)
+
+    clusters = low_day_clusters(z, first_date, threshold)
+    clusters["series"] = series_ids[clusters["series"].to_numpy(dtype=np.int64)]
+    return clusters
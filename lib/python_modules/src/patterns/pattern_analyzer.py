@@ -1,5 +1,9 @@
+import json
+
 import pandas as pd
 import numpy as np
+from profiling import traced, rows_of_arg
+from anomaly_scan import scan_daily
 
 class AttendancePatternAnalyzer:
     """
@@ -8,16 +12,68 @@ class AttendancePatternAnalyzer:
     Detects:
       - Weekend effect (Friday dips)
       - Midweek dips (e.g., Wednesday)
-      - Holiday-like attendance drops
+      - Holiday-like attendance drops (dated clusters of anomalous low days)
     """
 
+    STATE_VERSION = 1
+
+    # Day-level anomaly scan (see anomaly_scan.py)
+    ANOMALY_Z_THRESHOLD = 2.0   # low day: weekday-adjusted rolling z <= -2
+    HOLIDAY_MIN_DAYS = 2        # consecutive low days reported as holiday-like
+
     def __init__(self):
         self.weekday_stats = None
         self.overall_mean = None
 
+        # Mergeable state (see partial_fit / merge):
+        #   daily_counts: index=date, columns=present, total
+        #   weekday_sums: index=weekday, columns=count, sum, sumsq of daily %
+        self.daily_counts = None
+        self.weekday_sums = None
+
     # ---------------------------------------------------
-    # Preprocessing: convert raw attendance -> daily %
+    # Preprocessing: convert raw attendance -> daily counts / %
     # ---------------------------------------------------
+    def compute_daily_counts(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        df must contain:
+        date, present (Yes/No)
+
+        Returns present/total counts per date (index=date, sorted).
+        The caller's frame is not modified.
+        """
+
+        # Convert yes/no to 1/0 (vectorized) and count per raw date value
+        counts = (
+            df["present"].eq("Yes")
+            .groupby(df["date"])
+            .agg(["sum", "count"])
+            .rename(columns={"sum": "present", "count": "total"})
+        )
+
+        # Only the distinct dates get parsed
+        counts.index = pd.to_datetime(counts.index)
+        counts.index.name = "date"
+        return counts.groupby(level=0).sum().astype("int64")
+
+    def daily_from_counts(self, counts: pd.DataFrame) -> pd.DataFrame:
+        """
+        Turns per-date present/total counts into the daily dataframe:
+            date, present_pct, weekday
+        """
+
+        daily = pd.DataFrame({
+            "date": counts.index,
+            "present_pct": (counts["present"] / counts["total"]).to_numpy(),
+        })
+
+        # Convert to percentage
+        daily["present_pct"] = daily["present_pct"] * 100
+        daily["weekday"] = daily["date"].dt.weekday  # 0=Mon,6=Sun
+
+        return daily
+
+    @traced("patterns.compute_daily_stats", rows=rows_of_arg(1))
     def compute_daily_stats(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         df must contain:
@@ -27,21 +83,35 @@ class AttendancePatternAnalyzer:
             date, present_pct, weekday
         """
 
-        # Convert yes/no to 1/0
-        df["present_flag"] = df["present"].apply(lambda x: 1 if x == "Yes" else 0)
+        return self.daily_from_counts(self.compute_daily_counts(df))
 
-        daily = (
-            df.groupby("date")["present_flag"]
-              .mean()
-              .reset_index()
-              .rename(columns={"present_flag": "present_pct"})
-        )
+    # ---------------------------------------------------
+    # Streaming preprocessing: raw CSV -> daily counts, chunk by chunk
+    # ---------------------------------------------------
+    @traced("patterns.compute_daily_counts_streaming", rows=lambda args, kwargs, counts: counts["total"].sum())
+    def compute_daily_counts_streaming(self, csv_path: str, chunksize: int = 1_000_000) -> pd.DataFrame:
+        """
+        Same result as compute_daily_counts(pd.read_csv(csv_path)), but the raw
+        log is read `chunksize` rows at a time and only running per-date
+        present/total counts are kept, so peak memory depends on the number
+        of distinct dates rather than the number of rows.
+        """
 
-        # Convert to percentage
-        daily["present_pct"] = daily["present_pct"] * 100
-        daily["weekday"] = pd.to_datetime(daily["date"]).dt.weekday  # 0=Mon,6=Sun
+        counts = None
 
-        return daily
+        for chunk in pd.read_csv(csv_path, usecols=["date", "present"], chunksize=chunksize):
+            chunk_counts = self.compute_daily_counts(chunk)
+            counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+
+        if counts is None:
+            raise ValueError(f"No attendance rows found in {csv_path}")
+
+        return counts.astype("int64")
+
+    def compute_daily_stats_streaming(self, csv_path: str, chunksize: int = 1_000_000) -> pd.DataFrame:
+        """Streaming version of compute_daily_stats."""
+
+        return self.daily_from_counts(self.compute_daily_counts_streaming(csv_path, chunksize))
 
     # ---------------------------------------------------
     # Fit analyzer (calculate statistics)
@@ -52,7 +122,32 @@ class AttendancePatternAnalyzer:
         and computes weekday averages + global mean.
         """
 
-        daily = self.compute_daily_stats(df)
+        return self.fit_counts(self.compute_daily_counts(df))
+
+    def fit_streaming(self, csv_path: str, chunksize: int = 1_000_000):
+        """
+        Fit straight from a raw attendance CSV (date, student_id, present)
+        without loading it into memory. Produces the same export_patterns()
+        output as fit(pd.read_csv(csv_path, parse_dates=["date"])).
+        """
+
+        return self.fit_counts(self.compute_daily_counts_streaming(csv_path, chunksize))
+
+    def fit_matrix(self, matrix):
+        """
+        Fit from a bit-packed AttendanceMatrix (attendance_matrix.py): the
+        per-date counts are column popcounts, no DataFrame of marks is built.
+        """
+
+        return self.fit_counts(matrix.daily_counts())
+
+    def fit_counts(self, counts: pd.DataFrame):
+        """
+        Full fit from per-date present/total counts
+        (as returned by compute_daily_counts).
+        """
+
+        daily = self.daily_from_counts(counts)
 
         # Weekday-wise average attendance
         self.weekday_stats = (
@@ -64,20 +159,190 @@ class AttendancePatternAnalyzer:
         # Global attendance level
         self.overall_mean = daily["present_pct"].mean()
 
+        # Keep the sufficient statistics so later updates are incremental
+        self.daily_counts = counts
+        self.weekday_sums = self._weekday_sums(daily["present_pct"], daily["weekday"])
+
+        return self
+
+    # ---------------------------------------------------
+    # Incremental updates
+    # ---------------------------------------------------
+    @staticmethod
+    def _weekday_sums(present_pct: pd.Series, weekday) -> pd.DataFrame:
+        """count / sum / sum of squares of daily % per weekday (NaN = no day)."""
+
+        known = present_pct.notna()
+        values = present_pct.fillna(0.0).to_numpy()
+
+        return (
+            pd.DataFrame({
+                "weekday": np.asarray(weekday),
+                "count": known.to_numpy().astype(float),
+                "sum": values,
+                "sumsq": values ** 2,
+            })
+            .groupby("weekday")
+            .sum()
+        )
+
+    def _apply_counts(self, delta: pd.DataFrame):
+        """
+        Add per-date present/total counts to the state. Only the dates in
+        `delta` are touched: their old daily % is removed from the weekday
+        sums and the updated one is added back.
+        """
+
+        if self.daily_counts is None:
+            self.daily_counts = delta.iloc[0:0].astype("int64")
+            self.weekday_sums = pd.DataFrame(columns=["count", "sum", "sumsq"], dtype=float)
+
+        dates = delta.index
+        old = self.daily_counts.reindex(dates)
+
+        self.daily_counts = (
+            self.daily_counts.add(delta, fill_value=0)
+            .sort_index()
+            .astype("int64")
+        )
+        new = self.daily_counts.loc[dates]
+
+        old_pct = old["present"] / old["total"] * 100
+        new_pct = new["present"] / new["total"] * 100
+
+        self.weekday_sums = (
+            self.weekday_sums
+            .add(self._weekday_sums(new_pct, dates.weekday), fill_value=0)
+            .sub(self._weekday_sums(old_pct, dates.weekday), fill_value=0)
+            .sort_index()
+        )
+
+        self._stats_from_sums()
         return self
 
+    def _stats_from_sums(self):
+        """Rebuild weekday_stats / overall_mean from the weekday sums."""
+
+        sums = self.weekday_sums[self.weekday_sums["count"] > 0]
+        n = sums["count"]
+        mean = sums["sum"] / n
+
+        # Sample variance (ddof=1, like pandas .std()); undefined for a single day
+        var = ((sums["sumsq"] - sums["sum"] * mean) / (n - 1)).where(n > 1)
+
+        self.weekday_stats = pd.DataFrame({
+            "weekday": sums.index.astype("int64"),
+            "mean": mean.to_numpy(),
+            "std": np.sqrt(var.clip(lower=0)).to_numpy(),
+            "count": n.round().astype("int64").to_numpy(),
+        })
+
+        self.overall_mean = sums["sum"].sum() / n.sum()
+
+    def partial_fit(self, new_rows: pd.DataFrame):
+        """
+        Update the analyzer with new raw attendance rows
+        (date, student_id, present) without revisiting old data.
+        Rows may belong to new dates or to dates already seen.
+        """
+
+        return self._apply_counts(self.compute_daily_counts(new_rows))
+
+    def merge(self, other: "AttendancePatternAnalyzer"):
+        """
+        Combine with an analyzer fitted on another shard (school, month...).
+        Per-date counts are added, so overlapping dates are combined exactly.
+        """
+
+        if other.daily_counts is None:
+            return self
+
+        return self._apply_counts(other.daily_counts)
+
     # ---------------------------------------------------
-    # Pattern detection
+    # State persistence
     # ---------------------------------------------------
-    def analyze_patterns(self) -> dict:
+    def save_state(self, path: str):
+        """Save the mergeable state as JSON (e.g. models/pattern_state.json)."""
+
+        counts = self.daily_counts.reset_index()
+        counts["date"] = counts["date"].dt.strftime("%Y-%m-%d")
+
+        state = {
+            "version": self.STATE_VERSION,
+            "daily_counts": counts.to_dict(orient="records"),
+            "weekday_sums": self.weekday_sums.reset_index().to_dict(orient="records"),
+        }
+
+        with open(path, "w") as f:
+            json.dump(state, f, indent=4)
+
+    @classmethod
+    def load_state(cls, path: str) -> "AttendancePatternAnalyzer":
+        """Rebuild an analyzer from a file written by save_state."""
+
+        with open(path, "r") as f:
+            state = json.load(f)
+
+        if state.get("version") != cls.STATE_VERSION:
+            raise ValueError(f"Unsupported pattern state version: {state.get('version')}")
+
+        analyzer = cls()
+
+        counts = pd.DataFrame(state["daily_counts"], columns=["date", "present", "total"])
+        counts["date"] = pd.to_datetime(counts["date"])
+        analyzer.daily_counts = counts.set_index("date").astype("int64")
+
+        analyzer.weekday_sums = (
+            pd.DataFrame(state["weekday_sums"], columns=["weekday", "count", "sum", "sumsq"])
+            .set_index("weekday")
+            .astype(float)
+        )
+
+        analyzer._stats_from_sums()
+        return analyzer
+
+    # ---------------------------------------------------
+    # Day-level anomalies
+    # ---------------------------------------------------
+    def detect_anomalies(self, threshold: float = ANOMALY_Z_THRESHOLD) -> list:
+        """
+        Clusters of consecutive unusually low days in the fitted history:
+        days whose weekday-adjusted attendance is `threshold` rolling
+        standard deviations below the preceding weeks.
+
+        Returns: [{"start", "end", "n_days", "dates": [...], "min_z"}, ...]
+        """
+
+        if self.daily_counts is None or self.daily_counts.empty:
+            return []
+
+        clusters = scan_daily(self.daily_from_counts(self.daily_counts), threshold=threshold)
+
+        return [
+            {
+                "start": start,
+                "end": end,
+                "n_days": int(n_days),
+                "dates": dates,
+                "min_z": round(float(min_z), 2),
+            }
+            for start, end, n_days, dates, min_z in zip(
+                clusters["start"], clusters["end"], clusters["n_days"], clusters["dates"], clusters["min_z"]
+            )
+        ]
+
+    def analyze_patterns(self, anomalies: list = None) -> dict:
         """
         Returns a dictionary of detected patterns, e.g.:
 
         {
             "weekend_effect": "Absences spike ~18% on Fridays.",
             "midweek_dip": "Wednesday attendance is ~9% below normal.",
-            "holiday_effect": "Detected clusters of low-attendance days around holidays."
+            "holiday_effect": "Detected 1 cluster of low-attendance days ...: 2025-01-13 to 2025-01-14."
         }
+
+        anomalies: output of detect_anomalies(), if already computed.
         """
 
         patterns = {}
@@ -105,16 +370,20 @@ class AttendancePatternAnalyzer:
                 )
 
         # ---------- Holiday-like dips ----------
-        # Identify days with unusually LOW attendance
-        # Using > 1 std dev below global mean
-        low_attendance_threshold = self.overall_mean - 1.0 * self.weekday_stats["std"].mean()
+        # Runs of consecutive days far below their weekday-adjusted
+        # rolling baseline (a single bad day is not a holiday)
+        if anomalies is None:
+            anomalies = self.detect_anomalies()
 
-        # if there's any weekday with high std -> strong variability (holiday-like)
-        high_var_days = self.weekday_stats[self.weekday_stats["std"] > 10]
-
-        if not high_var_days.empty:
+        clusters = [c for c in anomalies if c["n_days"] >= self.HOLIDAY_MIN_DAYS]
+        if clusters:
+            spans = ", ".join(
+                c["start"] if c["start"] == c["end"] else f"{c['start']} to {c['end']}"
+                for c in clusters
+            )
             patterns["holiday_effect"] = (
-                "Detected clusters of low-attendance days likely due to holidays or events."
+                f"Detected {len(clusters)} cluster(s) of low-attendance days "
+                f"likely due to holidays or events: {spans}."
             )
 
         return patterns
@@ -124,8 +393,11 @@ class AttendancePatternAnalyzer:
     # ---------------------------------------------------
     def export_patterns(self) -> dict:
         """Return all pattern insights as a final JSON-friendly dict."""
+        anomalies = self.detect_anomalies()
+
         return {
             "overall_mean_attendance": float(self.overall_mean),
             "weekday_stats": self.weekday_stats.to_dict(orient="records"),
-            "patterns": self.analyze_patterns()
+            "patterns": self.analyze_patterns(anomalies),
+            "anomalies": anomalies
         }
@@ -1,7 +1,8 @@
 import os
+import sys
 import json
+import argparse
 import pandas as pd
-from pattern_analyzer import AttendancePatternAnalyzer
 
 
 # ---------------------------------------------------------
@@ -16,34 +17,72 @@ MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
 
 RAW_CSV_PATH = os.path.join(TRAINING_DATA_DIR, "raw_attendance_demo.csv")
 OUTPUT_JSON_PATH = os.path.join(MODELS_DIR, "pattern_rules.json")
+STATE_JSON_PATH = os.path.join(MODELS_DIR, "pattern_state.json")
 
+# Shared helpers (columnar CSV cache, profiling) live in /src and are
+# needed by the model module too, so the path goes in before importing it
+sys.path.append(SRC_DIR)
+from columnar_cache import read_csv_cached
+from pattern_analyzer import AttendancePatternAnalyzer
 
 
 # ---------------------------------------------------------
-# Ensure output folder exists
+# CLI: full refit (default) or nightly incremental update
 # ---------------------------------------------------------
-os.makedirs(MODELS_DIR, exist_ok=True)
+parser = argparse.ArgumentParser(description="Fit the attendance pattern analyzer.")
+parser.add_argument(
+    "--new-data",
+    help="raw attendance CSV with only the NEW rows; updates the saved state "
+         "instead of refitting on the full training log",
+)
+args = parser.parse_args()
+
 
 
 # ---------------------------------------------------------
-# Load training data
+# Ensure output folder exists
 # ---------------------------------------------------------
-print("📘 Loading raw attendance data...")
-print(f"➡ {RAW_CSV_PATH}\n")
+os.makedirs(MODELS_DIR, exist_ok=True)
 
-df = pd.read_csv(RAW_CSV_PATH, parse_dates=["date"])
 
-print(df.head())
-print(f"\nTotal attendance rows: {len(df)}")
+if args.new_data and os.path.exists(STATE_JSON_PATH):
+    # ---------------------------------------------------------
+    # Incremental update: only the new rows are read
+    # ---------------------------------------------------------
+    print("📘 Loading saved analyzer state...")
+    print(f"➡ {STATE_JSON_PATH}\n")
+    analyzer = AttendancePatternAnalyzer.load_state(STATE_JSON_PATH)
 
+    print("📘 Loading new attendance rows...")
+    print(f"➡ {args.new_data}\n")
+    new_df = pd.read_csv(args.new_data, parse_dates=["date"])
+    print(f"New attendance rows: {len(new_df)}")
 
-# ---------------------------------------------------------
-# Fit Analyzer
-# ---------------------------------------------------------
-print("\n🚀 Running AttendancePatternAnalyzer...\n")
+    print("\n🚀 Updating AttendancePatternAnalyzer...\n")
+    analyzer.partial_fit(new_df)
+
+else:
+    if args.new_data:
+        print(f"⚠ No saved state at {STATE_JSON_PATH}, running a full fit instead.\n")
+
+    # ---------------------------------------------------------
+    # Load training data
+    # ---------------------------------------------------------
+    print("📘 Loading raw attendance data...")
+    print(f"➡ {RAW_CSV_PATH}\n")
+
+    df = read_csv_cached(RAW_CSV_PATH, parse_dates=["date"])
 
-analyzer = AttendancePatternAnalyzer()
-analyzer.fit(df)
+    print(df.head())
+    print(f"\nTotal attendance rows: {len(df)}")
+
+    # ---------------------------------------------------------
+    # Fit Analyzer
+    # ---------------------------------------------------------
+    print("\n🚀 Running AttendancePatternAnalyzer...\n")
+
+    analyzer = AttendancePatternAnalyzer()
+    analyzer.fit(df)
 
 patterns_dict = analyzer.export_patterns()
 
@@ -54,9 +93,12 @@ patterns_dict = analyzer.export_patterns()
 with open(OUTPUT_JSON_PATH, "w") as f:
     json.dump(patterns_dict, f, indent=4)
 
+analyzer.save_state(STATE_JSON_PATH)
+
 print("✅ Pattern analysis complete!")
 print(f"\n💾 Patterns saved to:")
-print(f"➡ {OUTPUT_JSON_PATH}\n")
+print(f"➡ {OUTPUT_JSON_PATH}")
+print(f"➡ {STATE_JSON_PATH}\n")
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,308 @@
+import sys
+import os
+import json
+import importlib
+from typing import TYPE_CHECKING
+
+# ---------------------------------------------------------
+# Heavy imports (pandas, sklearn, joblib) are done lazily
+# inside the functions below, so a stage only pays for what
+# it actually uses.
+# ---------------------------------------------------------
+if TYPE_CHECKING:
+    import pandas as pd
+    from forecasting.forecaster_model import DailyAttendanceForecaster
+    from risk.risk_model import StudentRiskClassifier
+
+
+# ---------------------------------------------------------
+# Paths
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src/
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+INPUT_DIR = os.path.join(PYTHON_MODULES_DIR, "inputs")
+OUTPUT_DIR = os.path.join(PYTHON_MODULES_DIR, "outputs")
+MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
+
+# Input files
+DAILY_INPUT_PATH = os.path.join(INPUT_DIR, "input_daily.csv")
+RISK_INPUT_PATH = os.path.join(INPUT_DIR, "input_student_risk.csv")
+RAW_ATTENDANCE_PATH = os.path.join(INPUT_DIR, "input_raw_attendance.csv")
+
+# Model files
+FORECASTER_MODEL_PATH = os.path.join(MODELS_DIR, "daily_forecaster.joblib")
+RISK_MODEL_PATH = os.path.join(MODELS_DIR, "student_risk_classifier.joblib")
+
+# Compiled, memory-mappable forms of the two forests (written by the
+# *_train.py scripts). The loaders default to these, for small requests
+# (service.py, online updates, a single forecast): every process maps the
+# same page-cache copy of the tree arrays. Batch scoring (predict.py risk /
+# cohorts / all) loads the sklearn artifacts above instead: on thousands of
+# rows sklearn's per-tree predict is 1.5-3x faster than the compiled walk.
+FORECASTER_FOREST_PATH = os.path.join(MODELS_DIR, "daily_forecaster.forest.joblib")
+RISK_FOREST_PATH = os.path.join(MODELS_DIR, "student_risk_classifier.forest.joblib")
+PATTERN_RULES_PATH = os.path.join(MODELS_DIR, "pattern_rules.json")
+
+# Output files
+FORECAST_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "forecast_output.json")
+RISK_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "risk_output.json")
+PATTERN_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "pattern_output.json")
+COHORT_FORECAST_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "cohort_forecast_output.json")
+
+# Coverage of the [lower, upper] forecast interval (per-tree quantiles),
+# reported as "confidence" in the forecast outputs
+FORECAST_INTERVAL_LEVEL = 0.95
+
+
+# ---------------------------------------------------------
+# JOBLIB FIX — Alias old module paths to new module paths
+# ---------------------------------------------------------
+
+# Add forecasting, risk, patterns to import path
+sys.path.append(os.path.join(BASE_DIR, "forecasting"))
+sys.path.append(os.path.join(BASE_DIR, "risk"))
+sys.path.append(os.path.join(BASE_DIR, "patterns"))
+
+
+def model_module(package: str, name: str):
+    """
+    Import src/<package>/<name>.py on first use and alias it under its old
+    top-level name, so joblib can unpickle artifacts saved by the
+    *_train.py scripts (which import e.g. `forecaster_model` directly).
+    """
+
+    # The alias is set on every call: the qualified module may have been
+    # imported elsewhere first, without it
+    module = importlib.import_module(f"{package}.{name}")
+    sys.modules.setdefault(name, module)
+    return module
+
+
+# ---------------------------------------------------------
+# Input loading
+# ---------------------------------------------------------
+def read_daily(path: str = DAILY_INPUT_PATH) -> "pd.DataFrame":
+    from columnar_cache import read_csv_cached
+    return read_csv_cached(path, parse_dates=["date"])
+
+
+def read_cohort_daily(path: str) -> "pd.DataFrame":
+    """Long-format daily attendance with a cohort_id column."""
+    from columnar_cache import read_csv_cached
+    return read_csv_cached(path, parse_dates=["date"])
+
+
+def read_risk_features(path: str = RISK_INPUT_PATH) -> "pd.DataFrame":
+    from columnar_cache import read_csv_cached
+    return read_csv_cached(path)
+
+
+def read_risk_features_from_raw(path: str = RAW_ATTENDANCE_PATH, as_of=None) -> "pd.DataFrame":
+    """Derive per-student risk features straight from the raw attendance log."""
+    from columnar_cache import read_csv_cached
+    from risk.risk_features import compute_risk_features
+
+    return compute_risk_features(read_csv_cached(path, parse_dates=["date"]), as_of=as_of)
+
+
+def read_raw_attendance(path: str = RAW_ATTENDANCE_PATH) -> "pd.DataFrame":
+    from columnar_cache import read_csv_cached
+    return read_csv_cached(path, parse_dates=["date"])
+
+
+# ---------------------------------------------------------
+# Model loading
+# ---------------------------------------------------------
+COMPILED_SUFFIXES = (".forest.joblib", ".npz")
+
+
+def _load_compiled(path: str, package: str, name: str, class_name: str):
+    """
+    Rebuild a model wrapper around a CompiledForest instead of sklearn.
+    .forest.joblib arrays are memory-mapped read-only (shared across processes).
+    """
+    from compiled_forest import CompiledForest, direct_path_for
+
+    wrapper = getattr(model_module(package, name), class_name)()
+    wrapper.model, _ = CompiledForest.load(path, mmap_mode="r")
+
+    # Forecaster's direct multi-horizon model, when one was exported
+    if hasattr(wrapper, "direct_model") and os.path.exists(direct_path_for(path)):
+        wrapper.direct_model, _ = CompiledForest.load(direct_path_for(path), mmap_mode="r")
+        wrapper.direct_calibration = wrapper.direct_model.calibration
+    return wrapper
+
+
+def artifact_path_for(path: str) -> str:
+    """
+    Compiled forest path, or the joblib artifact it was exported from when
+    it does not exist (backends other than random_forest are not compiled,
+    see model_backends.py).
+    """
+    if not path.endswith(COMPILED_SUFFIXES) or os.path.exists(path):
+        return path
+
+    for suffix in COMPILED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)] + ".joblib"
+
+
+def forecaster_artifacts(path: str = FORECASTER_FOREST_PATH) -> list:
+    """Files a forecaster load reads: the artifact, plus a compiled direct model next to it."""
+    from compiled_forest import direct_path_for
+
+    path = artifact_path_for(path)
+    if path.endswith(COMPILED_SUFFIXES) and os.path.exists(direct_path_for(path)):
+        return [path, direct_path_for(path)]
+    return [path]
+
+
+def load_forecaster(path: str = FORECASTER_FOREST_PATH) -> "DailyAttendanceForecaster":
+    """
+    Accepts the sklearn joblib artifact or a compiled form (.forest.joblib / .npz);
+    a missing compiled form falls back to the joblib artifact.
+    """
+    path = artifact_path_for(path)
+    if path.endswith(COMPILED_SUFFIXES):
+        return _load_compiled(path, "forecasting", "forecaster_model", "DailyAttendanceForecaster")
+
+    import joblib
+    model_module("forecasting", "forecaster_model")
+    return joblib.load(path)
+
+
+def load_risk_model(path: str = RISK_FOREST_PATH) -> "StudentRiskClassifier":
+    """
+    Accepts the sklearn joblib artifact or a compiled form (.forest.joblib / .npz);
+    a missing compiled form falls back to the joblib artifact.
+    """
+    path = artifact_path_for(path)
+    if path.endswith(COMPILED_SUFFIXES):
+        return _load_compiled(path, "risk", "risk_model", "StudentRiskClassifier")
+
+    import joblib
+    model_module("risk", "risk_model")
+    return joblib.load(path)
+
+
+def load_pattern_rules(path: str = PATTERN_RULES_PATH) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------
+# Prediction stages
+# ---------------------------------------------------------
+def run_forecast(forecaster: "DailyAttendanceForecaster", daily_df: "pd.DataFrame", n_days: int = 7,
+                 level: float = FORECAST_INTERVAL_LEVEL, strategy: str = "recursive") -> list:
+    """
+    daily_df must contain:
+        date, attendance_pct, weekday, month, is_weekend
+
+    Returns one record per forecast day (the forecast_output.json format):
+    the point forecast plus the [lower, upper] interval with `level` coverage,
+    and the strategy ("recursive" or "direct") that produced it.
+    """
+
+    forecast_df = forecaster.predict_horizon(daily_df, n_days=n_days, level=level, strategy=strategy)
+
+    return [
+        {
+            "date": date.strftime("%Y-%m-%d"),
+            "predicted_attendance": round(predicted, 2),
+            "lower": round(lower, 2),
+            "upper": round(upper, 2),
+            "confidence": level,
+            "strategy": strategy
+        }
+        for date, predicted, lower, upper in zip(
+            forecast_df["date"],
+            forecast_df["attendance_pct"].tolist(),
+            forecast_df["lower"].tolist(),
+            forecast_df["upper"].tolist(),
+        )
+    ]
+
+
+def run_cohort_forecast(daily_df: "pd.DataFrame", model_path: str = FORECASTER_FOREST_PATH,
+                        n_days: int = 7, workers: int = None, level: float = FORECAST_INTERVAL_LEVEL,
+                        strategy: str = "recursive") -> list:
+    """
+    daily_df must contain:
+        cohort_id, date, attendance_pct, weekday, month, is_weekend
+
+    Returns one record per cohort and forecast day, with the same interval
+    and strategy fields as run_forecast.
+    """
+
+    from forecasting.cohort_forecast import forecast_cohorts
+
+    forecast_df = forecast_cohorts(daily_df, model_path, n_days=n_days, workers=workers, level=level,
+                                   strategy=strategy)
+
+    return [
+        {
+            "cohort_id": cohort_id,
+            "date": date,
+            "predicted_attendance": round(predicted, 2),
+            "lower": round(lower, 2),
+            "upper": round(upper, 2),
+            "confidence": level,
+            "strategy": strategy
+        }
+        for cohort_id, date, predicted, lower, upper in zip(
+            forecast_df["cohort_id"].tolist(),
+            forecast_df["date"].dt.strftime("%Y-%m-%d").tolist(),
+            forecast_df["predicted_attendance"].tolist(),
+            forecast_df["lower"].tolist(),
+            forecast_df["upper"].tolist(),
+        )
+    ]
+
+
+def run_risk(risk_model: "StudentRiskClassifier", risk_df: "pd.DataFrame") -> list:
+    """
+    risk_df must contain student_id plus risk_model.feature_cols.
+
+    Returns one record per student (the risk_output.json format).
+    """
+
+    results = risk_model.predict_batch_with_proba(risk_df)
+
+    return [
+        {
+            "student_id": student_id,
+            "risk_level": result["label"],
+            "probabilities": result["probabilities"]
+        }
+        for student_id, result in zip(risk_df["student_id"].tolist(), results)
+    ]
+
+
+def run_patterns(raw_df: "pd.DataFrame") -> dict:
+    """
+    raw_df must contain:
+        date, student_id, present (Yes/No)
+
+    Returns the pattern_output.json dict.
+    """
+
+    analyzer_module = model_module("patterns", "pattern_analyzer")
+
+    pattern_analyzer = analyzer_module.AttendancePatternAnalyzer()
+    pattern_analyzer.fit(raw_df)
+    return pattern_analyzer.export_patterns()
+
+
+def run_patterns_streaming(raw_path: str = RAW_ATTENDANCE_PATH, chunksize: int = 1_000_000) -> dict:
+    """
+    Same output as run_patterns(read_raw_attendance(raw_path)), but the raw
+    log is streamed in chunks so memory stays bounded on term-long logs.
+    """
+
+    analyzer_module = model_module("patterns", "pattern_analyzer")
+
+    pattern_analyzer = analyzer_module.AttendancePatternAnalyzer()
+    pattern_analyzer.fit_streaming(raw_path, chunksize=chunksize)
+    return pattern_analyzer.export_patterns()
@@ -1,201 +1,460 @@
-import sys
-import os
+"""
+Attendance prediction CLI
+-------------------------
+Runs one or all prediction stages:
 
-# ---------------------------------------------------------
-# JOBLIB FIX — Alias old module paths to new module paths
-# ---------------------------------------------------------
+    python predict.py forecast  [--input CSV] [--output JSON] [--model JOBLIB] [--days N]
+    python predict.py cohorts   --input CSV [--output JSON] [--model JOBLIB] [--days N] [--workers N]
+    python predict.py risk      [--input CSV] [--output JSON] [--model JOBLIB]
+    python predict.py patterns  [--input CSV] [--output JSON]
+    python predict.py all       (default when no subcommand is given)
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+`all` runs the three stages as one DAG (see dag.py): model loads, CSV
+reads, inference and JSON writes are separate nodes, so independent work
+overlaps and writes never hold up the next stage.
 
-# Add forecasting, risk, patterns to import path
-sys.path.append(os.path.join(CURRENT_DIR, "forecasting"))
-sys.path.append(os.path.join(CURRENT_DIR, "risk"))
-sys.path.append(os.path.join(CURRENT_DIR, "patterns"))
+Results are cached by content (see result_cache.py): when the inputs, model
+artifact and code are unchanged, a stage returns its stored output without
+loading anything. `--no-cache` turns this off.
 
-# Import modules under their new paths
-import forecasting.forecaster_model as forecaster_model_module
-import risk.risk_model as risk_model_module
-import patterns.pattern_analyzer as pattern_analyzer_module
+`--store` also writes every result to the indexed SQLite results
+store (see results_store.py), for dashboards that query single students
+or pages of results instead of reading whole JSON files.
 
-# Create aliases so joblib can find old module names
-sys.modules["forecaster_model"] = forecaster_model_module
-sys.modules["risk_model"] = risk_model_module
-sys.modules["pattern_analyzer"] = pattern_analyzer_module
+Add `--profile FILE` (or set ATTENDANCE_PROFILE) to get per-stage timing /
+memory spans as JSON lines — see profiling.py.
 
-# ---------------------------------------------------------
-# Continue with your REAL imports now
-# ---------------------------------------------------------
+Each stage imports only what it needs: `patterns` never touches sklearn,
+joblib or a model file, and `forecast` / `risk` only load their own artifact.
+
+Model artifacts: the batch stages (`cohorts`, `risk`, `all`) load the
+sklearn .joblib, whose per-tree predict is faster on large batches; the
+single-series `forecast` loads the memory-mapped compiled .forest.joblib,
+like service.py (see pipeline.py). --model takes either form.
+"""
+
+import os
+import sys
 import json
-import pandas as pd
-import joblib
+import time
+import argparse
 
-from forecasting.forecaster_model import DailyAttendanceForecaster
-from risk.risk_model import StudentRiskClassifier
-from patterns.pattern_analyzer import AttendancePatternAnalyzer
+import pipeline
+import profiling
+from dag import Stage, run_dag
+from profiling import span
+from result_cache import ResultCache
+from results_store import ResultsStore, DB_PATH
 
 
 # ---------------------------------------------------------
-# Paths
+# Helpers
 # ---------------------------------------------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src/
-PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+def save_json(data, path: str):
+    with span("json_write", rows=len(data), path=path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
 
-INPUT_DIR = os.path.join(PYTHON_MODULES_DIR, "inputs")
-OUTPUT_DIR = os.path.join(PYTHON_MODULES_DIR, "outputs")
-MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
 
-# Input files
-DAILY_INPUT_PATH = os.path.join(INPUT_DIR, "input_daily.csv")
-RISK_INPUT_PATH = os.path.join(INPUT_DIR, "input_student_risk.csv")
-RAW_ATTENDANCE_PATH = os.path.join(INPUT_DIR, "input_raw_attendance.csv")
+# Source files each stage's result depends on (part of its cache key)
+STAGE_CODE = {
+    "forecast": ["pipeline.py", "columnar_cache.py", "compiled_forest.py", "model_backends.py",
+                 "forecasting/forecaster_model.py"],
+    "cohorts": ["pipeline.py", "columnar_cache.py", "compiled_forest.py", "model_backends.py",
+                "forecasting/forecaster_model.py", "forecasting/cohort_forecast.py"],
+    "risk": ["pipeline.py", "columnar_cache.py", "compiled_forest.py", "model_backends.py",
+             "risk/risk_model.py", "risk/risk_features.py"],
+    "patterns": ["pipeline.py", "patterns/pattern_analyzer.py", "patterns/anomaly_scan.py"],
+}
 
-# Model files
-FORECASTER_MODEL_PATH = os.path.join(MODELS_DIR, "daily_forecaster.joblib")
-RISK_MODEL_PATH = os.path.join(MODELS_DIR, "student_risk_classifier.joblib")
-PATTERN_RULES_PATH = os.path.join(MODELS_DIR, "pattern_rules.json")
 
-# Output files
-FORECAST_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "forecast_output.json")
-RISK_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "risk_output.json")
-PATTERN_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "pattern_output.json")
+def cache_lookup(cache, stage: str, inputs: list, artifacts: list = (), params: dict = None):
+    """
+    Returns (key, stored result or None). With caching off: (None, None).
+    """
 
-# Ensure outputs folder exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if cache is None:
+        return None, None
 
+    code = [os.path.join(pipeline.BASE_DIR, path) for path in STAGE_CODE[stage]]
+    artifacts = [pipeline.artifact_path_for(path) for path in artifacts]  # what will actually load
+    key = cache.key(stage, inputs=inputs, artifacts=artifacts, code=code, params=params)
 
-# ---------------------------------------------------------
-# Load Models
-# ---------------------------------------------------------
-print("📦 Loading models...")
+    result = cache.get(key)
+    if result is not None:
+        print(f"🗄 Cache hit for {stage}: inputs, model and code unchanged")
+        return key, result
+    return key, None
+
+
+def write_result(data, path: str, cache=None, key: str = None, store=None, stage: str = None):
+    """
+    Save an output JSON and, for a freshly computed result, store it in the
+    cache. With a results store, the result is also written there as a new run.
+    """
+
+    save_json(data, path)
+    if cache is not None and key is not None:
+        cache.put(key, data)
+    if store is not None:
+        with span("store_write", rows=len(data), stage=stage):
+            store.write(stage, data)
 
-forecaster: DailyAttendanceForecaster = joblib.load(FORECASTER_MODEL_PATH)
-risk_model: StudentRiskClassifier = joblib.load(RISK_MODEL_PATH)
 
-with open(PATTERN_RULES_PATH, "r") as f:
-    pattern_rules = json.load(f)
+def print_cache_stats(cache):
+    if cache is None:
+        return
 
-print("✅ Models loaded successfully!\n")
+    stats = cache.stats()
+    print(f"🗄 Result cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions "
+          f"({stats['entries']} entries, {stats['bytes'] / 2**20:.2f} / {stats['max_bytes'] / 2**20:.0f} MB)\n")
 
 
 # ---------------------------------------------------------
 # 1️⃣ FORECASTING — Next-day or multi-day predictions
 # ---------------------------------------------------------
-print("📘 Loading daily input for forecasting...")
-daily_df = pd.read_csv(DAILY_INPUT_PATH, parse_dates=["date"])
+@profiling.traced("stage.forecast")
+def forecast_stage(input_path: str, output_path: str, model_path: str, n_days: int = 7, cache=None,
+                   store=None, strategy: str = "recursive") -> list:
+    key, forecast_results = cache_lookup(cache, "forecast", [input_path], pipeline.forecaster_artifacts(model_path),
+                                         {"n_days": n_days, "strategy": strategy})
 
-print("➡ Generating next 7-day forecast...\n")
+    if forecast_results is None:
+        print("📦 Loading forecasting model...")
+        with span("model_load", path=model_path):
+            forecaster = pipeline.load_forecaster(model_path)
 
-forecast_results = []
-last_date = daily_df["date"].max()
+        print("📘 Loading daily input for forecasting...")
+        with span("csv_read", path=input_path) as s:
+            daily_df = pipeline.read_daily(input_path)
+            s.rows = len(daily_df)
 
-current_df = daily_df.copy()
+        print(f"➡ Generating next {n_days}-day forecast ({strategy})...\n")
+        with span("inference", rows=n_days, strategy=strategy):
+            forecast_results = pipeline.run_forecast(forecaster, daily_df, n_days=n_days, strategy=strategy)
+    else:
+        key = None  # already stored
 
-for i in range(1, 8):
-    next_date = last_date + pd.Timedelta(days=i)
+    write_result(forecast_results, output_path, cache, key, store, "forecast")
 
-    next_info = {
-        "weekday": next_date.weekday(),
-        "month": next_date.month,
-        "is_weekend": 1 if next_date.weekday() >= 5 else 0
-    }
+    print("✅ Forecasting complete!")
+    print(f"💾 Saved to {output_path}\n")
+    return forecast_results
 
-    predicted = forecaster.predict_next_day(current_df, next_info)
 
-    forecast_results.append({
-        "date": next_date.strftime("%Y-%m-%d"),
-        "predicted_attendance": round(predicted, 2),
-        "confidence": 0.95  # static demo confidence
-    })
+@profiling.traced("stage.cohorts")
+def cohorts_stage(input_path: str, output_path: str, model_path: str, n_days: int = 7, workers: int = None,
+                  cache=None, store=None, strategy: str = "recursive") -> list:
+    key, forecast_results = cache_lookup(cache, "cohorts", [input_path], pipeline.forecaster_artifacts(model_path),
+                                         {"n_days": n_days, "strategy": strategy})
 
-    # Append predicted day to history so rolling/lag features work
-    current_df = pd.concat([
-        current_df,
-        pd.DataFrame([{
-            "date": next_date,
-            "attendance_pct": predicted,
-            "weekday": next_info["weekday"],
-            "month": next_info["month"],
-            "is_weekend": next_info["is_weekend"]
-        }])
-    ], ignore_index=True)
+    if forecast_results is None:
+        print("📘 Loading multi-cohort daily input...")
+        with span("csv_read", path=input_path) as s:
+            daily_df = pipeline.read_cohort_daily(input_path)
+            s.rows = len(daily_df)
+        n_cohorts = daily_df["cohort_id"].nunique()
 
+        print(f"➡ Forecasting {n_days} days for {n_cohorts} cohorts ({strategy})...\n")
 
-# Save forecast output
-with open(FORECAST_OUTPUT_PATH, "w") as f:
-    json.dump(forecast_results, f, indent=4)
+        start = time.perf_counter()
+        with span("inference", rows=n_cohorts * n_days, cohorts=n_cohorts, strategy=strategy):
+            forecast_results = pipeline.run_cohort_forecast(daily_df, model_path, n_days=n_days, workers=workers,
+                                                            strategy=strategy)
+        elapsed = time.perf_counter() - start
 
-print("✅ Forecasting complete!")
-print(f"💾 Saved to {FORECAST_OUTPUT_PATH}\n")
+        print(f"⚡ Forecast {n_cohorts} cohorts in {elapsed:.3f}s")
+    else:
+        key = None
+
+    write_result(forecast_results, output_path, cache, key, store, "cohorts")
+
+    print("✅ Cohort forecasting complete!")
+    print(f"💾 Saved to {output_path}\n")
+    return forecast_results
 
 
 # ---------------------------------------------------------
 # 2️⃣ STUDENT RISK ANALYSIS
 # ---------------------------------------------------------
-print("📘 Loading student risk input...")
-risk_df = pd.read_csv(RISK_INPUT_PATH)
-
-print("➡ Predicting student risk levels...\n")
-
-risk_outputs = []
-for _, row in risk_df.iterrows():
-    features = {
-        "overall_attendance_30d": row["overall_attendance_30d"],
-        "max_absence_streak": row["max_absence_streak"],
-        "num_sudden_drops": row["num_sudden_drops"],
-        "variance_30d": row["variance_30d"],
-        "weekday_miss_friday": row["weekday_miss_friday"]
-    }
-
-    result = risk_model.predict_single_with_proba(features)
-
-    risk_outputs.append({
-        "student_id": row["student_id"],
-        "risk_level": result["label"],
-        "probabilities": result["probabilities"]
-    })
-
-with open(RISK_OUTPUT_PATH, "w") as f:
-    json.dump(risk_outputs, f, indent=4)
-
-print("✅ Student risk analysis done!")
-print(f"💾 Saved to {RISK_OUTPUT_PATH}\n")
+@profiling.traced("stage.risk")
+def risk_stage(input_path: str, output_path: str, model_path: str, raw_path: str = None, cache=None,
+               store=None) -> list:
+    key, risk_outputs = cache_lookup(cache, "risk", [raw_path or input_path], [model_path],
+                                     {"from_raw": bool(raw_path)})
+
+    if risk_outputs is None:
+        print("📦 Loading risk model...")
+        with span("model_load", path=model_path):
+            risk_model = pipeline.load_risk_model(model_path)
+
+        if raw_path:
+            print("📘 Computing student risk features from raw attendance...")
+            with span("feature_engineering", path=raw_path) as s:
+                risk_df = pipeline.read_risk_features_from_raw(raw_path)
+                s.rows = len(risk_df)
+        else:
+            print("📘 Loading student risk input...")
+            with span("csv_read", path=input_path) as s:
+                risk_df = pipeline.read_risk_features(input_path)
+                s.rows = len(risk_df)
+
+        print("➡ Predicting student risk levels...\n")
+
+        start = time.perf_counter()
+        with span("inference", rows=len(risk_df)):
+            risk_outputs = pipeline.run_risk(risk_model, risk_df)
+        elapsed = time.perf_counter() - start
+
+        throughput = len(risk_df) / elapsed if elapsed > 0 else float("inf")
+        print(f"⚡ Scored {len(risk_df)} students in {elapsed:.3f}s ({throughput:,.0f} students/sec)")
+    else:
+        key = None
+
+    write_result(risk_outputs, output_path, cache, key, store, "risk")
+
+    print("✅ Student risk analysis done!")
+    print(f"💾 Saved to {output_path}\n")
+    return risk_outputs
 
 
 # ---------------------------------------------------------
 # 3️⃣ PATTERN ANALYSIS
 # ---------------------------------------------------------
-print("📘 Loading raw attendance input for pattern analysis...")
-raw_df = pd.read_csv(RAW_ATTENDANCE_PATH, parse_dates=["date"])
+@profiling.traced("stage.patterns")
+def patterns_stage(input_path: str, output_path: str, chunksize: int = 1_000_000, cache=None,
+                   store=None) -> dict:
+    key, patterns = cache_lookup(cache, "patterns", [input_path])
 
-print("➡ Running pattern analyzer...\n")
+    if patterns is None:
+        print("📘 Streaming raw attendance input for pattern analysis...")
+        print("➡ Running pattern analyzer...\n")
+        with span("inference", path=input_path):
+            patterns = pipeline.run_patterns_streaming(input_path, chunksize=chunksize)
+    else:
+        key = None
 
-pattern_analyzer = AttendancePatternAnalyzer()
-pattern_analyzer.fit(raw_df)
-patterns = pattern_analyzer.export_patterns()
+    write_result(patterns, output_path, cache, key, store, "patterns")
 
-with open(PATTERN_OUTPUT_PATH, "w") as f:
-    json.dump(patterns, f, indent=4)
+    print("✅ Pattern analysis complete!")
+    print(f"💾 Saved to {output_path}\n")
+    return patterns
 
-print("✅ Pattern analysis complete!")
-print(f"💾 Saved to {PATTERN_OUTPUT_PATH}\n")
+
+# ---------------------------------------------------------
+# ALL STAGES — concurrent stage DAG
+# ---------------------------------------------------------
+def all_stages(args, cache=None, store=None):
+    """
+    Returns (stages, initial values). A chain whose result is in the cache
+    is reduced to its write stage, with the stored result as an initial value.
+    """
+
+    stages, initial = [], {}
+
+    # Forecasting
+    forecast_key, cached = cache_lookup(cache, "forecast", [args.daily_input],
+                                        pipeline.forecaster_artifacts(args.forecaster_model),
+                                        {"n_days": args.days, "strategy": args.strategy})
+    if cached is not None:
+        initial["forecast_results"], forecast_key = cached, None
+    else:
+        stages += [
+            Stage("load_forecaster", lambda: pipeline.load_forecaster(args.forecaster_model),
+                  outputs=["forecaster"]),
+            Stage("read_daily", lambda: pipeline.read_daily(args.daily_input),
+                  outputs=["daily_df"]),
+            Stage("forecast", lambda forecaster, daily_df: pipeline.run_forecast(forecaster, daily_df, n_days=args.days,
+                                                                                 strategy=args.strategy),
+                  inputs=["forecaster", "daily_df"], outputs=["forecast_results"]),
+        ]
+    stages.append(Stage("write_forecast",
+                        lambda forecast_results: write_result(forecast_results, args.forecast_output, cache, forecast_key,
+                                                                     store, "forecast"),
+                        inputs=["forecast_results"]))
+
+    # Student risk
+    risk_key, cached = cache_lookup(cache, "risk", [args.risk_input], [args.risk_model], {"from_raw": False})
+    if cached is not None:
+        initial["risk_outputs"], risk_key = cached, None
+    else:
+        stages += [
+            Stage("load_risk_model", lambda: pipeline.load_risk_model(args.risk_model),
+                  outputs=["risk_model"]),
+            Stage("read_risk", lambda: pipeline.read_risk_features(args.risk_input),
+                  outputs=["risk_df"]),
+            Stage("risk", lambda risk_model, risk_df: pipeline.run_risk(risk_model, risk_df),
+                  inputs=["risk_model", "risk_df"], outputs=["risk_outputs"]),
+        ]
+    stages.append(Stage("write_risk",
+                        lambda risk_outputs: write_result(risk_outputs, args.risk_output, cache, risk_key, store, "risk"),
+                        inputs=["risk_outputs"]))
+
+    # Patterns (streams its own input)
+    pattern_key, cached = cache_lookup(cache, "patterns", [args.raw_input])
+    if cached is not None:
+        initial["patterns"], pattern_key = cached, None
+    else:
+        stages.append(Stage("patterns", lambda: pipeline.run_patterns_streaming(args.raw_input, chunksize=args.chunksize),
+                            outputs=["patterns"]))
+    stages.append(Stage("write_patterns",
+                        lambda patterns: write_result(patterns, args.pattern_output, cache, pattern_key,
+                                                             store, "patterns"),
+                        inputs=["patterns"]))
+
+    return stages, initial
+
+
+def all_stage(args, cache=None, store=None):
+    stages, initial = all_stages(args, cache, store)
+
+    print(f"🚀 Running {len(stages)} stages (forecast, risk, patterns) concurrently...\n")
+    values, report = run_dag(stages, max_workers=args.workers, initial=initial)
+
+    print("✅ All stages complete!")
+    for path in (args.forecast_output, args.risk_output, args.pattern_output):
+        print(f"💾 Saved to {path}")
+    print()
+
+    return values, report
 
 
 # ---------------------------------------------------------
 # TERMINAL OUTPUT
 # ---------------------------------------------------------
-print("\n========================= 📊 FINAL OUTPUTS =========================\n")
+def print_summary(forecast_results=None, risk_outputs=None, patterns=None):
+    print("\n========================= 📊 FINAL OUTPUTS =========================\n")
+
+    if forecast_results is not None:
+        strategy = forecast_results[0].get("strategy", "recursive") if forecast_results else "recursive"
+        print(f"📅 Next {len(forecast_results)} Days Forecast ({strategy}):")
+        for fday in forecast_results:
+            print(f"  - {fday['date']}: {fday['predicted_attendance']}%  "
+                  f"({fday['confidence']:.0%} interval: {fday['lower']}–{fday['upper']}%)")
+        print()
 
-# Forecast summary
-print("📅 Next 7 Days Forecast:")
-for fday in forecast_results:
-    print(f"  - {fday['date']}: {fday['predicted_attendance']}%  (conf: {fday['confidence']})")
+    if risk_outputs is not None:
+        print("🧑‍🎓 Student Risk Levels:")
+        for r in risk_outputs:
+            print(f"  - {r['student_id']}: {r['risk_level']}  ({r['probabilities']})")
+        print()
 
-print("\n🧑‍🎓 Student Risk Levels:")
-for r in risk_outputs:
-    print(f"  - {r['student_id']}: {r['risk_level']}  ({r['probabilities']})")
+    if patterns is not None:
+        print("🔍 Pattern Insights:")
+        for k, v in patterns["patterns"].items():
+            print(f"  - {k}: {v}")
+        print()
 
-print("\n🔍 Pattern Insights:")
-for k, v in patterns["patterns"].items():
-    print(f"  - {k}: {v}")
+    print("====================================================================\n")
 
-print("\n====================================================================\n")
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+STRATEGIES = ["recursive", "direct"]
+STRATEGY_HELP = ("recursive: next-day model, predictions fed back as lags; "
+                 "direct: one multi-horizon model call for every day")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run attendance prediction stages.")
+    parser.add_argument("--profile", metavar="SINK",
+                        help="write per-stage timing/memory spans as JSON lines to a file "
+                             "(or 'stderr'); default: $ATTENDANCE_PROFILE")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute; do not read or write the result cache")
+    parser.add_argument("--cache-size-mb", type=float, default=256, help="result cache size bound (LRU eviction)")
+    parser.add_argument("--store", action="store_true", help="also write results to the indexed SQLite results store")
+    parser.add_argument("--store-db", default=DB_PATH, help="results store database used with --store")
+    sub = parser.add_subparsers(dest="command")
+
+    forecast = sub.add_parser("forecast", help="multi-day cohort attendance forecast")
+    forecast.add_argument("--input", default=pipeline.DAILY_INPUT_PATH)
+    forecast.add_argument("--output", default=pipeline.FORECAST_OUTPUT_PATH)
+    forecast.add_argument("--model", default=pipeline.FORECASTER_FOREST_PATH)
+    forecast.add_argument("--days", type=int, default=7)
+    forecast.add_argument("--strategy", choices=STRATEGIES, default="recursive", help=STRATEGY_HELP)
+
+    cohorts = sub.add_parser("cohorts", help="forecast many cohorts from one long-format CSV")
+    cohorts.add_argument("--input", required=True, help="CSV with cohort_id, date, attendance_pct, weekday, month, is_weekend")
+    cohorts.add_argument("--output", default=pipeline.COHORT_FORECAST_OUTPUT_PATH)
+    cohorts.add_argument("--model", default=pipeline.FORECASTER_MODEL_PATH)
+    cohorts.add_argument("--days", type=int, default=7)
+    cohorts.add_argument("--strategy", choices=STRATEGIES, default="recursive", help=STRATEGY_HELP)
+    cohorts.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+
+    risk = sub.add_parser("risk", help="student risk classification")
+    risk.add_argument("--input", default=pipeline.RISK_INPUT_PATH)
+    risk.add_argument("--output", default=pipeline.RISK_OUTPUT_PATH)
+    risk.add_argument("--model", default=pipeline.RISK_MODEL_PATH)
+    risk.add_argument("--from-raw", metavar="RAW_CSV",
+                      help="derive features from a raw attendance log instead of --input")
+
+    patterns = sub.add_parser("patterns", help="weekday / holiday pattern report")
+    patterns.add_argument("--input", default=pipeline.RAW_ATTENDANCE_PATH)
+    patterns.add_argument("--output", default=pipeline.PATTERN_OUTPUT_PATH)
+    patterns.add_argument("--chunksize", type=int, default=1_000_000, help="raw rows read per chunk")
+
+    everything = sub.add_parser("all", help="run every stage (default)")
+    everything.add_argument("--daily-input", default=pipeline.DAILY_INPUT_PATH)
+    everything.add_argument("--risk-input", default=pipeline.RISK_INPUT_PATH)
+    everything.add_argument("--raw-input", default=pipeline.RAW_ATTENDANCE_PATH)
+    everything.add_argument("--forecast-output", default=pipeline.FORECAST_OUTPUT_PATH)
+    everything.add_argument("--risk-output", default=pipeline.RISK_OUTPUT_PATH)
+    everything.add_argument("--pattern-output", default=pipeline.PATTERN_OUTPUT_PATH)
+    everything.add_argument("--forecaster-model", default=pipeline.FORECASTER_MODEL_PATH)
+    everything.add_argument("--risk-model", default=pipeline.RISK_MODEL_PATH)
+    everything.add_argument("--days", type=int, default=7)
+    everything.add_argument("--strategy", choices=STRATEGIES, default="recursive", help=STRATEGY_HELP)
+    everything.add_argument("--chunksize", type=int, default=1_000_000)
+    everything.add_argument("--workers", type=int, default=None, help="stage threads (default: one per stage)")
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Plain `python predict.py` keeps running every stage
+    args = parser.parse_args(argv or ["all"])
+    if args.command is None:
+        args = parser.parse_args(argv + ["all"])
+
+    if args.profile:
+        profiling.configure(args.profile)
+
+    cache = None if args.no_cache else ResultCache(max_bytes=int(args.cache_size_mb * 1024 * 1024))
+    store = ResultsStore(args.store_db) if args.store else None
+
+    if args.command == "forecast":
+        print_summary(forecast_results=forecast_stage(args.input, args.output, args.model, args.days, cache, store,
+                                                      args.strategy))
+
+    elif args.command == "cohorts":
+        results = cohorts_stage(args.input, args.output, args.model, args.days, args.workers, cache, store,
+                                args.strategy)
+        print(f"📅 {len(results)} cohort-day forecasts written.\n")
+
+    elif args.command == "risk":
+        print_summary(risk_outputs=risk_stage(args.input, args.output, args.model, args.from_raw, cache, store))
+
+    elif args.command == "patterns":
+        print_summary(patterns=patterns_stage(args.input, args.output, args.chunksize, cache, store))
+
+    else:
+        values, report = all_stage(args, cache, store)
+        print_summary(
+            forecast_results=values["forecast_results"],
+            risk_outputs=values["risk_outputs"],
+            patterns=values["patterns"],
+        )
+        print("⏱ Stage timings:")
+        print(report.summary())
+        print()
+
+    print_cache_stats(cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Lightweight stage instrumentation
+---------------------------------
+Spans around pipeline stages and hot methods, recording per span:
+wall time, CPU time, process peak RSS (and how much the span raised it),
+row count and throughput.
+
+    from profiling import span, traced
+
+    with span("csv_read", path=path) as s:
+        df = pd.read_csv(path)
+        s.rows = len(df)
+
+    @traced("forecaster.add_features", rows=rows_of_arg(1))
+    def add_features(self, df): ...
+
+Spans are emitted as JSON lines to a sink. Nothing is recorded until a sink
+is configured, so the decorators can stay on in production:
+
+    ATTENDANCE_PROFILE=profile.jsonl python predict.py     # file (appended)
+    ATTENDANCE_PROFILE=stderr python predict.py            # stderr
+    profiling.configure(callable_or_path_or_stream)         # in code
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import functools
+import contextvars
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+_sink = None
+_sink_lock = threading.Lock()
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# ---------------------------------------------------
+# Sink configuration
+# ---------------------------------------------------
+def configure(target=None):
+    """
+    target: None (disable), "stderr", a file path (JSON lines, appended),
+    a writable stream, or any callable taking the span dict.
+    """
+
+    global _sink
+
+    if target is None or target == "":
+        _sink = None
+    elif callable(target):
+        _sink = target
+    elif target in ("stderr", "-"):
+        _sink = _stream_sink(sys.stderr)
+    elif isinstance(target, str):
+        _sink = _stream_sink(open(target, "a", buffering=1))
+    else:
+        _sink = _stream_sink(target)
+
+
+def enabled() -> bool:
+    return _sink is not None
+
+
+def _stream_sink(stream):
+    def write(record: dict):
+        line = json.dumps(record, default=str)
+        with _sink_lock:
+            stream.write(line + "\n")
+    return write
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ---------------------------------------------------
+# Spans
+# ---------------------------------------------------
+class Span:
+    """One timed region. Set .rows (and any extra .attrs) before it ends."""
+
+    __slots__ = ("name", "rows", "attrs", "id", "parent", "_token",
+                 "_wall", "_cpu", "_rss", "_started")
+
+    def __init__(self, name: str, rows=None, **attrs):
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+
+    def __enter__(self):
+        if _sink is None:
+            return self
+
+        parent = _current_span.get()
+        self.id = uuid.uuid4().hex[:12]
+        self.parent = parent.id if parent is not None else None
+        self._token = _current_span.set(self)
+
+        self._started = time.time()
+        self._rss = _peak_rss_mb()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if _sink is None or not hasattr(self, "_wall"):
+            return False
+
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        rss = _peak_rss_mb()
+        _current_span.reset(self._token)
+
+        record = {
+            "span": self.name,
+            "id": self.id,
+            "parent": self.parent,
+            "start": round(self._started, 6),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "rss_peak_mb": round(rss, 1),
+            "rss_peak_delta_mb": round(rss - self._rss, 1),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if self.rows is not None:
+            record["rows"] = int(self.rows)
+            record["rows_per_s"] = round(self.rows / wall, 1) if wall > 0 else None
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record.update(self.attrs)
+
+        _sink(record)
+        return False
+
+
+def span(name: str, rows=None, **attrs) -> Span:
+    return Span(name, rows=rows, **attrs)
+
+
+# ---------------------------------------------------
+# Decorator
+# ---------------------------------------------------
+def rows_of_result(args, kwargs, result):
+    return len(result)
+
+
+def rows_of_arg(index: int):
+    """Row count = len() of positional argument `index` (0 = self for methods)."""
+    def rows(args, kwargs, result):
+        return len(args[index])
+    return rows
+
+
+def traced(name: str = None, rows=None):
+    """
+    Wrap a function in a span. `rows(args, kwargs, result) -> int` gives
+    the row count for throughput; failures to compute it are ignored.
+    When no sink is configured the wrapper only costs one global check.
+    """
+
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _sink is None:
+                return func(*args, **kwargs)
+
+            with Span(span_name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    try:
+                        s.rows = rows(args, kwargs, result)
+                    except (TypeError, IndexError, KeyError):
+                        pass
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+# Honour ATTENDANCE_PROFILE for every entry point (predict.py, service.py, training)
+configure(os.environ.get("ATTENDANCE_PROFILE"))
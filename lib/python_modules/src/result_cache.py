@@ -0,0 +1,289 @@
+"""
+Content-addressed result cache
+------------------------------
+Stage results (the outputs/*.json payloads) stored under a key that hashes
+everything the result depends on:
+
+    - the content of each input file (CSV) and model artifact,
+    - the source of the code that computes it (+ numpy/pandas/sklearn versions),
+    - stage parameters (n_days, ...).
+
+So an unchanged dashboard refresh is answered from disk without loading a
+model or reading a CSV, and any change to data, model or code is a miss.
+
+Layout (lib/python_modules/cache/results/, gitignored):
+    <key>.json     one cached result
+    index.json     entries (size, last access), file digests, hit/miss counters
+
+File digests are memoized by (size, mtime_ns), like the columnar cache,
+so big inputs are only re-hashed when they change. The directory is kept
+under max_bytes by evicting least-recently-used entries.
+
+Several processes share the directory (predict.py next to service.py), so
+every index update holds an exclusive lock on index.lock, re-reads
+index.json and reconciles it with the <key>.json files actually on disk
+(files missing from the index are adopted, entries without a file are
+dropped) before applying its change. An entry written by another process
+is never lost and stays under the LRU size bound.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from importlib import metadata
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still serialized, processes are not
+    fcntl = None
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+CACHE_DIR = os.path.join(PYTHON_MODULES_DIR, "cache", "results")
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Libraries whose version changes can change results
+LIBRARIES = ("numpy", "pandas", "scikit-learn")
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock on `path` across processes (no-op without fcntl)."""
+
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _library_versions() -> dict:
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock_path = os.path.join(cache_dir, "index.lock")
+
+        # Counters for this process; index.json keeps the all-time totals
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    # ---------------------------------------------------
+    # Index
+    # ---------------------------------------------------
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_VERSION, "entries": {}, "files": {},
+                "stats": {"hits": 0, "misses": 0, "evictions": 0}}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _reconcile(self, index: dict) -> dict:
+        """Make index["entries"] match the <key>.json files in the cache directory."""
+
+        on_disk = {
+            name[:-len(".json")] for name in os.listdir(self.cache_dir)
+            if name.endswith(".json") and name != os.path.basename(self.index_path)
+        }
+        entries = index["entries"]
+
+        for key in set(entries) - on_disk:
+            del entries[key]
+
+        # Written by a process whose index update was lost: adopt it so it can be evicted
+        for key in on_disk - set(entries):
+            try:
+                stat = os.stat(self._entry_path(key))
+            except OSError:
+                continue
+            entries[key] = {"size": stat.st_size, "last_access": stat.st_mtime}
+
+        return index
+
+    def _refresh(self):
+        """Re-read the index from disk (call with self._lock held)."""
+
+        digests = self._index["files"]  # memoized here since the last load
+        self._index = self._reconcile(self._load_index())
+        self._index["files"].update(digests)
+
+    @contextmanager
+    def _locked_index(self):
+        """
+        Hold the index (threads and processes) with self._index freshly
+        read from disk and reconciled; saved on exit.
+        """
+
+        with self._lock, _file_lock(self.lock_path):
+            self._refresh()
+            yield self._index
+            self._save_index()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    # ---------------------------------------------------
+    # Keys
+    # ---------------------------------------------------
+    def file_digest(self, path: str) -> str:
+        """sha256 of a file, re-hashed only when its size or mtime changes."""
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            known = self._index["files"].get(path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        digest = _sha256_file(path)
+        with self._lock:
+            self._index["files"][path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def key(self, stage: str, inputs=(), artifacts=(), code=(), params: dict = None) -> str:
+        """
+        stage:     stage name ("forecast", "risk", ...)
+        inputs:    input file paths
+        artifacts: model artifact paths
+        code:      source files the result depends on
+        params:    JSON-serializable stage parameters
+        """
+
+        material = {
+            "cache_version": CACHE_VERSION,
+            "stage": stage,
+            "inputs": [self.file_digest(p) for p in inputs],
+            "artifacts": [self.file_digest(p) for p in artifacts],
+            "code": [self.file_digest(p) for p in code],
+            "libraries": _library_versions(),
+            "params": params or {},
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    # ---------------------------------------------------
+    # Get / put
+    # ---------------------------------------------------
+    def get(self, key: str):
+        """Cached result for key, or None on a miss."""
+
+        with self._locked_index() as index:
+            entry = index["entries"].get(key)
+            data = None
+            if entry is not None:
+                try:
+                    with open(self._entry_path(key), "r") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    # Unreadable: drop the file too, or the next reload would adopt it again
+                    del index["entries"][key]
+                    try:
+                        os.remove(self._entry_path(key))
+                    except OSError:
+                        pass
+
+            if data is None:
+                self.misses += 1
+                index["stats"]["misses"] += 1
+            else:
+                self.hits += 1
+                index["stats"]["hits"] += 1
+                entry["last_access"] = time.time()
+
+        return data
+
+    def put(self, key: str, data):
+        payload = json.dumps(data)
+
+        with self._locked_index() as index:
+            path = self._entry_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+            index["entries"][key] = {"size": len(payload), "last_access": time.time()}
+            self._evict()
+
+    def _evict(self):
+        entries = self._index["entries"]
+        total = sum(e["size"] for e in entries.values())
+
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)["size"]
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+            self.evictions += 1
+            self._index["stats"]["evictions"] += 1
+
+    # ---------------------------------------------------
+    # Reporting
+    # ---------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()  # other processes may have added entries
+            entries = self._index["entries"]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(e["size"] for e in entries.values()),
+                "max_bytes": self.max_bytes,
+                "all_time": dict(self._index["stats"]),
+            }
+
+    def clear(self):
+        with self._locked_index() as index:
+            for key in list(index["entries"]):
+                try:
+                    os.remove(self._entry_path(key))
+                except OSError:
+                    pass
+            index["entries"] = {}
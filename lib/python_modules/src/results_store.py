@@ -0,0 +1,420 @@
+"""
+Indexed results store
+---------------------
+SQLite backend for the risk, forecast and pattern results, so a dashboard
+can fetch one student or one page of High-risk students without loading
+and parsing a whole outputs/*.json array.
+
+Every write is one run of one stage, inserted in a single transaction
+(executemany), and queries read the latest run of a stage unless a run_id
+is given. Only the newest KEEP_RUNS runs per stage are kept.
+
+Tables / indexes:
+    runs        run_id, stage, created_at, n_rows
+    risk        (run_id, student_id) primary key
+                (run_id, risk_level, student_id), (run_id, cohort_id, student_id)
+    forecasts   (run_id, cohort_id, date) primary key, (run_id, date)
+    patterns    run_id -> pattern_output.json payload
+    anomalies   (run_id, start) — the low-attendance clusters, by date
+
+Pages use keyset pagination on the index order, so page N costs the same
+as page 1 however many rows the run has:
+
+    store = ResultsStore()
+    page = store.query_risk(risk_level="High", limit=50)
+    page = store.query_risk(risk_level="High", limit=50, after=page["next"])
+
+CLI:
+    python results_store.py import                       # load outputs/*.json
+    python results_store.py risk --level High --limit 20
+    python results_store.py risk --student S001
+    python results_store.py forecast --cohort C01 --from 2025-02-01
+    python results_store.py runs
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+from contextlib import closing
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+OUTPUT_DIR = os.path.join(PYTHON_MODULES_DIR, "outputs")
+DB_PATH = os.path.join(OUTPUT_DIR, "results.sqlite")
+
+KEEP_RUNS = 5
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10_000
+
+# Stage name -> table its rows go to
+STAGE_TABLES = {
+    "risk": "risk",
+    "forecast": "forecasts",
+    "cohorts": "forecasts",
+    "patterns": "patterns",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    stage       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    n_rows      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_stage ON runs (stage, run_id);
+
+CREATE TABLE IF NOT EXISTS risk (
+    run_id          INTEGER NOT NULL,
+    student_id      TEXT NOT NULL,
+    cohort_id       TEXT NOT NULL DEFAULT '',
+    risk_level      TEXT NOT NULL,
+    probabilities   TEXT NOT NULL,
+    PRIMARY KEY (run_id, student_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS risk_level ON risk (run_id, risk_level, student_id);
+CREATE INDEX IF NOT EXISTS risk_cohort ON risk (run_id, cohort_id, student_id);
+
+CREATE TABLE IF NOT EXISTS forecasts (
+    run_id                  INTEGER NOT NULL,
+    cohort_id               TEXT NOT NULL DEFAULT '',
+    date                    TEXT NOT NULL,
+    predicted_attendance    REAL NOT NULL,
+    lower                   REAL,
+    upper                   REAL,
+    confidence              REAL,
+    strategy                TEXT,
+    PRIMARY KEY (run_id, cohort_id, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS forecasts_date ON forecasts (run_id, date);
+
+CREATE TABLE IF NOT EXISTS patterns (
+    run_id      INTEGER PRIMARY KEY,
+    payload     TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS anomalies (
+    run_id      INTEGER NOT NULL,
+    start       TEXT NOT NULL,
+    "end"       TEXT NOT NULL,
+    n_days      INTEGER NOT NULL,
+    min_z       REAL,
+    dates       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS anomalies_start ON anomalies (run_id, start);
+"""
+
+
+class ResultsStore:
+    def __init__(self, path: str = DB_PATH, keep_runs: int = KEEP_RUNS):
+        self.path = path
+        self.keep_runs = keep_runs
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+            # Databases created before forecasts recorded their strategy
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(forecasts)")}
+            if "strategy" not in columns:
+                conn.execute("ALTER TABLE forecasts ADD COLUMN strategy TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call: stage writes run on different DAG threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---------------------------------------------------
+    # Writes (one transaction per run)
+    # ---------------------------------------------------
+    def write(self, stage: str, data) -> int:
+        """Store one stage result (the outputs/*.json payload). Returns its run_id."""
+
+        if stage == "risk":
+            return self.write_risk(data)
+        if stage in ("forecast", "cohorts"):
+            return self.write_forecast(data, stage=stage)
+        if stage == "patterns":
+            return self.write_patterns(data)
+        raise ValueError(f"unknown stage {stage!r} (expected one of {sorted(STAGE_TABLES)})")
+
+    def write_risk(self, records: list, cohorts: dict = None) -> int:
+        """
+        records: run_risk records (student_id, risk_level, probabilities[, cohort_id])
+        cohorts: optional student_id -> cohort_id for records without one
+        """
+
+        cohorts = cohorts or {}
+        rows = (
+            (r["student_id"], r.get("cohort_id") or cohorts.get(r["student_id"], ""),
+             r["risk_level"], json.dumps(r["probabilities"]))
+            for r in records
+        )
+        return self._write_run("risk", len(records),
+                               "INSERT INTO risk (run_id, student_id, cohort_id, risk_level, probabilities) "
+                               "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def write_forecast(self, records: list, stage: str = "forecast") -> int:
+        rows = (
+            (r.get("cohort_id") or "", r["date"], r["predicted_attendance"],
+             r.get("lower"), r.get("upper"), r.get("confidence"), r.get("strategy"))
+            for r in records
+        )
+        return self._write_run(stage, len(records),
+                               "INSERT INTO forecasts (run_id, cohort_id, date, predicted_attendance, "
+                               "lower, upper, confidence, strategy) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def write_patterns(self, patterns: dict) -> int:
+        anomalies = patterns.get("anomalies", [])
+        rows = (
+            (a["start"], a["end"], a["n_days"], a.get("min_z"), json.dumps(a["dates"]))
+            for a in anomalies
+        )
+        run_id = self._write_run("patterns", len(anomalies),
+                                 'INSERT INTO anomalies (run_id, start, "end", n_days, min_z, dates) '
+                                 "VALUES (?, ?, ?, ?, ?, ?)", rows,
+                                 payload=json.dumps(patterns))
+        return run_id
+
+    def _write_run(self, stage: str, n_rows: int, insert_sql: str, rows, payload: str = None) -> int:
+        with closing(self._connect()) as conn, conn:
+            run_id = conn.execute("INSERT INTO runs (stage, created_at, n_rows) VALUES (?, ?, ?)",
+                                  (stage, time.time(), n_rows)).lastrowid
+
+            conn.executemany(insert_sql, ((run_id, *row) for row in rows))
+            if payload is not None:
+                conn.execute("INSERT INTO patterns (run_id, payload) VALUES (?, ?)", (run_id, payload))
+
+            self._prune(conn, stage)
+
+            # Sampled stats (a few ms): without them the planner walks the
+            # primary key for ORDER BY student_id instead of using risk_cohort
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("ANALYZE")
+        return run_id
+
+    def _prune(self, conn: sqlite3.Connection, stage: str):
+        old = [row[0] for row in conn.execute(
+            "SELECT run_id FROM runs WHERE stage = ? ORDER BY run_id DESC LIMIT -1 OFFSET ?",
+            (stage, self.keep_runs),
+        )]
+        if not old:
+            return
+
+        marks = ",".join("?" * len(old))
+        tables = ["anomalies", "patterns"] if stage == "patterns" else [STAGE_TABLES[stage]]
+        for table in tables + ["runs"]:
+            conn.execute(f"DELETE FROM {table} WHERE run_id IN ({marks})", old)
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+    def latest_run(self, stage: str, conn: sqlite3.Connection = None):
+        """run_id of the newest run of a stage (None if it never ran)."""
+
+        if conn is None:
+            with closing(self._connect()) as conn:
+                return self.latest_run(stage, conn)
+
+        row = conn.execute("SELECT MAX(run_id) FROM runs WHERE stage = ?", (stage,)).fetchone()
+        return row[0]
+
+    def runs(self, stage: str = None) -> list:
+        with closing(self._connect()) as conn:
+            sql, params = "SELECT * FROM runs", ()
+            if stage is not None:
+                sql, params = sql + " WHERE stage = ?", (stage,)
+            return [dict(row) for row in conn.execute(sql + " ORDER BY run_id DESC", params)]
+
+    def query_risk(self, risk_level: str = None, student_id: str = None, cohort_id: str = None,
+                   run_id: int = None, limit: int = DEFAULT_LIMIT, after: str = None) -> dict:
+        """
+        Risk records of one run (default: latest), ordered by student_id.
+
+        Returns {"run_id", "rows": [risk_output.json records], "next": cursor or None};
+        pass "next" back as `after` for the following page.
+        """
+
+        filters, params = [], []
+        if risk_level is not None:
+            filters.append("risk_level = ?")
+            params.append(risk_level)
+        if student_id is not None:
+            filters.append("student_id = ?")
+            params.append(student_id)
+        if cohort_id is not None:
+            filters.append("cohort_id = ?")
+            params.append(cohort_id)
+        if after is not None:
+            filters.append("student_id > ?")
+            params.append(after)
+
+        def record(row):
+            out = {"student_id": row["student_id"], "risk_level": row["risk_level"],
+                   "probabilities": json.loads(row["probabilities"])}
+            if row["cohort_id"]:
+                out["cohort_id"] = row["cohort_id"]
+            return out
+
+        return self._page("risk", "risk", filters, params, "student_id", run_id, limit, record,
+                          cursor=lambda row: row["student_id"])
+
+    def query_forecast(self, cohort_id: str = None, date_from: str = None, date_to: str = None,
+                       stage: str = None, run_id: int = None, limit: int = DEFAULT_LIMIT,
+                       after: list = None) -> dict:
+        """
+        Forecast records ordered by (cohort_id, date). stage defaults to
+        "cohorts" when a cohort is asked for, else "forecast".
+        `after` is the [cohort_id, date] cursor of the previous page.
+        """
+
+        stage = stage or ("cohorts" if cohort_id else "forecast")
+
+        filters, params = [], []
+        if cohort_id is not None:
+            filters.append("cohort_id = ?")
+            params.append(cohort_id)
+        if date_from is not None:
+            filters.append("date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            filters.append("date <= ?")
+            params.append(date_to)
+        if after is not None:
+            filters.append("(cohort_id, date) > (?, ?)")
+            params.extend(after)
+
+        def record(row):
+            out = {"date": row["date"], "predicted_attendance": row["predicted_attendance"],
+                   "lower": row["lower"], "upper": row["upper"], "confidence": row["confidence"]}
+            if row["strategy"]:
+                out["strategy"] = row["strategy"]
+            if row["cohort_id"]:
+                out["cohort_id"] = row["cohort_id"]
+            return out
+
+        return self._page(stage, "forecasts", filters, params, "cohort_id, date", run_id, limit, record,
+                          cursor=lambda row: [row["cohort_id"], row["date"]])
+
+    def query_anomalies(self, date_from: str = None, date_to: str = None, run_id: int = None) -> list:
+        """Low-attendance clusters of the latest patterns run that start in [date_from, date_to]."""
+
+        filters, params = [], []
+        if date_from is not None:
+            filters.append("start >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            filters.append("start <= ?")
+            params.append(date_to)
+
+        def record(row):
+            return {"start": row["start"], "end": row["end"], "n_days": row["n_days"],
+                    "dates": json.loads(row["dates"]), "min_z": row["min_z"]}
+
+        return self._page("patterns", "anomalies", filters, params, "start", run_id, MAX_LIMIT, record,
+                          cursor=lambda row: row["start"])["rows"]
+
+    def latest_patterns(self, run_id: int = None):
+        """The pattern_output.json payload of a run (default: latest), or None."""
+
+        with closing(self._connect()) as conn:
+            run_id = run_id or self.latest_run("patterns", conn)
+            row = conn.execute("SELECT payload FROM patterns WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def _page(self, stage, table, filters, params, order_by, run_id, limit, record, cursor) -> dict:
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        with closing(self._connect()) as conn:
+            run_id = run_id or self.latest_run(stage, conn)
+            if run_id is None:
+                return {"run_id": None, "rows": [], "next": None}
+
+            where = " AND ".join(["run_id = ?"] + filters)
+            rows = conn.execute(
+                f"SELECT * FROM {table} WHERE {where} ORDER BY {order_by} LIMIT ?",
+                [run_id, *params, limit + 1],
+            ).fetchall()
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "run_id": run_id,
+            "rows": [record(row) for row in rows],
+            "next": cursor(rows[-1]) if more else None,
+        }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Load and query the indexed results store.")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("import", help="store the current outputs/*.json files as new runs")
+    load.add_argument("--risk", default=os.path.join(OUTPUT_DIR, "risk_output.json"))
+    load.add_argument("--forecast", default=os.path.join(OUTPUT_DIR, "forecast_output.json"))
+    load.add_argument("--cohorts", default=os.path.join(OUTPUT_DIR, "cohort_forecast_output.json"))
+    load.add_argument("--patterns", default=os.path.join(OUTPUT_DIR, "pattern_output.json"))
+
+    risk = sub.add_parser("risk", help="query student risk")
+    risk.add_argument("--level", help="High / Medium / Low")
+    risk.add_argument("--student")
+    risk.add_argument("--cohort")
+    risk.add_argument("--run", type=int)
+    risk.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    risk.add_argument("--after", help="cursor from the previous page")
+
+    forecast = sub.add_parser("forecast", help="query forecasts")
+    forecast.add_argument("--cohort")
+    forecast.add_argument("--from", dest="date_from")
+    forecast.add_argument("--to", dest="date_to")
+    forecast.add_argument("--run", type=int)
+    forecast.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    forecast.add_argument("--after", nargs=2, metavar=("COHORT", "DATE"), help="cursor from the previous page")
+
+    sub.add_parser("runs", help="list stored runs")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+
+    if args.command == "import":
+        for stage in ("risk", "forecast", "cohorts", "patterns"):
+            path = getattr(args, stage)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                data = json.load(f)
+            run_id = store.write(stage, data)
+            print(f"💾 {stage}: {path} -> run {run_id}")
+        return
+
+    start = time.perf_counter()
+    if args.command == "risk":
+        page = store.query_risk(args.level, args.student, args.cohort, args.run, args.limit, args.after)
+    elif args.command == "forecast":
+        page = store.query_forecast(args.cohort, args.date_from, args.date_to, run_id=args.run, limit=args.limit,
+                                     after=args.after)
+    else:
+        page = {"rows": store.runs(), "next": None}
+    elapsed = time.perf_counter() - start
+
+    for row in page["rows"]:
+        print(json.dumps(row))
+
+    cursor = page["next"]
+    if isinstance(cursor, list):
+        cursor = " ".join(f"'{value}'" for value in cursor)
+    print(f"\n⚡ {len(page['rows'])} rows in {elapsed * 1000:.2f} ms"
+          + (f" — next page: --after {cursor}" if cursor is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Online risk feature store
+-------------------------
+Keeps every student's 30-day attendance window in memory and updates it
+one attendance mark at a time, so a student can be re-scored as soon as a
+mark arrives instead of recomputing risk_features.py over the whole log.
+
+Per student (StudentWindow) the store keeps the in-window marks plus
+running statistics that are updated in O(1) per event (amortized: a mark
+is expired once, when the window slides past it):
+
+    n_marks / n_present     -> overall_attendance_30d, variance_30d
+    n_friday_misses         -> weekday_miss_friday
+    absence runs (deque)    -> max_absence_streak   (max over <= 15 runs)
+
+num_sudden_drops depends on how the 30 days split into weeks, which moves
+with the window end, so it is read off the student's (at most ~30) marks
+when features are requested.
+
+The window end is the latest date seen in the stream (a global clock);
+features(student_ids) returns exactly what
+risk_features.compute_risk_features(<log so far>, as_of=<window end>)
+gives for those students.
+"""
+
+from bisect import insort
+from collections import deque
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from risk_features import WINDOW_DAYS, WEEK_DAYS, DROP_THRESHOLD
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+FRIDAY = 4
+
+
+def day_number(value) -> int:
+    """'YYYY-MM-DD' (or a date / Timestamp) -> days since 1970-01-01."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def _is_friday(day: int) -> bool:
+    # 1970-01-01 was a Thursday, so weekday = (day + 3) % 7 (0=Mon)
+    return (day + 3) % 7 == FRIDAY
+
+
+class StudentWindow:
+    """One student's marks inside the window, oldest first, with running stats."""
+
+    __slots__ = ("marks", "n_present", "n_friday_misses", "absence_runs")
+
+    def __init__(self):
+        self.marks = deque()            # (day, present), sorted by day, ties in arrival order
+        self.n_present = 0
+        self.n_friday_misses = 0
+        self.absence_runs = deque()     # lengths of consecutive-absence runs, oldest first
+
+    # ---------------------------------------------------
+    # O(1) updates
+    # ---------------------------------------------------
+    def add(self, day: int, present: bool):
+        if self.marks and day < self.marks[-1][0]:
+            self._insert_late(day, present)
+            return
+
+        last_absent = bool(self.marks) and not self.marks[-1][1]
+        self.marks.append((day, present))
+        self._count(day, present, +1)
+
+        if not present:
+            if last_absent:
+                self.absence_runs[-1] += 1
+            else:
+                self.absence_runs.append(1)
+
+    def expire(self, start_day: int):
+        """Drop marks older than start_day."""
+        while self.marks and self.marks[0][0] < start_day:
+            day, present = self.marks.popleft()
+            self._count(day, present, -1)
+
+            if not present:
+                # The oldest absence always belongs to the oldest run
+                self.absence_runs[0] -= 1
+                if self.absence_runs[0] == 0:
+                    self.absence_runs.popleft()
+
+    def _count(self, day: int, present: bool, sign: int):
+        if present:
+            self.n_present += sign
+        elif _is_friday(day):
+            self.n_friday_misses += sign
+
+    def _insert_late(self, day: int, present: bool):
+        """Out-of-order mark: insert in place and rebuild the runs (O(window), rare)."""
+        marks = list(self.marks)
+        # After marks on the same day, like a stable sort of the log would put it
+        insort(marks, (day, present), key=lambda mark: mark[0])
+        self.marks = deque(marks)
+        self._count(day, present, +1)
+
+        self.absence_runs = deque()
+        last_absent = False
+        for _, mark_present in self.marks:
+            if not mark_present:
+                if last_absent:
+                    self.absence_runs[-1] += 1
+                else:
+                    self.absence_runs.append(1)
+            last_absent = not mark_present
+
+    # ---------------------------------------------------
+    # Features
+    # ---------------------------------------------------
+    def num_sudden_drops(self, start_day: int) -> int:
+        n_weeks = -(-WINDOW_DAYS // WEEK_DAYS)
+        week_marks = [0] * n_weeks
+        week_present = [0] * n_weeks
+
+        for day, present in self.marks:
+            week = (day - start_day) // WEEK_DAYS
+            week_marks[week] += 1
+            week_present[week] += present
+
+        drops, previous = 0, None
+        for marks, present in zip(week_marks, week_present):
+            if marks == 0:
+                continue
+            rate = present / marks
+            if previous is not None and previous - rate >= DROP_THRESHOLD:
+                drops += 1
+            previous = rate
+        return drops
+
+    def features(self, start_day: int) -> tuple:
+        n_marks = len(self.marks)
+        rate = self.n_present / n_marks
+
+        return (
+            rate * 100,                                 # overall_attendance_30d
+            max(self.absence_runs, default=0),          # max_absence_streak
+            self.num_sudden_drops(start_day),           # num_sudden_drops
+            rate * (1 - rate),                          # variance_30d
+            self.n_friday_misses,                       # weekday_miss_friday
+        )
+
+
+class OnlineFeatureStore:
+    """Sliding 30-day windows for every student, fed one attendance mark at a time."""
+
+    FEATURE_COLS = [
+        "overall_attendance_30d",
+        "max_absence_streak",
+        "num_sudden_drops",
+        "variance_30d",
+        "weekday_miss_friday",
+    ]
+
+    def __init__(self):
+        self.windows = {}
+        self.end_day = None
+        self.n_events = 0
+        self.n_ignored = 0
+
+    @property
+    def start_day(self) -> int:
+        return self.end_day - WINDOW_DAYS + 1
+
+    @property
+    def as_of(self) -> str:
+        return str(np.datetime64(self.end_day, "D")) if self.end_day is not None else None
+
+    def update(self, student_id, day: int, present: bool) -> bool:
+        """
+        Apply one mark. Returns False (ignored) when it is already older
+        than the window.
+        """
+
+        self.n_events += 1
+        if self.end_day is None or day > self.end_day:
+            self.end_day = day
+
+        if day < self.start_day:
+            self.n_ignored += 1
+            return False
+
+        window = self.windows.get(student_id)
+        if window is None:
+            window = self.windows[student_id] = StudentWindow()
+
+        window.add(day, present)
+        window.expire(self.start_day)
+        return True
+
+    def features(self, student_ids) -> pd.DataFrame:
+        """
+        student_id + feature columns for the given students, as of the
+        current window end. Students with no marks left in the window are
+        left out (as compute_risk_features would).
+        """
+
+        start_day = self.start_day
+        ids, rows = [], []
+
+        for student_id in student_ids:
+            window = self.windows.get(student_id)
+            if window is None:
+                continue
+
+            window.expire(start_day)
+            if not window.marks:
+                del self.windows[student_id]
+                continue
+
+            ids.append(student_id)
+            rows.append(window.features(start_day))
+
+        frame = pd.DataFrame(rows, columns=self.FEATURE_COLS)
+        frame.insert(0, "student_id", ids)
+        return frame.astype({
+            "max_absence_streak": "int64",
+            "num_sudden_drops": "int64",
+            "weekday_miss_friday": "int64",
+        })
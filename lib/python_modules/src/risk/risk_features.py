@@ -0,0 +1,170 @@
+"""
+Risk feature engineering
+------------------------
+Derives the StudentRiskClassifier features from the raw attendance log
+(date, student_id, present) that AttendancePatternAnalyzer also consumes.
+
+Per student, over the 30 days ending at `as_of` (default: last date in the log):
+  - overall_attendance_30d : % of recorded days marked present
+  - max_absence_streak     : longest run of consecutive recorded absences
+  - num_sudden_drops       : week-over-week drops in weekly attendance
+                             rate of at least DROP_THRESHOLD
+  - variance_30d           : variance of the daily present (1/0) marks
+  - weekday_miss_friday    : number of Friday absences
+
+Everything is computed with NumPy over integer-coded arrays (no per-student
+Python loops); absence streaks use run-length encoding on the rows sorted
+by (student, date).
+
+Usage:
+    python risk_features.py RAW_CSV OUTPUT_CSV [--as-of YYYY-MM-DD]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+WINDOW_DAYS = 30
+WEEK_DAYS = 7
+DROP_THRESHOLD = 0.20   # 20 percentage points
+
+
+# ---------------------------------------------------
+# Encoding helpers
+# ---------------------------------------------------
+def _encode_dates(dates: pd.Series) -> np.ndarray:
+    """Day numbers (days since epoch) as int32; only distinct values are parsed."""
+
+    codes, uniques = pd.factorize(dates, sort=False)
+    day_numbers = (
+        pd.to_datetime(uniques).to_numpy(dtype="datetime64[D]").astype(np.int64)
+    )
+    return day_numbers[codes].astype(np.int32)
+
+
+def _segment_reduce(ufunc, values: np.ndarray, segment_ids: np.ndarray, n_segments: int, empty) -> np.ndarray:
+    """
+    ufunc.reduceat over `values`, where `segment_ids` is sorted.
+    Segments that have no values get `empty`.
+    """
+
+    out = np.full(n_segments, empty, dtype=np.result_type(values, type(empty)))
+    if len(values) == 0:
+        return out
+
+    starts = np.flatnonzero(np.r_[True, segment_ids[1:] != segment_ids[:-1]])
+    out[segment_ids[starts]] = ufunc.reduceat(values, starts)
+    return out
+
+
+# ---------------------------------------------------
+# Feature computation
+# ---------------------------------------------------
+def compute_risk_features(raw_df: pd.DataFrame, as_of=None) -> pd.DataFrame:
+    """
+    raw_df must contain:
+        date, student_id, present (Yes/No)
+
+    Returns one row per student:
+        student_id + StudentRiskClassifier.feature_cols
+    ready for StudentRiskClassifier.predict_batch_with_proba.
+    """
+
+    day = _encode_dates(raw_df["date"])
+    end_day = day.max() if as_of is None else int(
+        np.datetime64(pd.Timestamp(as_of).date(), "D").astype(np.int64)
+    )
+    start_day = end_day - WINDOW_DAYS + 1
+
+    in_window = (day >= start_day) & (day <= end_day)
+    day = day[in_window]
+    present = raw_df["present"].eq("Yes").to_numpy()[in_window]
+    student_codes, student_ids = pd.factorize(raw_df["student_id"][in_window])
+    n_students = len(student_ids)
+
+    # Sort marks by (student, day) so each student's history is contiguous
+    order = np.lexsort((day, student_codes))
+    student = student_codes[order]
+    day = day[order]
+    present = present[order]
+    absent = ~present
+
+    # ---------- overall attendance & variance ----------
+    n_marks = np.bincount(student, minlength=n_students)
+    n_present = np.bincount(student, weights=present, minlength=n_students)
+    rate = n_present / n_marks
+
+    overall_attendance = rate * 100
+    variance = rate * (1 - rate)   # population variance of 1/0 marks
+
+    # ---------- max absence streak (run-length encoding) ----------
+    new_student = np.r_[True, student[1:] != student[:-1]]
+    run_start = absent & (new_student | np.r_[True, present[:-1]])
+
+    run_id = np.cumsum(run_start) - 1
+    run_lengths = np.bincount(run_id[absent], minlength=run_start.sum())
+    run_student = student[run_start]
+
+    max_streak = _segment_reduce(np.maximum, run_lengths, run_student, n_students, 0)
+
+    # ---------- sudden drops in weekly attendance ----------
+    n_weeks = -(-WINDOW_DAYS // WEEK_DAYS)
+    week = (day - start_day) // WEEK_DAYS
+    cell = student.astype(np.int64) * n_weeks + week
+
+    week_marks = np.bincount(cell, minlength=n_students * n_weeks).reshape(n_students, n_weeks)
+    week_present = np.bincount(cell, weights=present, minlength=n_students * n_weeks).reshape(n_students, n_weeks)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        week_rate = week_present / week_marks   # NaN for weeks without marks
+
+    # Compare each observed week with the previous OBSERVED week
+    observed = ~np.isnan(week_rate)
+    carried = pd.DataFrame(week_rate).ffill(axis=1).to_numpy()
+    previous = np.c_[np.full(n_students, np.nan), carried[:, :-1]]
+
+    with np.errstate(invalid="ignore"):
+        drops = observed & (previous - week_rate >= DROP_THRESHOLD)
+    num_drops = drops.sum(axis=1)
+
+    # ---------- Friday absences ----------
+    # 1970-01-01 was a Thursday, so weekday = (day + 3) % 7 (0=Mon)
+    friday_miss = absent & ((day + 3) % 7 == 4)
+    friday_misses = np.bincount(student, weights=friday_miss, minlength=n_students)
+
+    return pd.DataFrame({
+        "student_id": student_ids,
+        "overall_attendance_30d": overall_attendance,
+        "max_absence_streak": max_streak.astype(np.int64),
+        "num_sudden_drops": num_drops.astype(np.int64),
+        "variance_30d": variance,
+        "weekday_miss_friday": friday_misses.astype(np.int64),
+    })
+
+
+# ---------------------------------------------------
+# CLI
+# ---------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Compute risk features from a raw attendance log.")
+    parser.add_argument("raw_csv", help="CSV with date, student_id, present")
+    parser.add_argument("output_csv", help="where to write the per-student features")
+    parser.add_argument("--as-of", help="last day of the 30-day window (default: last date in the log)")
+    args = parser.parse_args()
+
+    print("📘 Loading raw attendance log...")
+    raw_df = pd.read_csv(args.raw_csv, dtype={"student_id": str, "present": str})
+    print(f"Loaded {len(raw_df)} attendance rows.")
+
+    print("\n🚀 Computing risk features...")
+    features = compute_risk_features(raw_df, as_of=args.as_of)
+
+    features.to_csv(args.output_csv, index=False)
+    print(f"✅ Features for {len(features)} students")
+    print(f"💾 Saved to {args.output_csv}")
+
+
+if __name__ == "__main__":
+    main()
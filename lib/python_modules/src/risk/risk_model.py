@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from profiling import traced, rows_of_arg
+import drift
+import model_backends
 
 
 class StudentRiskClassifier:
@@ -8,11 +10,18 @@ class StudentRiskClassifier:
     Model 2: Student Health Risk Classification
     --------------------------------------------
     Uses engineered features to classify students into
-    Low, Medium, or High risk categories.
+    Low, Medium, or High risk categories. The estimator comes from a
+    backend (model_backends.py).
     """
 
-    def __init__(self):
+    INCREMENTAL_TREES = 50   # trees added (and oldest retired) per incremental update
+
+    def __init__(self, backend: str = model_backends.DEFAULT_BACKEND):
+        self.backend = backend
         self.model = None
+
+        # Summary of the training features and labels (see drift.py), saved with the artifact
+        self.training_profile = None
         self.feature_cols = [
             "overall_attendance_30d",
             "max_absence_streak",
@@ -24,24 +33,126 @@ class StudentRiskClassifier:
     # ---------------------------------------------------
     # Training
     # ---------------------------------------------------
-    def fit(self, df: pd.DataFrame):
+    def training_matrix(self, df: pd.DataFrame):
+        """Feature matrix X and label vector y used for training."""
+
+        return df[self.feature_cols], df["label"]
+
+    def build_model(self, n_jobs=None, **params):
+        """Unfitted estimator of self.backend; without params, its production configuration."""
+
+        backend = getattr(self, "backend", model_backends.DEFAULT_BACKEND)  # old artifacts: forest
+        return model_backends.build_estimator("classifier", backend, n_jobs=n_jobs, **params)
+
+    def fit(self, df: pd.DataFrame, n_jobs=None, **params):
         """
         df must include:
         student_id, overall_attendance_30d, max_absence_streak,
         num_sudden_drops, variance_30d, weekday_miss_friday, label
+
+        n_jobs only parallelizes tree construction (-1 = every core); the
+        saved model predicts single-threaded. Extra params go to build_model.
         """
 
-        X = df[self.feature_cols]
-        y = df["label"]
+        X, y = self.training_matrix(df)
 
-        # RandomForestClassifier for robustness
-        self.model = RandomForestClassifier(
-            n_estimators=250,
-            random_state=42,
-            class_weight="balanced"
-        )
+        self.model = self.build_model(n_jobs=n_jobs, **params)
+        self.model.fit(X, y)
+        model_backends.set_n_jobs(self.model, None)
 
+        self.training_profile = {
+            "n_rows": len(X),
+            "incremental_updates": 0,
+            "features": drift.summarize(X),
+            "labels": y.value_counts().sort_index().to_dict(),
+        }
+
+        return self.model
+
+    # ---------------------------------------------------
+    # Incremental retraining
+    # ---------------------------------------------------
+    def drift_check(self, df_new: pd.DataFrame) -> dict:
+        """
+        Compare new labelled rows with the stored training profile
+        (drift.check). decision "full" means: refit from scratch.
+        """
+
+        profile = getattr(self, "training_profile", None)  # None for old artifacts
+        if profile is None:
+            return {"decision": "full", "reason": "artifact has no training profile"}
+        if len(df_new) == 0:
+            return {"decision": "none", "reason": "no new rows"}
+
+        X, y = self.training_matrix(df_new)
+        report = drift.check(profile["features"], X)
+        report["labels"] = y.value_counts().sort_index().to_dict()
+        report["label_drift"] = drift.check_labels(profile["labels"], report["labels"])
+
+        # Warm-started trees must see every class the forest predicts
+        missing = sorted(set(self.model.classes_) - set(y))
+        unknown = sorted(set(y) - set(self.model.classes_))
+        if missing or unknown:
+            report["decision"] = "full"
+            report["reason"] = (f"new rows lack classes {missing}" if missing
+                                else f"new rows add classes {unknown}")
+        elif report["label_drift"]["drifted"]:
+            report["decision"] = "full"
+            report["reason"] = (f"label shares moved (PSI {report['label_drift']['psi']:.4f} >= "
+                                f"{report['label_drift']['threshold']:.4f})")
+        elif report["drifted"]:
+            report["reason"] = f"feature drift in {', '.join(report['drifted'])}"
+        return report
+
+    def fit_incremental(self, df_new: pd.DataFrame, n_trees: int = INCREMENTAL_TREES,
+                        replace: bool = True, n_jobs=None):
+        """
+        Warm start: grow n_trees new trees on the new labelled rows and,
+        with replace, retire the n_trees oldest ones so the forest keeps
+        its size and follows recent data. df_new needs every class of the
+        forest (see drift_check).
+
+        Needs the sklearn random_forest artifact (not a CompiledForest).
+        """
+
+        if not model_backends.is_forest(self.model):
+            raise ValueError("Incremental training needs the sklearn random_forest model "
+                             "(not a compiled forest or another backend).")
+        if getattr(self, "training_profile", None) is None:
+            raise ValueError("Artifact has no training profile; refit it once with fit().")
+
+        X, y = self.training_matrix(df_new)
+        if set(y) != set(self.model.classes_):
+            raise ValueError(f"New rows must cover the classes {list(self.model.classes_)}; "
+                             f"got {sorted(set(y))}. Refit instead.")
+
+        profile = self.training_profile
+        labels = pd.Series(profile["labels"]).add(y.value_counts(), fill_value=0).astype(int)
+
+        # "balanced" would weigh the classes by the new rows only: pin the
+        # weights of the whole training history for the new trees
+        class_weight = self.model.class_weight
+        if class_weight in ("balanced", "balanced_subsample"):
+            self.model.set_params(class_weight={
+                label: labels.sum() / (len(labels) * count) for label, count in labels.items()
+            })
+
+        n_before = len(self.model.estimators_)
+        self.model.set_params(warm_start=True, n_estimators=n_before + n_trees, n_jobs=n_jobs)
         self.model.fit(X, y)
+        self.model.set_params(warm_start=False, n_jobs=None, class_weight=class_weight)
+
+        if replace:
+            self.model.estimators_ = self.model.estimators_[n_trees:]
+            self.model.set_params(n_estimators=len(self.model.estimators_))
+
+        self.training_profile = {
+            "n_rows": profile["n_rows"] + len(X),
+            "incremental_updates": profile.get("incremental_updates", 0) + 1,
+            "features": drift.update(profile["features"], X),
+            "labels": labels.sort_index().to_dict(),
+        }
+
         return self.model
 
     # ---------------------------------------------------
@@ -67,6 +178,7 @@ class StudentRiskClassifier:
     # ---------------------------------------------------
     # Predict with probabilities (for explanation)
     # ---------------------------------------------------
+    @traced("risk.predict_single_with_proba")
     def predict_single_with_proba(self, features: dict) -> dict:
         """
         Returns: {
@@ -88,3 +200,66 @@ class StudentRiskClassifier:
                 for i in range(len(labels))
             }
         }
+
+    # ---------------------------------------------------
+    # Batch prediction (whole cohort in one forest pass)
+    # ---------------------------------------------------
+    def _as_feature_frame(self, X) -> pd.DataFrame:
+        """
+        Accepts a DataFrame (extra columns such as student_id are ignored)
+        or a 2D array whose columns follow self.feature_cols.
+        """
+
+        if isinstance(X, pd.DataFrame):
+            return X[self.feature_cols]
+
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_cols):
+            raise ValueError(
+                f"Expected a 2D array with {len(self.feature_cols)} columns "
+                f"({', '.join(self.feature_cols)}), got shape {X.shape}."
+            )
+
+        # Keep feature names so sklearn does not warn about them
+        return pd.DataFrame(X, columns=self.feature_cols)
+
+    def predict_proba_batch(self, X) -> np.ndarray:
+        """
+        Class probabilities for every row of X, shape (n_rows, n_classes).
+        Columns follow self.model.classes_.
+        """
+
+        return self.model.predict_proba(self._as_feature_frame(X))
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Risk labels for every row of X.
+
+        Labels come from the argmax of a single predict_proba pass
+        (this is exactly what RandomForestClassifier.predict does).
+        """
+
+        proba = self.predict_proba_batch(X)
+        return self.model.classes_[np.argmax(proba, axis=1)]
+
+    @traced("risk.predict_batch_with_proba", rows=rows_of_arg(1))
+    def predict_batch_with_proba(self, X) -> list:
+        """
+        Batch version of predict_single_with_proba.
+
+        Returns one record per row:
+            [{"label": "High", "probabilities": {"Low": 0.12, ...}}, ...]
+        """
+
+        proba = self.predict_proba_batch(X)
+        classes = self.model.classes_
+
+        labels = classes[np.argmax(proba, axis=1)].tolist()
+        probabilities = pd.DataFrame(
+            proba, columns=classes.tolist()
+        ).to_dict(orient="records")
+
+        return [
+            {"label": label, "probabilities": probs}
+            for label, probs in zip(labels, probabilities)
+        ]
@@ -1,7 +1,7 @@
 import os
-import pandas as pd
+import sys
+import argparse
 import joblib
-from risk_model import StudentRiskClassifier
 
 # ---------------------------------------------------------
 # Corrected Paths
@@ -16,6 +16,36 @@ MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
 TRAIN_CSV_PATH = os.path.join(TRAINING_DATA_DIR, "student_risk_train.csv")
 MODEL_OUTPUT_PATH = os.path.join(MODELS_DIR, "student_risk_classifier.joblib")
 
+# Shared helpers (columnar CSV cache, profiling) live in /src and are
+# needed by the model module too, so the path goes in before importing it
+sys.path.append(SRC_DIR)
+from columnar_cache import read_csv_cached
+from compiled_forest import export_artifact, forest_path_for
+import model_backends
+from risk_model import StudentRiskClassifier
+
+
+# ---------------------------------------------------------
+# CLI: full retrain (default) or warm-start incremental update
+# ---------------------------------------------------------
+parser = argparse.ArgumentParser(description="Train the student risk classifier.")
+parser.add_argument(
+    "--incremental", action="store_true",
+    help="add trees trained on the rows appended to the training CSV since the saved "
+         "model was trained (retiring the oldest ones); falls back to a full retrain "
+         "when the drift check finds the new rows too different",
+)
+parser.add_argument("--trees", type=int, default=StudentRiskClassifier.INCREMENTAL_TREES,
+                    help="trees replaced per incremental update")
+parser.add_argument("--backend", choices=sorted(model_backends.BACKENDS),
+                    help="estimator backend (default: models/model_backends.json, else random_forest)")
+args = parser.parse_args()
+
+# Backend from the config unless overridden (config params only apply to the configured backend)
+backend, params = model_backends.configured("risk")
+if args.backend and args.backend != backend:
+    backend, params = args.backend, {}
+print(f"⚙ Backend: {backend} {params or ''}")
 
 
 # ---------------------------------------------------------
@@ -30,26 +60,84 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 print("📘 Loading student risk training data from:")
 print(f"➡ {TRAIN_CSV_PATH}\n")
 
-df = pd.read_csv(TRAIN_CSV_PATH)
+df = read_csv_cached(TRAIN_CSV_PATH)
 
 print(df.head())
 print(f"\nTotal training rows: {len(df)}")
 
 
+# ---------------------------------------------------------
+# Incremental update (drift check decides)
+# ---------------------------------------------------------
+risk_model = None
+
+if args.incremental and not os.path.exists(MODEL_OUTPUT_PATH):
+    print(f"\n⚠ No saved model at {MODEL_OUTPUT_PATH}, running a full fit instead.")
+
+elif args.incremental:
+    print("\n📦 Loading saved model...")
+    risk_model = joblib.load(MODEL_OUTPUT_PATH)
+
+    # Warm start adds trees: only a saved random_forest of the same backend qualifies
+    saved_backend = getattr(risk_model, "backend", model_backends.DEFAULT_BACKEND)
+    if saved_backend != backend or not model_backends.is_forest(risk_model.model):
+        print(f"⚠ Saved model is {saved_backend}, incremental updates need random_forest "
+              f"on both sides (--backend {backend}); running a full fit instead.")
+        risk_model = None
+
+if risk_model is not None:
+    # The training CSV is append-only: rows past the ones already trained on are new
+    profile = getattr(risk_model, "training_profile", None)
+    new_rows = df.iloc[profile["n_rows"]:] if profile else df.iloc[0:0]
+
+    report = risk_model.drift_check(new_rows)
+    print(f"🔍 {len(new_rows)} new rows; drift check: {report['decision']}"
+          + (f" ({report['reason']})" if "reason" in report else ""))
+    for feature, value in report.get("psi", {}).items():
+        print(f"  PSI {feature:<24} {value:.4f}  (threshold {report['threshold'][feature]:.4f})"
+              f"  mean shift {report['mean_shift'][feature]:.2f} sd  (threshold {report['mean_threshold'][feature]:.2f})")
+    if "label_drift" in report:
+        print(f"  PSI {'label':<24} {report['label_drift']['psi']:.4f}  (threshold {report['label_drift']['threshold']:.4f})")
+
+    if report["decision"] == "none":
+        print("✅ Nothing to train, model unchanged.")
+        sys.exit(0)
+
+    if report["decision"] == "incremental":
+        print(f"\n🚀 Warm-starting {args.trees} new trees on the new rows...")
+        risk_model.fit_incremental(new_rows, n_trees=args.trees, n_jobs=-1)
+        print("✅ Incremental update complete!")
+    else:
+        print("\n⚠ Full retrain needed.")
+        risk_model = None
+
+
 # ---------------------------------------------------------
 # Train model
 # ---------------------------------------------------------
-print("\n🚀 Training StudentRiskClassifier...\n")
+if risk_model is None:
+    print("\n🚀 Training StudentRiskClassifier...\n")
 
-risk_model = StudentRiskClassifier()
-model = risk_model.fit(df)
+    risk_model = StudentRiskClassifier(backend=backend)
+    model = risk_model.fit(df, n_jobs=-1, **params)  # every core for tree construction
 
-print("✅ Training complete!")
+    print("✅ Training complete!")
 
 
 # ---------------------------------------------------------
 # Save trained model
 # ---------------------------------------------------------
-joblib.dump(risk_model, MODEL_OUTPUT_PATH)
+joblib.dump(risk_model, MODEL_OUTPUT_PATH, compress=0)
+
+# Compiled, memory-mappable copy used for prediction (see compiled_forest.py);
+# other backends are loaded from the joblib artifact, so drop a stale forest
+if model_backends.is_forest(risk_model.model):
+    export_artifact(risk_model, MODEL_OUTPUT_PATH, "risk")
+    compiled_note = f"💾 Compiled forest saved to: {forest_path_for(MODEL_OUTPUT_PATH)}"
+else:
+    if os.path.exists(forest_path_for(MODEL_OUTPUT_PATH)):
+        os.remove(forest_path_for(MODEL_OUTPUT_PATH))
+    compiled_note = f"💾 No compiled forest for {backend}: prediction loads the joblib artifact"
 print(f"\n💾 Model saved to:")
 print(f"➡ {MODEL_OUTPUT_PATH}")
+print(compiled_note)
@@ -0,0 +1,286 @@
+"""
+Persistent prediction service
+-----------------------------
+Loads the forecaster, the risk classifier and the pattern rules ONCE and
+serves predictions over a small local HTTP/JSON API, so callers no longer
+pay for imports and joblib.load on every run.
+
+Endpoints:
+    GET  /health    -> status, uptime and per-endpoint latency stats
+    GET  /patterns  -> trained pattern rules (models/pattern_rules.json)
+    GET  /results/risk?risk_level=High&cohort_id=..&student_id=..&limit=100&after=<next>
+    GET  /results/forecast?cohort_id=..&date_from=..&date_to=..&limit=100&after=<cohort>,<date>
+                    -> one page of stored results (results_store.py):
+                       {"run_id", "rows", "next"}
+    POST /forecast  -> {"history": [{date, attendance_pct, weekday, month, is_weekend}, ...],
+                        "n_days": 7, "strategy": "recursive" | "direct"}
+    POST /risk      -> {"students": [{student_id, overall_attendance_30d, ...}, ...]}
+    POST /patterns  -> {"attendance": [{date, student_id, present}, ...]}
+
+Usage:
+    python service.py --host 127.0.0.1 --port 8765 --workers 4 [--store DB]
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from pipeline import (
+    load_forecaster, load_risk_model, load_pattern_rules,
+    run_forecast, run_risk, run_patterns,
+)
+from results_store import ResultsStore, DB_PATH
+
+
+# ---------------------------------------------------------
+# Latency tracking
+# ---------------------------------------------------------
+class LatencyStats:
+    """Thread-safe rolling latency window per endpoint."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        with self._lock:
+            if endpoint not in self._samples:
+                self._samples[endpoint] = deque(maxlen=self.window)
+                self._counts[endpoint] = 0
+                self._errors[endpoint] = 0
+
+            self._samples[endpoint].append(seconds * 1000.0)
+            self._counts[endpoint] += 1
+            if not ok:
+                self._errors[endpoint] += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            snapshot = {k: np.array(v) for k, v in self._samples.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+
+        return {
+            endpoint: {
+                "requests": counts[endpoint],
+                "errors": errors[endpoint],
+                "mean_ms": round(float(samples.mean()), 3),
+                "p50_ms": round(float(np.percentile(samples, 50)), 3),
+                "p95_ms": round(float(np.percentile(samples, 95)), 3),
+                "max_ms": round(float(samples.max()), 3),
+            }
+            for endpoint, samples in snapshot.items()
+            if len(samples)
+        }
+
+
+# ---------------------------------------------------------
+# Resident models
+# ---------------------------------------------------------
+class PredictionService:
+    """Holds the loaded models and dispatches JSON requests to the stages."""
+
+    def __init__(self, store_path: str = DB_PATH):
+        start = time.perf_counter()
+        self.forecaster = load_forecaster()
+        self.risk_model = load_risk_model()
+        self.pattern_rules = load_pattern_rules()
+        self.store = ResultsStore(store_path)
+        self.load_seconds = time.perf_counter() - start
+
+        self.started_at = time.time()
+        self.latency = LatencyStats()
+
+    def forecast(self, payload: dict) -> list:
+        history = pd.DataFrame(payload["history"])
+        history["date"] = pd.to_datetime(history["date"])
+        return run_forecast(self.forecaster, history, n_days=int(payload.get("n_days", 7)),
+                            strategy=payload.get("strategy", "recursive"))
+
+    def risk(self, payload: dict) -> list:
+        return run_risk(self.risk_model, pd.DataFrame(payload["students"]))
+
+    def patterns(self, payload: dict) -> dict:
+        raw = pd.DataFrame(payload["attendance"])
+        raw["date"] = pd.to_datetime(raw["date"])
+        return run_patterns(raw)
+
+    def results_risk(self, query: dict) -> dict:
+        return self.store.query_risk(
+            risk_level=query.get("risk_level"),
+            student_id=query.get("student_id"),
+            cohort_id=query.get("cohort_id"),
+            run_id=int(query["run_id"]) if "run_id" in query else None,
+            limit=int(query.get("limit", 100)),
+            after=query.get("after"),
+        )
+
+    def results_forecast(self, query: dict) -> dict:
+        return self.store.query_forecast(
+            cohort_id=query.get("cohort_id"),
+            date_from=query.get("date_from"),
+            date_to=query.get("date_to"),
+            stage=query.get("stage"),
+            run_id=int(query["run_id"]) if "run_id" in query else None,
+            limit=int(query.get("limit", 100)),
+            after=query["after"].split(",", 1) if "after" in query else None,
+        )
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "model_load_s": round(self.load_seconds, 3),
+            "latency": self.latency.summary(),
+        }
+
+
+# ---------------------------------------------------------
+# HTTP layer
+# ---------------------------------------------------------
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands each connection to a bounded thread pool.
+    When every worker is busy and the backlog is full, new connections
+    get an immediate 503 instead of queueing without limit.
+    """
+
+    def __init__(self, address, handler, service: PredictionService, workers: int = 4, backlog: int = 64):
+        super().__init__(address, handler)
+        self.service = service
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="predict")
+        self.slots = threading.BoundedSemaphore(workers + backlog)
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            try:
+                request.sendall(
+                    b"HTTP/1.1 503 Service Unavailable\r\n"
+                    b"Content-Type: application/json\r\nConnection: close\r\n\r\n"
+                    b'{"error": "server busy"}'
+                )
+            finally:
+                self.shutdown_request(request)
+            return
+
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+
+    GET_ROUTES = {
+        "/health": lambda service, payload: service.health(),
+        "/patterns": lambda service, payload: service.pattern_rules,
+        "/results/risk": lambda service, payload: service.results_risk(payload),
+        "/results/forecast": lambda service, payload: service.results_forecast(payload),
+    }
+
+    POST_ROUTES = {
+        "/forecast": lambda service, payload: service.forecast(payload),
+        "/risk": lambda service, payload: service.risk(payload),
+        "/patterns": lambda service, payload: service.patterns(payload),
+    }
+
+    def do_GET(self):
+        # Query-string parameters are the payload of GET routes
+        self._dispatch(self.GET_ROUTES, payload=dict(parse_qsl(urlsplit(self.path).query)))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f"invalid JSON: {e}"})
+            return
+
+        self._dispatch(self.POST_ROUTES, payload)
+
+    def _dispatch(self, routes: dict, payload):
+        path = urlsplit(self.path).path
+        route = routes.get(path)
+        if route is None:
+            self._send(404, {"error": f"unknown endpoint {self.command} {path}"})
+            return
+
+        service = self.server.service
+        endpoint = f"{self.command} {path}"
+        start = time.perf_counter()
+
+        try:
+            status, body = 200, route(service, payload)
+        except (KeyError, ValueError, TypeError) as e:
+            status, body = 400, {"error": f"bad request: {e}"}
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+
+        if path != "/health":
+            service.latency.record(endpoint, time.perf_counter() - start, ok=status == 200)
+
+        self._send(status, body)
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # latency stats replace the per-request access log
+
+
+# ---------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Serve attendance predictions with resident models.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="max concurrent requests")
+    parser.add_argument("--backlog", type=int, default=64, help="queued requests before returning 503")
+    parser.add_argument("--store", default=DB_PATH, help="results store queried by /results/*")
+    args = parser.parse_args()
+
+    print("📦 Loading models...")
+    service = PredictionService(args.store)
+    print(f"✅ Models loaded in {service.load_seconds:.2f}s")
+
+    server = PooledHTTPServer((args.host, args.port), PredictionHandler, service,
+                              workers=args.workers, backlog=args.backlog)
+    print(f"🚀 Serving on http://{args.host}:{args.port} ({args.workers} workers)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
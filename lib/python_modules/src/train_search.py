@@ -0,0 +1,281 @@
+"""
+Parallel training driver
+------------------------
+Trains DailyAttendanceForecaster or StudentRiskClassifier with a small
+hyperparameter search:
+
+  1. every candidate in the backend's grid (model_backends.py; for
+     random_forest n_estimators x max_depth x min_samples_leaf) is fitted
+     in a process pool, one candidate per core;
+  2. the training matrix is written once to .npy files and memory-mapped
+     by the workers, so it is never pickled per task;
+  3. fit time and validation score are recorded for every candidate
+     (report: models/<kind>_search.json), and the best configuration is
+     refitted on all data with every core and saved as the usual artifact
+     (plus, for random_forest, its compiled .forest.joblib, see compiled_forest.py).
+
+Validation:
+  - forecaster: chronological hold-out (last VALIDATION_FRACTION), MAE
+  - risk:       stratified hold-out, balanced accuracy
+
+Usage:
+    python train_search.py forecaster [--backend NAME] [--train CSV] [--output JOBLIB] [--workers N]
+    python train_search.py risk       [--backend NAME] [--train CSV] [--output JOBLIB] [--workers N]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import joblib
+
+from columnar_cache import read_csv_cached
+from compiled_forest import export_artifact, forest_path_for, direct_path_for
+import model_backends
+import backtest
+
+
+# ---------------------------------------------------------
+# Paths
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # /src
+PYTHON_MODULES_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+TRAINING_DATA_DIR = os.path.join(PYTHON_MODULES_DIR, "training_data")
+MODELS_DIR = os.path.join(PYTHON_MODULES_DIR, "models")
+
+# The model modules are imported under their top-level names, exactly like
+# the *_train.py scripts, so the saved artifacts unpickle the same way
+sys.path.append(os.path.join(BASE_DIR, "forecasting"))
+sys.path.append(os.path.join(BASE_DIR, "risk"))
+
+MODEL_KINDS = {
+    "forecaster": {
+        "module": "forecaster_model",
+        "class": "DailyAttendanceForecaster",
+        "train_csv": os.path.join(TRAINING_DATA_DIR, "daily_attendance_train.csv"),
+        "parse_dates": ["date"],
+        "artifact": os.path.join(MODELS_DIR, "daily_forecaster.joblib"),
+        "task": "regressor",
+        "metric": "mae",
+    },
+    "risk": {
+        "module": "risk_model",
+        "class": "StudentRiskClassifier",
+        "train_csv": os.path.join(TRAINING_DATA_DIR, "student_risk_train.csv"),
+        "parse_dates": None,
+        "artifact": os.path.join(MODELS_DIR, "student_risk_classifier.joblib"),
+        "task": "classifier",
+        "metric": "balanced_accuracy",
+    },
+}
+
+VALIDATION_FRACTION = 0.2
+
+
+def _wrapper(kind: str, backend: str = model_backends.DEFAULT_BACKEND):
+    spec = MODEL_KINDS[kind]
+    module = __import__(spec["module"])
+    return getattr(module, spec["class"])(backend=backend)
+
+
+# ---------------------------------------------------------
+# Validation split and score (also used by compare_backends.py)
+# ---------------------------------------------------------
+def validation_split(kind: str, df) -> tuple:
+    """
+    (X, y, n_train): training matrix as float arrays, train rows first,
+    then the validation rows (risk labels coded as ints).
+    """
+
+    X, y = _wrapper(kind).training_matrix(df)
+    X = X.to_numpy(dtype=np.float64)
+
+    if kind == "risk":
+        from sklearn.model_selection import train_test_split
+
+        y = np.unique(y.to_numpy(), return_inverse=True)[1]
+        idx = np.arange(len(y))
+        _, counts = np.unique(y, return_counts=True)
+        train_idx, val_idx = train_test_split(
+            idx, test_size=VALIDATION_FRACTION, random_state=42,
+            stratify=y if counts.min() >= 2 else None,
+        )
+        order = np.concatenate([train_idx, val_idx])
+        X, y, n_train = X[order], y[order], len(train_idx)
+    else:
+        # training_matrix is sorted by date: hold out the most recent days
+        y = y.to_numpy(dtype=np.float64)
+        n_train = int(len(y) * (1 - VALIDATION_FRACTION))
+
+    return X, y, n_train
+
+
+def validation_score(kind: str, y_true, predicted) -> float:
+    """Risk: balanced accuracy (higher is better); forecaster: MAE (lower is better)."""
+
+    if kind == "risk":
+        from sklearn.metrics import balanced_accuracy_score
+        return float(balanced_accuracy_score(y_true, predicted))
+    return float(np.mean(np.abs(y_true - predicted)))
+
+
+# ---------------------------------------------------------
+# Shared training matrix (memory-mapped by the workers)
+# ---------------------------------------------------------
+def prepare_shared_data(kind: str, df, data_dir: str) -> int:
+    """
+    Writes X / y (train rows first, then validation rows) to data_dir
+    and returns the number of training rows.
+    """
+
+    X, y, n_train = validation_split(kind, df)
+    np.save(os.path.join(data_dir, "X.npy"), np.ascontiguousarray(X))
+    np.save(os.path.join(data_dir, "y.npy"), y)
+    return n_train
+
+
+_worker_state = {}
+
+
+def _init_worker(kind: str, backend: str, data_dir: str, n_train: int):
+    _worker_state.update(
+        kind=kind,
+        backend=backend,
+        X=np.load(os.path.join(data_dir, "X.npy"), mmap_mode="r"),
+        y=np.load(os.path.join(data_dir, "y.npy"), mmap_mode="r"),
+        n_train=n_train,
+    )
+
+
+def _evaluate(params: dict) -> dict:
+    kind, backend, X, y, n = (_worker_state[k] for k in ("kind", "backend", "X", "y", "n_train"))
+
+    model = _wrapper(kind, backend).build_model(n_jobs=1, **params)
+
+    start = time.perf_counter()
+    model.fit(X[:n], y[:n])
+    fit_seconds = time.perf_counter() - start
+
+    score = validation_score(kind, y[n:], model.predict(X[n:]))
+
+    return {"params": params, "fit_seconds": round(fit_seconds, 4), "score": score}
+
+
+# ---------------------------------------------------------
+# Search
+# ---------------------------------------------------------
+def grid_candidates(grid: dict) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_search(kind: str, df, workers: int = None, backend: str = model_backends.DEFAULT_BACKEND,
+               grid: dict = None) -> dict:
+    spec = MODEL_KINDS[kind]
+    grid = grid or model_backends.search_grid(spec["task"], backend)
+    candidates = grid_candidates(grid)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(candidates)))
+
+    data_dir = tempfile.mkdtemp(prefix="train_search_")
+    try:
+        n_train = prepare_shared_data(kind, df, data_dir)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(kind, backend, data_dir, n_train)) as pool:
+            results = list(pool.map(_evaluate, candidates))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    # Lower MAE / higher accuracy wins; faster fit breaks ties
+    sign = 1 if spec["metric"] == "mae" else -1
+    best = min(results, key=lambda r: (sign * r["score"], r["fit_seconds"]))
+
+    return {
+        "kind": kind,
+        "backend": backend,
+        "metric": spec["metric"],
+        "workers": workers,
+        "n_train": n_train,
+        "grid": grid,
+        "candidates": results,
+        "best": best,
+    }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search + training.")
+    parser.add_argument("kind", choices=sorted(MODEL_KINDS))
+    parser.add_argument("--backend", choices=sorted(model_backends.BACKENDS),
+                        help="estimator backend (default: models/model_backends.json, else random_forest)")
+    parser.add_argument("--train", help="training CSV (default: training_data/ file for the model)")
+    parser.add_argument("--output", help="artifact path (default: the usual models/ file)")
+    parser.add_argument("--report", help="search report JSON (default: models/<kind>_search.json)")
+    parser.add_argument("--workers", type=int, default=None, help="search processes (default: all cores)")
+    args = parser.parse_args()
+
+    spec = MODEL_KINDS[args.kind]
+    backend = args.backend or model_backends.configured(args.kind)[0]
+    grid = model_backends.search_grid(spec["task"], backend)
+    train_csv = args.train or spec["train_csv"]
+    output = args.output or spec["artifact"]
+    report_path = args.report or os.path.join(MODELS_DIR, f"{args.kind}_search.json")
+
+    print("📘 Loading training data...")
+    df = read_csv_cached(train_csv, parse_dates=spec["parse_dates"])
+    print(f"Loaded {len(df)} training rows.")
+
+    print(f"\n🔍 Searching {len(grid_candidates(grid))} {backend} candidates...")
+    start = time.perf_counter()
+    report = run_search(args.kind, df, workers=args.workers, backend=backend, grid=grid)
+    report["search_seconds"] = round(time.perf_counter() - start, 3)
+
+    for r in sorted(report["candidates"], key=lambda r: r["score"], reverse=report["metric"] != "mae"):
+        print(f"  {report['metric']}={r['score']:.4f}  fit={r['fit_seconds']:.3f}s  {r['params']}")
+
+    best = report["best"]
+    print(f"\n🏆 Best: {best['params']} ({report['metric']}={best['score']:.4f})")
+
+    print("\n🚀 Refitting best configuration on all data (all cores)...")
+    model = _wrapper(args.kind, backend)
+    start = time.perf_counter()
+    model.fit(df, n_jobs=-1, **best["params"])
+    if args.kind == "forecaster":
+        # Direct multi-horizon model: same configuration, except its own leaf-size defaults
+        direct = {k: v for k, v in best["params"].items() if k not in model_backends.direct_params(backend)}
+        model.fit_direct(df, n_jobs=-1, **direct)
+        model.calibrate_direct(backtest.direct_calibration(df, params=direct, backend=backend))
+    report["final_fit_seconds"] = round(time.perf_counter() - start, 3)
+    report["artifact"] = output
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    joblib.dump(model, output, compress=0)
+    if model_backends.is_forest(model.model):
+        export_artifact(model, output, args.kind)  # memory-mappable copy for prediction
+    else:
+        # Stale: prediction loads the joblib artifact
+        for stale in (forest_path_for(output), direct_path_for(forest_path_for(output))):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"💾 Model saved to: {output}")
+    if model_backends.is_forest(model.model):
+        print(f"💾 Compiled forest saved to: {forest_path_for(output)}")
+    print(f"💾 Search report saved to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.join(SRC_DIR, "patterns"))
+sys.path.insert(0, os.path.join(SRC_DIR, "benchmarks"))
+
+import attendance_matrix  # noqa: E402
+from attendance_matrix import AttendanceMatrix  # noqa: E402
+from pattern_analyzer import AttendancePatternAnalyzer  # noqa: E402
+import synthetic_data  # noqa: E402
+
+
+def assert_same(a, b):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for key in a:
+            assert_same(a[key], b[key])
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            assert_same(x, y)
+    elif isinstance(a, float):
+        assert a == pytest.approx(b, rel=1e-9, abs=1e-9)
+    else:
+        assert a == b
+
+
+@pytest.fixture
+def raw_df():
+    df = synthetic_data.raw_attendance(20_000)
+    # A few marks missing, as in a real log
+    return df.sample(frac=0.95, random_state=0).reset_index(drop=True)
+
+
+def test_fit_matrix_matches_fit(raw_df):
+    expected = AttendancePatternAnalyzer().fit(raw_df).export_patterns()
+    matrix = AttendanceMatrix.from_frame(raw_df)
+
+    assert_same(AttendancePatternAnalyzer().fit_matrix(matrix).export_patterns(), expected)
+
+
+def test_from_csv_matches_from_frame(raw_df, tmp_path, monkeypatch):
+    # Columnar cache in tmp_path, not the repo's cache/
+    monkeypatch.setattr(attendance_matrix, "load_columns",
+                        partial(attendance_matrix.load_columns, cache_dir=str(tmp_path / "cache")))
+
+    # Numeric ids with one missing: pandas reads the column as float
+    raw_df = raw_df.assign(student_id=raw_df["student_id"].str[1:].astype(int))
+    raw_df["student_id"] = raw_df["student_id"].astype(object)
+    raw_df.loc[3, "student_id"] = np.nan
+    path = tmp_path / "attendance.csv"
+    raw_df.to_csv(path, index=False)
+
+    from_csv = AttendanceMatrix.from_csv(str(path))
+    from_frame = AttendanceMatrix.from_frame(pd.read_csv(path))
+
+    assert "nan" not in set(from_csv.student_ids)
+    assert not any(str(s).endswith(".0") for s in from_csv.student_ids)
+    assert list(from_csv.student_ids) == list(from_frame.student_ids)
+    assert (from_csv.present_bits == from_frame.present_bits).all()
+    assert (from_csv.known_bits == from_frame.known_bits).all()
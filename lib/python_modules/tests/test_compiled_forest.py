@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from compiled_forest import CompiledForest  # noqa: E402
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 5)), columns=[f"f{i}" for i in range(5)])
+    y = X["f0"] * 3 + np.sin(X["f1"]) + rng.normal(0, 0.1, 400)
+    return X, y.to_numpy()
+
+
+def test_regressor_matches_sklearn(data, tmp_path):
+    X, y = data
+    forest = RandomForestRegressor(n_estimators=20, min_samples_leaf=2, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    np.testing.assert_allclose(compiled.predict(X), forest.predict(X), rtol=1e-10)
+
+    # ... and after a save / memory-mapped load
+    path = str(tmp_path / "model.forest.joblib")
+    compiled.save(path, "forecaster")
+    loaded, _ = CompiledForest.load(path, mmap_mode="r")
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X), rtol=1e-10)
+
+
+def test_classifier_matches_sklearn(data):
+    X, y = data
+    labels = np.array(["Low", "Medium", "High"])[np.digitize(y, [-1, 1])]
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, labels)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    np.testing.assert_allclose(compiled.predict_proba(X), forest.predict_proba(X), rtol=1e-10)
+    assert (compiled.predict(X) == forest.predict(X)).all()
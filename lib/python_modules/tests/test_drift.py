@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.join(SRC_DIR, "forecasting"))
+
+import drift  # noqa: E402
+from forecaster_model import DailyAttendanceForecaster  # noqa: E402
+
+
+def daily(values, start="2025-01-01"):
+    dates = pd.date_range(start, periods=len(values), freq="D")
+    return pd.DataFrame({
+        "date": dates,
+        "attendance_pct": values,
+        "weekday": dates.weekday,
+        "month": dates.month,
+        "is_weekend": (dates.weekday >= 5).astype(int),
+    })
+
+
+def profiled_forecaster(history):
+    """Forecaster with the training profile fit() would store (no model needed for drift_check)."""
+    forecaster = DailyAttendanceForecaster()
+    X, y = forecaster.training_matrix(history)
+    forecaster.training_profile = {
+        "n_rows": len(X),
+        "trained_until": str(history["date"].max().date()),
+        "incremental_updates": 0,
+        "features": drift.summarize(X),
+        "target": drift.summarize(y.to_frame()),
+    }
+    return forecaster
+
+
+def weekly_check(new_values, seed=0):
+    rng = np.random.default_rng(seed)
+    history = daily(np.clip(rng.normal(82, 6, 60), 0, 100).round())
+    df = pd.concat([history, daily(new_values, start="2025-03-02")], ignore_index=True)
+
+    forecaster = profiled_forecaster(history)
+    X_new, y_new = forecaster.training_matrix(df, since=forecaster.training_profile["trained_until"])
+    return forecaster.drift_check(X_new, y_new)
+
+
+def test_collapsed_week_needs_full_retrain():
+    report = weekly_check(np.full(7, 5.0))
+
+    assert report["decision"] == "full"
+    assert "attendance_pct" in report["drifted"]
+
+
+def test_ordinary_weeks_stay_incremental():
+    rng = np.random.default_rng(1)
+    decisions = [weekly_check(np.clip(rng.normal(82, 6, 7), 0, 100).round(), seed=seed)["decision"]
+                 for seed in range(20)]
+
+    assert decisions.count("incremental") >= 18
+
+
+def test_small_sample_psi_threshold_is_capped():
+    assert drift.noise_level(7, drift.N_BINS) > drift.PSI_NOISE_CAP
+    assert drift.psi_threshold(7, drift.N_BINS) == drift.PSI_NOISE_CAP
+    assert drift.psi_threshold(10_000, drift.N_BINS) == drift.PSI_RETRAIN
+
+
+def test_label_share_shift_is_drift():
+    reference = {"high": 100, "low": 700, "medium": 200}
+
+    assert not drift.check_labels(reference, {"high": 10, "low": 72, "medium": 18})["drifted"]
+    assert drift.check_labels(reference, {"high": 80, "low": 10, "medium": 10})["drifted"]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.join(SRC_DIR, "risk"))
+
+from online_features import OnlineFeatureStore, day_number  # noqa: E402
+from risk_features import compute_risk_features  # noqa: E402
+
+
+def attendance_log(n_days=75, n_students=40, seed=0):
+    """Day-major log; some marks missing, some days arriving a little late."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=n_days, freq="D").strftime("%Y-%m-%d")
+
+    rows = [
+        (date, f"S{s:03d}", "Yes" if rng.random() < 0.8 - 0.3 * (s % 3 == 0) else "No")
+        for date in dates for s in range(n_students) if rng.random() < 0.9
+    ]
+    log = pd.DataFrame(rows, columns=["date", "student_id", "present"])
+
+    # Arrival order: a few marks are delivered up to 3 days late
+    delay = np.where(rng.random(len(log)) < 0.05, rng.integers(1, 4, len(log)), 0)
+    arrival = np.arange(len(log)) + delay * n_students
+    return log.iloc[np.argsort(arrival, kind="stable")].reset_index(drop=True)
+
+
+def assert_matches_batch(store, log_so_far):
+    expected = compute_risk_features(log_so_far, as_of=store.as_of)
+    online = store.features(expected["student_id"])
+
+    assert list(online["student_id"]) == list(expected["student_id"])
+    pd.testing.assert_frame_equal(
+        online[store.FEATURE_COLS].reset_index(drop=True),
+        expected[store.FEATURE_COLS].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_online_features_match_batch_features():
+    log = attendance_log()
+    store = OnlineFeatureStore()
+
+    # Checked along the way, so windows that have slid and expired marks are covered
+    for i, (date, student_id, present) in enumerate(log.itertuples(index=False), start=1):
+        store.update(student_id, day_number(date), present == "Yes")
+        if i % 700 == 0 or i == len(log):
+            assert_matches_batch(store, log.iloc[:i])
+
+
+def test_marks_older_than_the_window_are_ignored():
+    store = OnlineFeatureStore()
+    store.update("S1", day_number("2025-03-01"), True)
+
+    assert not store.update("S1", day_number("2025-01-01"), False)
+    assert store.n_ignored == 1
+    assert store.features(["S1"])["overall_attendance_30d"].iloc[0] == 100